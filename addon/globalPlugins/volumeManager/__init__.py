@@ -6,87 +6,269 @@
 
 
 import addonHandler
-from comtypes import CLSCTX_ALL
-from ctypes import POINTER, cast
+import core
 import globalPluginHandler
+import globalVars
 import gui
+from logHandler import log
 import os
+import queueHandler
 from speech import cancelSpeech
 import sys
+import time
 import tones
 import ui
 
+# Only what the gestures need to be bound is imported here, the audio modules are imported
+# by the methods using them once the plugin is activated, see activate()
 from . import pycaw
-from .pycaw.callbacks import MMNotificationClient
-from .pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
 
+from .instrumentation import instrumentation
 from .interface import ChangeVolumeDialog
+from .scheduler import VolumeWriteScheduler
 
 addonHandler.initTranslation()
 
-class NotificationCallback(MMNotificationClient):
-
-    def __init__(self, pluginInstance):
-        self.pluginInstance = pluginInstance
-
-    def on_device_state_changed(self, device_id, new_state, new_state_id):
-        if new_state_id != 8: return
-        self.pluginInstance.initialize()
-
 class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 
+    # seconds between two volume writes while an arrow key is held
+    volume_flush_interval = 0.03
+    # "native" steps the master volume on the device's own step table, "db" in even dB steps
+    master_step_mode = "native"
+    # seconds after which a typed letter starts a new search instead of extending it
+    type_ahead_timeout = 1.0
+    # hands out every Core Audio object, the SimulatedBackend of benchmarks/fakes.py runs the addon without Windows
+    backend = None
+    # milliseconds between loading the plugin and setting up audio, so NVDA's startup is not delayed;
+    # a gesture arriving earlier sets it up at once
+    activation_delay = 3000
+    # milliseconds to wait for the notification of a volume key press, without one the level is announced as is
+    volume_key_timeout = 500
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.enabled = False
         self.app_index = 0
-        self.initialize()
-        self.current_app = self.master_volume
+        self.type_ahead = ""
+        self.type_ahead_time = 0.0
+        self.current_app = None
+        # set by a volume key press, the next master volume notification is announced
+        self.volume_key_armed = False
+        self.volume_key_presses = 0
+        # future of the first initialize(), None until activate()
+        self.activation = None
+        self.volume_scheduler = VolumeWriteScheduler(self.announce_volume, lambda delay, callback: core.callLater(int(delay * 1000), callback), flush_interval=self.volume_flush_interval, read=self.get_app_volume, write=self.set_app_volume)
         self.standard_gestures = {"kb:nvda+shift+v": "turn", "kb:volumeDown": "volume_changed", "kb:volumeUp": "volume_changed"}
-        self.gestures = {"kb:leftArrow": "move_to_app", "kb:rightArrow": "move_to_app", "kb:upArrow": "change_volume", "kb:downArrow": "change_volume", "kb:space": "set_volume", "kb:m": "mute_app"}
+        self.gestures = {"kb:leftArrow": "move_to_app", "kb:rightArrow": "move_to_app", "kb:upArrow": "change_volume", "kb:downArrow": "change_volume", "kb:space": "set_volume", "kb:m": "mute_app", "kb:tab": "announce_active_apps", "kb:shift+leftArrow": "pan", "kb:shift+rightArrow": "pan", "kb:f12": "toggle_instrumentation", "kb:shift+f12": "report_instrumentation"}
+        for i in range(1, 10):
+            self.gestures["kb:%d" % i] = "restore_profile"
+            self.gestures["kb:shift+%d" % i] = "save_profile"
+        # every letter but m, which mutes
+        for letter in "abcdefghijklnopqrstuvwxyz":
+            self.gestures["kb:" + letter] = "jump_to_app"
         self.set_standard_gestures()
-        self.deviceEnumerator = AudioUtilities.GetDeviceEnumerator()
-        self.notificationCallback = NotificationCallback(self)
-        self.deviceEnumerator.RegisterEndpointNotificationCallback(self.notificationCallback)
+        core.callLater(self.activation_delay, self.activate)
+
+    def activate(self):
+        # Starts the COM worker and queues the audio setup on it, NVDA's main thread does not wait for it.
+        if self.activation is not None:
+            return self.activation
+        from .pycaw.meters import PeakSampler
+        from .pycaw.profiles import ProfileStore
+        from .reinit import DebouncedReinitializer
+        from .worker import ComWorker
+        # all audio COM calls run on this MTA thread, NVDA's main thread never waits on a slow endpoint
+        if self.backend is None:
+            from .pycaw.backend import ComtypesBackend
+            self.backend = ComtypesBackend()
+        self.worker = ComWorker(initializer=self.backend.initialize_thread, uninitializer=self.backend.uninitialize_thread, on_submit=instrumentation.worker_job)
+        self.worker.start()
+        # polls peak meters while layer mode is on
+        self.peak_sampler = PeakSampler(initializer=self.backend.initialize_thread, uninitializer=self.backend.uninitialize_thread)
+        self.reinitializer = DebouncedReinitializer(self.rebuild_devices)
+        self.profiles = ProfileStore(os.path.join(globalVars.appArgs.configPath, "volumeManager_profiles.json"))
+        self.activation = self.worker.submit(self.initialize, name="initialize")
+        self.worker.submit(self.register_device_notifications, name="register_device_notifications")
+        return self.activation
+
+    def ensure_active(self):
+        # called by the scripts which need the audio objects, waits for the setup only the first time
+        self.activate().result(timeout=5.0)
+        if self.current_app is None:
+            self.current_app = self.master_volume
 
     def terminate(self):
         super().terminate()
-        self.deviceEnumerator.UnregisterEndpointNotificationCallback(self.notificationCallback)
+        if self.activation is None:
+            # never activated, the pending activate() finds the plugin closed
+            self.activation = False
+            return
+        self.peak_sampler.stop()
+        try:
+            self.worker.call(self.release_audio)
+        finally:
+            self.worker.stop()
+
+    def register_device_notifications(self):
+        from .pycaw.bus import DeviceBus
+        # one registration, other parts of the addon subscribe to the bus
+        self.device_bus = DeviceBus(self.backend.device_enumerator(), sinks=self.backend.sinks)
+        self.device_bus.subscribe(self.on_device_event, events=("device_state_changed", "default_device_changed", "device_added"))
+
+    @instrumentation.timed("on_device_event")
+    def on_device_event(self, event, *args):
+        instrumentation.event("device")
+        if event == "default_device_changed":
+            flow, flow_id, role, role_id, default_device_id = args
+            if flow_id == 0:
+                self.reinitializer.notify(default_device_id, default_changed=True)
+        else:
+            self.reinitializer.notify(args[0])
+
+    def release_audio(self):
+        self.device_bus.close()
+        self.app_groups.close()
+        self.session_order.close()
+        self.session_registry.close()
+        self.master_state.close()
+        self.master_bus.close()
 
     def initialize(self):
-        devices = AudioUtilities.GetSpeakers()
-        interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-        self.master_volume = cast(interface, POINTER(IAudioEndpointVolume))
-        self.master_volume.SetMasterVolume = self.master_volume.SetMasterVolumeLevelScalar
-        self.master_volume.GetMasterVolume = self.master_volume.GetMasterVolumeLevelScalar
-        self.master_volume.name = _("Master volume")
+        from .pycaw.bus import EndpointVolumeBus
+        from .pycaw.endpoint import EndpointSimpleVolume, EndpointVolumeState
+        from .pycaw.groups import AppGroups
+        from .pycaw.ordering import SessionOrder
+        from .pycaw.registry import SessionRegistry
+        from .pycaw.stepping import VolumeStepper
+        self.worker.forget()
+        endpoint = self.backend.default_endpoint()
+        self.master_device_id = endpoint.id
+        # the IAudioEndpointVolume itself, its methods are never replaced
+        self.master_endpoint = endpoint.volume
+        if getattr(self, "master_state", None) is not None:
+            self.master_state.close()
+            self.master_bus.close()
+        self.master_bus = EndpointVolumeBus(self.master_endpoint, sinks=self.backend.sinks)
+        self.master_state = EndpointVolumeState(self.master_endpoint, bus=self.master_bus)
+        self.master_bus.subscribe(self.on_master_notify, events=("notify",))
+        previous = getattr(self, "master_volume", None)
+        # listed and handled like an app in layer mode
+        self.master_volume = EndpointSimpleVolume(self.master_state, _("Master volume"))
+        if previous is not None and self.current_app is previous:
+            self.current_app = self.master_volume
+        try:
+            self.master_stepper = VolumeStepper(self.master_endpoint, device_id=self.master_device_id, mode=self.master_step_mode, level=self.get_master_level, submit=lambda func, *args: self.worker.submit(func, *args, name="VolumeStep"))
+        except Exception:
+            # no step table, the master volume is stepped like a session
+            self.master_stepper = None
+        if getattr(self, "session_registry", None) is not None:
+            self.app_groups.close()
+            self.session_order.close()
+            self.session_registry.close()
+        self.session_registry = SessionRegistry(self.backend.session_manager(), sinks=self.backend.sinks, resolver=self.backend.process_resolver())
+        self.backend.use_registry(self.session_registry)
+        # layer mode lists playing and recently used apps first
+        self.session_order = SessionOrder(self.session_registry)
+        # one layer mode entry per executable, however many sessions it has
+        self.app_groups = AppGroups(self.session_registry)
+        self.app_channels = {}
+        self.peak_sampler.clear()
+        self.peak_sampler.add_source("master", endpoint.meter)
+        for entry in self.session_registry.entries():
+            self.on_session_event("added", entry)
+        self.session_registry.subscribe(self.on_session_event)
+
+    def on_master_notify(self, event, notification):
+        instrumentation.event("master_volume")
+        if self.volume_key_armed:
+            self.volume_key_armed = False
+            queueHandler.queueFunction(queueHandler.eventQueue, self.announce_master_level, notification.volume)
+
+    def on_session_event(self, event, entry):
+        instrumentation.event("session_" + event)
+        if event == "added" and entry.exe:
+            self.peak_sampler.add_source(entry.key, entry.meter)
+        elif event == "removed":
+            self.peak_sampler.remove_source(entry.key)
+            self.app_channels.pop(entry.key, None)
+
+    @instrumentation.timed("rebuild_devices")
+    def rebuild_devices(self, device_ids, default_changed):
+        # Only the default render endpoint is used, other devices need no rebuild.
+        from .pycaw.stepping import volume_range_cache
+        for device_id in device_ids:
+            volume_range_cache.invalidate(device_id)
+        if default_changed or self.master_device_id in device_ids:
+            self.worker.submit(self.initialize).result()
 
     def event_UIA_notification(self, obj, next, **kwargs):
         if obj.appModule.appName == 'explorer' and "activityId" in kwargs and kwargs["activityId"] == "Windows.Shell.VolumeAnnouncement":
             return
         next()
 
+    @instrumentation.timed("script_change_volume")
     def script_change_volume(self, gesture):
         direction = 1 if gesture._get_identifiers()[1].split(":")[-1] == "upArrow" else - 1
-        volume = round(self.current_app.GetMasterVolume(), 2)
-        if direction == 1:
-            if volume >= 1.0:
-                tones.beep(500, 100)
-                return
-            volume += 0.01
+        if self.current_app is self.master_volume and self.master_stepper is not None:
+            changed = self.step_master(direction)
+        else:
+            changed = self.volume_scheduler.step(self.current_app, direction * 0.01) is not None
+        self.touch_app(self.current_app)
+        if not changed:
+            tones.beep(500 if direction == 1 else 200, 100)
+
+    def step_master(self, direction):
+        # One VolumeStepUp/VolumeStepDown per key press, no read and no rounding drift.
+        if not self.master_stepper.step(direction):
+            return False
+        volume = self.master_stepper.expected
+        key = ("volume", self.master_volume)
+        if volume is None:
+            # dB steps, the announcement reads the level once the write is done
+            self.worker.forget(key)
         else:
-            if volume <= 0.0:
-                tones.beep(200, 100)
-                return
-            volume -= 0.01
-        self.current_app.SetMasterVolume(volume, None)
+            self.worker.write(key, volume)
+        self.volume_scheduler.stepped(self.master_volume, volume)
+        return True
+
+    def get_master_level(self):
+        return self.worker.read(("volume", self.master_volume), self.master_volume.GetMasterVolume, name="GetMasterVolume")
+
+    def announce_volume(self, volume):
         ui.message(str(int(round(volume * 100, 0))) + "%")
 
     def script_volume_changed(self, gesture):
+        # the key always reaches Windows, announcing the level is the only part that needs the audio setup
         gesture.send()
+        activation = self.activate()
+        if not activation or not activation.done() or self.failed(activation, "activating"):
+            return
+        if self.current_app is None:
+            self.current_app = self.master_volume
+        # on_master_notify announces the level the key causes
+        self.volume_key_presses += 1
+        self.volume_key_armed = True
+        core.callLater(self.volume_key_timeout, self.on_volume_key_timeout, self.volume_key_presses)
+
+    def on_volume_key_timeout(self, press):
+        # no notification, the level did not move (already at 0 or 100%)
+        if self.volume_key_armed and press == self.volume_key_presses:
+            self.volume_key_armed = False
+            # read on the worker, the endpoint may need a COM call to refresh its state
+            self.worker.submit(self.master_volume.GetMasterVolume, name="GetMasterVolume", snapshot_key=("volume", self.master_volume)).add_done_callback(self.on_master_level_read)
+
+    def on_master_level_read(self, future):
+        if self.failed(future, "reading the master volume"):
+            return
+        queueHandler.queueFunction(queueHandler.eventQueue, self.announce_master_level, future.result())
+
+    def announce_master_level(self, volume):
         cancelSpeech()
-        ui.message(str(int(round(round(self.master_volume.GetMasterVolume(), 2) * 100, 0))) + "%")
+        ui.message(str(int(round(round(volume, 2) * 100, 0))) + "%")
 
+    @instrumentation.timed("script_move_to_app")
     def script_move_to_app(self, gesture):
+        self.volume_scheduler.flush(announce=False)
         direction = 1 if gesture._get_identifiers()[1].split(":")[-1] == "rightArrow" else - 1
         l = len(self.apps)
         i = self.app_index
@@ -95,51 +277,264 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
             i = l - 1
         if i >= l:
             i = 0
+        self.type_ahead = ""
+        self.select_app(i)
+
+    def select_app(self, i):
         self.app_index = i
         self.current_app = self.apps[self.app_index]
-        ui.message(self.current_app.name + " " + str(int(round(round(self.current_app.GetMasterVolume(), 2) * 100, 0))) + " %")
+        ui.message(self.current_app.name + " " + str(int(round(self.get_app_volume(self.current_app) * 100, 0))) + " %")
+
+    @instrumentation.timed("script_jump_to_app")
+    def script_jump_to_app(self, gesture):
+        letter = gesture._get_identifiers()[1].split(":")[-1]
+        now = time.monotonic()
+        if now - self.type_ahead_time > self.type_ahead_timeout:
+            self.type_ahead = ""
+        self.type_ahead_time = now
+        if self.type_ahead == letter * len(self.type_ahead):
+            # first letter, or the same letter again: the next app starting with it
+            self.type_ahead += letter
+            i = self.find_app(letter, self.app_index + 1)
+        else:
+            # incremental search, the current app is kept while it still matches
+            self.type_ahead += letter
+            i = self.find_app(self.type_ahead, self.app_index)
+        if i is None:
+            tones.beep(200, 50)
+            return
+        self.volume_scheduler.flush(announce=False)
+        self.select_app(i)
+
+    def find_app(self, prefix, start):
+        # the index gives the matching sessions, the walk keeps the order of the list being shown
+        from .pycaw.prefix import PrefixIndex
+        keys = set(self.session_order.names.lookup(prefix))
+        master = PrefixIndex.normalize(self.master_volume.name).startswith(PrefixIndex.normalize(prefix))
+        count = len(self.apps)
+        for offset in range(count):
+            i = (start + offset) % count
+            app = self.apps[i]
+            if app is self.master_volume:
+                if master:
+                    return i
+            elif not keys.isdisjoint(app.keys()):
+                return i
+        return None
+
+    def get_app_volume(self, app):
+        return round(self.worker.read(("volume", app), app.GetMasterVolume, name="GetMasterVolume"), 2)
+
+    def set_app_volume(self, app, volume):
+        self.worker.write(("volume", app), volume)
+        self.worker.submit(app.SetMasterVolume, volume, None, name="SetMasterVolume")
 
     def script_set_volume(self, gesture):
         self.clearGestureBindings()
-        currentValue = int(round(round(self.current_app.GetMasterVolume(), 2) * 100, 0))
+        currentValue = int(round(self.get_app_volume(self.current_app) * 100, 0))
         gui.mainFrame._popupSettingsDialog(ChangeVolumeDialog, self, value=currentValue)
 
     def set_volume(self, volume):
-        self.current_app.SetMasterVolume(volume / 100.0, None)
+        self.set_app_volume(self.current_app, volume / 100.0)
         self.set_all_gestures()
 
+    def touch_app(self, app):
+        if app is not self.master_volume:
+            for key in app.keys():
+                self.session_order.touch(key)
+
+    @instrumentation.timed("script_mute_app")
     def script_mute_app(self, gesture):
-        muteState = self.current_app.GetMute()
+        self.touch_app(self.current_app)
+        self.worker.submit(self.toggle_mute, self.current_app, name="toggle_mute").add_done_callback(self.on_mute_toggled)
+
+    def toggle_mute(self, app):
+        muteState = app.GetMute()
         if muteState == 0:
-            self.current_app.SetMute(1, None)
-            ui.message(_("muted"))
+            app.SetMute(1, None)
         elif muteState == 1:
-            self.current_app.SetMute(0, None)
-            ui.message(_("unmuted"))
+            app.SetMute(0, None)
+        return muteState
 
+    def failed(self, future, action):
+        # exceptions of worker calls end up in the log instead of vanishing with the future
+        error = future.exception()
+        if error is None:
+            return False
+        log.exception("VolumeManager: %s failed" % action, exc_info=error)
+        return True
+
+    def on_mute_toggled(self, future):
+        if self.failed(future, "toggling mute"):
+            return
+        muteState = future.result()
+        if muteState == 0:
+            queueHandler.queueFunction(queueHandler.eventQueue, ui.message, _("muted"))
+        elif muteState == 1:
+            queueHandler.queueFunction(queueHandler.eventQueue, ui.message, _("unmuted"))
+
+    @instrumentation.timed("script_turn")
     def script_turn(self, gesture):
+        self.ensure_active()
         self.enabled = not self.enabled
+        self.volume_scheduler.flush(announce=False)
         if not self.enabled:
+            self.peak_sampler.stop()
             tones.beep(440, 100)
             self.set_standard_gestures()
             return
-        all_sessions = AudioUtilities.GetAllSessions()
-        self.apps = []
-        del self.app_index
-        self.apps.append(self.master_volume)
-        for session in all_sessions:
-            if session.Process:
-                s = session.SimpleAudioVolume
-                s.name = session.DisplayName or session.Process.name()
-                self.apps.append(s)
-                if s.name == self.current_app.name:
-                    self.app_index = len(self.apps) - 1
-        if not hasattr(self, "app_index"):
-            self.app_index = 0
+        # no COM call here: active sessions come first by their state, then the levels buffered
+        # while layer mode was last on, if that was less than peak_sampler.max_age ago, then recency
+        self.session_order.set_levels(self.peak_sampler.level)
+        self.apps = self.worker.call(self.collect_apps, name="script_turn")
+        self.app_index = 0
+        for i, app in enumerate(self.apps):
+            if app.name == self.current_app.name:
+                self.app_index = i
         self.current_app = self.apps[self.app_index]
+        self.peak_sampler.start()
         tones.beep(660, 100)
         self.set_all_gestures()
 
+    def collect_apps(self):
+        apps = [self.master_volume]
+        seen = set()
+        # a group takes the place of its highest ranked session
+        for entry in self.session_order.entries():
+            group = self.app_groups.group_of(entry.key)
+            if group is not None and group not in seen:
+                seen.add(group)
+                apps.append(group)
+        return apps
+
+    @instrumentation.timed("script_pan")
+    def script_pan(self, gesture):
+        direction = 1 if gesture._get_identifiers()[1].endswith("rightArrow") else - 1
+        self.touch_app(self.current_app)
+        self.worker.submit(self.pan_app, self.current_app, direction * 0.1, name="pan").add_done_callback(self.on_panned)
+
+    def get_channels(self, entry):
+        channels = self.app_channels.get(entry.key)
+        if channels is None:
+            from .pycaw.channels import ChannelVolumes
+            channels = self.app_channels[entry.key] = ChannelVolumes(entry.session.ChannelAudioVolume)
+        channels.read()
+        return channels
+
+    def pan_app(self, app, delta):
+        if app is self.master_volume:
+            # kept current by OnNotify, no read needed
+            targets = [self.master_state.channels]
+        else:
+            targets = [self.get_channels(entry) for entry in app.entries()]
+        balance = None
+        for channels in targets:
+            if channels.count >= 2:
+                balance = channels.pan(delta)
+        return balance
+
+    def on_panned(self, future):
+        if self.failed(future, "panning"):
+            return
+        balance = future.result()
+        if balance is None:
+            message = _("mono")
+        elif abs(balance) < 0.005:
+            message = _("center")
+        elif balance < 0:
+            message = _("left {}%").format(int(round(-balance * 100)))
+        else:
+            message = _("right {}%").format(int(round(balance * 100)))
+        queueHandler.queueFunction(queueHandler.eventQueue, ui.message, message)
+
+    def script_announce_active_apps(self, gesture):
+        names = []
+        for key, peak in self.peak_sampler.active():
+            entry = self.session_registry.get(key)
+            if entry is not None:
+                names.append(entry.name)
+        if names:
+            ui.message(", ".join(names))
+        else:
+            ui.message(_("No application is playing sound"))
+
+    def script_toggle_instrumentation(self, gesture):
+        if instrumentation.enabled:
+            instrumentation.enabled = False
+            self.log_instrumentation()
+            ui.message(_("Latency recording stopped, report written to the NVDA log"))
+        else:
+            instrumentation.reset()
+            instrumentation.enabled = True
+            ui.message(_("Latency recording started"))
+
+    def script_report_instrumentation(self, gesture):
+        summary = instrumentation.summary()
+        ui.message(summary or _("Nothing recorded"))
+
+    def log_instrumentation(self):
+        lines = instrumentation.report()
+        # time spent in each kind of call on the COM worker, recorded all the time
+        for name, (count, mean, longest, last) in sorted(self.worker.stats().items()):
+            lines.append("worker %s: %d calls, mean %.2f ms, max %.2f ms" % (name, count, mean * 1000, longest * 1000))
+        log.info("VolumeManager latencies:\n" + "\n".join(lines))
+
+    def script_save_profile(self, gesture):
+        self.volume_scheduler.flush(announce=False)
+        name = gesture._get_identifiers()[1][-1]
+        # the profile file is read and written on the worker as well
+        self.worker.submit(self.save_profile, name, name="save_profile").add_done_callback(lambda future: self.on_profile_saved(future, name))
+
+    def script_restore_profile(self, gesture):
+        self.volume_scheduler.flush(announce=False)
+        name = gesture._get_identifiers()[1][-1]
+        self.worker.submit(self.restore_named_profile, name, name="restore_profile").add_done_callback(lambda future: self.on_profile_restored(future, name))
+
+    def session_volumes(self):
+        return [(entry.exe, entry.volume) for entry in self.session_registry.entries() if entry.exe]
+
+    def capture_profile(self):
+        from .pycaw.profiles import capture
+        return capture(self.master_endpoint, self.session_volumes())
+
+    def save_profile(self, name):
+        self.profiles[name] = self.capture_profile()
+
+    def on_profile_saved(self, future, name):
+        if self.failed(future, "saving profile %s" % name):
+            queueHandler.queueFunction(queueHandler.eventQueue, ui.message, _("Profile {} could not be saved").format(name))
+            return
+        queueHandler.queueFunction(queueHandler.eventQueue, ui.message, _("Profile {} saved").format(name))
+
+    def restore_named_profile(self, name):
+        # None for an empty slot, the number of writes otherwise
+        profile = self.profiles.get(name)
+        if profile is None:
+            return None
+        return self.restore_profile(profile)
+
+    def restore_profile(self, profile):
+        # one pass over the mixer, only values that differ are written;
+        # the current values come from the master state and the groups, not from COM reads
+        from .pycaw.profiles import restore
+        sessions = []
+        for group in self.app_groups.groups():
+            for entry in group.entries():
+                sessions.append((entry.exe, entry.volume, group.values(entry.key)))
+        master = (self.master_state.volume, self.master_state.mute)
+        writes = restore(profile, self.master_endpoint, sessions, master=master)
+        self.worker.forget()
+        return writes
+
+    def on_profile_restored(self, future, name):
+        if self.failed(future, "restoring profile %s" % name):
+            queueHandler.queueFunction(queueHandler.eventQueue, ui.message, _("Profile {} could not be restored").format(name))
+            return
+        if future.result() is None:
+            queueHandler.queueFunction(queueHandler.eventQueue, ui.message, _("Profile {} is empty").format(name))
+            return
+        queueHandler.queueFunction(queueHandler.eventQueue, ui.message, _("Profile {} restored").format(name))
+
     def set_standard_gestures(self):
         self.clearGestureBindings()
         self.bindGestures(self.standard_gestures)
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+
+# VolumeManager NVDA addon
+# Authors: Danstiv, Beqa gozalishvili
+# Copyright 2023, released under GPL.
+
+from array import array
+from bisect import bisect_left
+import functools
+import threading
+import time
+
+# upper bounds of the latency buckets in seconds, one more bucket takes everything slower
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def format_seconds(seconds):
+    if seconds < 0.001:
+        return "%g us" % round(seconds * 1e6, 1)
+    return "%g ms" % round(seconds * 1e3, 1)
+
+
+class Histogram:
+    # Latencies of one operation counted into the fixed BUCKETS,
+    # adding one is a bisection and an increment, nothing is kept per call.
+
+    __slots__ = ("counts", "count", "total", "max", "jobs")
+
+    def __init__(self):
+        self.counts = array("L", [0] * (len(BUCKETS) + 1))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        # jobs submitted to the COM worker while the operation ran, one job may make several COM calls
+        self.jobs = 0
+
+    def add(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent):
+        # upper bound of the bucket holding the percentile, the maximum for the last bucket
+        rank = percent / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                return BUCKETS[i] if i < len(BUCKETS) else self.max
+        return 0.0
+
+
+class RateMeter:
+    # Events per second over the last 'window' seconds, counted in a ring of one-second slots.
+
+    __slots__ = ("clock", "window", "slots", "stamps", "count", "peak")
+
+    def __init__(self, window=60, clock=time.monotonic):
+        self.clock = clock
+        self.window = window
+        self.slots = array("L", [0] * window)
+        self.stamps = array("q", [-1] * window)
+        self.count = 0
+        # most events seen within one second
+        self.peak = 0
+
+    def add(self):
+        now = int(self.clock())
+        i = now % self.window
+        if self.stamps[i] != now:
+            self.stamps[i] = now
+            self.slots[i] = 0
+        self.slots[i] += 1
+        self.count += 1
+        if self.slots[i] > self.peak:
+            self.peak = self.slots[i]
+
+    def rate(self):
+        now = int(self.clock())
+        recent = sum(n for n, stamp in zip(self.slots, self.stamps) if now - stamp < self.window)
+        return recent / self.window
+
+
+class Instrumentation:
+    # Latency histograms per operation, COM worker jobs per operation and callback rates.
+    # While disabled a timed() function costs one attribute test per call and nothing is recorded.
+
+    def __init__(self, clock=time.perf_counter, rate_clock=time.monotonic):
+        self.enabled = False
+        self.clock = clock
+        self.rate_clock = rate_clock
+        self.histograms = {}
+        self.rates = {}
+        self._lock = threading.Lock()
+        # the operation running on each thread, worker jobs are booked on it
+        self._local = threading.local()
+
+    def timed(self, name):
+        # decorator recording every call of the function as the operation 'name'
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                return self.measure(name, func, *args, **kwargs)
+            return wrapper
+        return decorate
+
+    def measure(self, name, func, *args, **kwargs):
+        local = self._local
+        outer = getattr(local, "operation", None)
+        local.operation = name
+        start = self.clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = self.clock() - start
+            local.operation = outer
+            with self._lock:
+                self._histogram(name).add(elapsed)
+
+    def _histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        return histogram
+
+    def worker_job(self, name=None):
+        # ComWorker.on_submit hook, the histogram of an operation still running may have no call yet
+        if not self.enabled:
+            return
+        operation = getattr(self._local, "operation", None)
+        if operation is not None:
+            with self._lock:
+                self._histogram(operation).jobs += 1
+
+    def event(self, name):
+        if not self.enabled:
+            return
+        with self._lock:
+            rate = self.rates.get(name)
+            if rate is None:
+                rate = self.rates[name] = RateMeter(clock=self.rate_clock)
+            rate.add()
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.rates.clear()
+
+    def report(self):
+        lines = []
+        with self._lock:
+            for name, h in sorted(self.histograms.items()):
+                if not h.count:
+                    continue
+                lines.append("%s: %d calls, p50 <= %s, p90 <= %s, p99 <= %s, mean %s, max %s, %.1f worker jobs per call" % (name, h.count, format_seconds(h.percentile(50)), format_seconds(h.percentile(90)), format_seconds(h.percentile(99)), format_seconds(h.mean), format_seconds(h.max), h.jobs / h.count))
+            for name, rate in sorted(self.rates.items()):
+                lines.append("%s events: %d, %.1f per second over the last %d seconds, peak %d per second" % (name, rate.count, rate.rate(), rate.window, rate.peak))
+        return lines
+
+    def summary(self):
+        # short enough to be spoken
+        with self._lock:
+            return ", ".join("%s %s" % (name.replace("script_", "").replace("_", " "), format_seconds(h.percentile(50))) for name, h in sorted(self.histograms.items()) if h.count)
+
+
+instrumentation = Instrumentation()
@@ -40,6 +40,61 @@ class ISimpleAudioVolume(IUnknown):
     )
 
 
+class IChannelAudioVolume(IUnknown):
+    _iid_ = GUID("{1C158861-B533-4B30-B1CF-E853E51C59B8}")
+    _methods_ = (
+        # HRESULT GetChannelCount([out] UINT32 *pdwCount);
+        COMMETHOD(
+            [], HRESULT, "GetChannelCount", (["out"], POINTER(UINT32), "pdwCount")
+        ),
+        # HRESULT SetChannelVolume(
+        # [in] UINT32 dwIndex,
+        # [in] const float fLevel,
+        # [in] LPCGUID EventContext);
+        COMMETHOD(
+            [],
+            HRESULT,
+            "SetChannelVolume",
+            (["in"], UINT32, "dwIndex"),
+            (["in"], c_float, "fLevel"),
+            (["in"], POINTER(GUID), "EventContext"),
+        ),
+        # HRESULT GetChannelVolume(
+        # [in] UINT32 dwIndex,
+        # [out] float *pfLevel);
+        COMMETHOD(
+            [],
+            HRESULT,
+            "GetChannelVolume",
+            (["in"], UINT32, "dwIndex"),
+            (["out"], POINTER(c_float), "pfLevel"),
+        ),
+        # HRESULT SetAllVolumes(
+        # [in] UINT32 dwCount,
+        # [in] const float *pfVolumes,
+        # [in] LPCGUID EventContext);
+        COMMETHOD(
+            [],
+            HRESULT,
+            "SetAllVolumes",
+            (["in"], UINT32, "dwCount"),
+            (["in"], POINTER(c_float), "pfVolumes"),
+            (["in"], POINTER(GUID), "EventContext"),
+        ),
+        # HRESULT GetAllVolumes(
+        # [in] UINT32 dwCount,
+        # [out] float *pfVolumes);
+        # pfVolumes is a caller allocated array, it is passed in
+        COMMETHOD(
+            [],
+            HRESULT,
+            "GetAllVolumes",
+            (["in"], UINT32, "dwCount"),
+            (["in"], POINTER(c_float), "pfVolumes"),
+        ),
+    )
+
+
 class IAudioClient(IUnknown):
     _iid_ = GUID("{1cb9ad4c-dbfa-4c32-b178-c2f568a703b2}")
     _methods_ = (
@@ -0,0 +1,134 @@
+"""
+Audio backends.
+
+The add-on's global plugin gets every Core Audio object it uses from a
+backend instead of calling comtypes and AudioUtilities itself. The
+objects handed out keep the Core Audio interfaces (IAudioEndpointVolume,
+IAudioSessionManager2, IMMDeviceEnumerator, ...), so the registries,
+buses and meters it builds on them work unchanged on top of any backend:
+
+    backend = ComtypesBackend()
+    backend.initialize_thread()
+    endpoint = backend.default_endpoint()
+    endpoint.volume.GetMasterVolumeLevelScalar()
+    registry = SessionRegistry(
+        backend.session_manager(),
+        sinks=backend.sinks,
+        resolver=backend.process_resolver(),
+    )
+
+ComtypesBackend talks to Windows. The SimulatedBackend of
+benchmarks/fakes.py keeps the whole mixer in memory, with as many
+sessions as wanted, injected call latency and event storms, so the
+plugin can be run and measured on any platform.
+
+Only the plugin is covered. AudioUtilities and pycaw.magic create
+their objects through comtypes themselves, and
+EndpointVolumeState.refresh() reads the endpoint it was given with
+direct COM calls.
+
+Nothing here imports comtypes before it is used.
+"""
+
+from collections import namedtuple
+
+__all__ = ("AudioBackend", "ComtypesBackend", "Endpoint")
+
+# the default render endpoint, its IAudioEndpointVolume and IAudioMeterInformation
+Endpoint = namedtuple("Endpoint", "id volume meter")
+
+
+class AudioBackend:
+    """
+    What the add-on needs from the audio system.
+
+    Attributes
+    ----------
+    sinks : module
+        callback base classes (see pycaw.callbacks) for SessionRegistry
+        and the buses of pycaw.bus.
+    """
+
+    sinks = None
+
+    def initialize_thread(self):
+        """Prepare the calling thread for the calls below."""
+
+    def uninitialize_thread(self):
+        """Undo initialize_thread() before the thread ends."""
+
+    def default_endpoint(self):
+        """Endpoint of the default render device."""
+        raise NotImplementedError
+
+    def session_manager(self):
+        """IAudioSessionManager2 of the default render device."""
+        raise NotImplementedError
+
+    def device_enumerator(self):
+        """IMMDeviceEnumerator, for device notifications."""
+        raise NotImplementedError
+
+    def process_resolver(self):
+        """pycaw.processes.ProcessNameResolver for session pids."""
+        from pycaw.processes import process_name_resolver
+
+        return process_name_resolver
+
+    def use_registry(self, registry):
+        """Offer a live SessionRegistry to other lookups, None to stop."""
+
+
+class ComtypesBackend(AudioBackend):
+    """Core Audio through comtypes, must run in an MTA (see initialize_thread)."""
+
+    @property
+    def sinks(self):
+        from pycaw import callbacks
+
+        return callbacks
+
+    def initialize_thread(self):
+        import comtypes
+
+        comtypes.CoInitializeEx(comtypes.COINIT_MULTITHREADED)
+
+    def uninitialize_thread(self):
+        import comtypes
+
+        comtypes.CoUninitialize()
+
+    def default_endpoint(self):
+        from ctypes import POINTER, cast
+
+        from comtypes import CLSCTX_ALL
+
+        from pycaw.api.endpointvolume import (
+            IAudioEndpointVolume,
+            IAudioMeterInformation,
+        )
+        from pycaw.utils import AudioUtilities
+
+        device = AudioUtilities.GetSpeakers()
+        volume = device.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
+        meter = device.Activate(IAudioMeterInformation._iid_, CLSCTX_ALL, None)
+        return Endpoint(
+            device.GetId(),
+            cast(volume, POINTER(IAudioEndpointVolume)),
+            cast(meter, POINTER(IAudioMeterInformation)),
+        )
+
+    def session_manager(self):
+        from pycaw.utils import AudioUtilities
+
+        return AudioUtilities.GetAudioSessionManager()
+
+    def device_enumerator(self):
+        from pycaw.utils import AudioUtilities
+
+        return AudioUtilities.GetDeviceEnumerator()
+
+    def use_registry(self, registry):
+        from pycaw.utils import AudioUtilities
+
+        AudioUtilities.UseSessionRegistry(registry)
@@ -0,0 +1,204 @@
+"""
+Aggregated volume, mute and state of several sessions.
+
+VolumeBank is the aggregate behind pycaw.magic.MagicApp and
+pycaw.groups.AppGroup. It only needs the array module (numpy if
+installed), so it can be used without the MagicManager:
+
+    bank = VolumeBank()
+    bank.add(iid, volume, mute, state)
+    bank.volume, bank.mute, bank.state      # loudest, any muted, highest
+    bank.plan_apply(0.5)                    # -> [(iid, 0.5), ...] to write
+"""
+
+import threading
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+__all__ = ("VolumeBank",)
+
+
+class VolumeBank:
+    """
+    Volume, mute and state of a set of sessions,
+    stored in parallel arrays (array('f') / array('b')) indexed by slot.
+
+    -   every iid gets a slot, freed slots are reused.
+    -   the aggregate (loudest volume, any mute, highest state) is
+        maintained on every update, so reading it is O(1).
+        Only lowering the current maximum marks it dirty, it is then
+        recomputed once on the next read.
+    -   apply / scale / normalize compute all new volumes in one pass
+        (vectorized through a numpy view of the arrays, if numpy is
+        installed) and return only the slots that actually change.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.slots = {}
+        self.iids = []
+        self._free = []
+        self.volumes = array("f")
+        self.mutes = array("b")
+        self.states = array("b")
+        self._max_volume = None
+        self._dirty = False
+        self._muted = 0
+        # number of sessions per AudioSessionState value
+        self._state_counts = [0, 0, 0]
+
+    def __len__(self):
+        return len(self.slots)
+
+    def add(self, iid, volume, mute, state):
+        with self._lock:
+            if self._free:
+                slot = self._free.pop()
+                self.iids[slot] = iid
+                self.volumes[slot] = volume
+                self.mutes[slot] = mute
+                self.states[slot] = state
+            else:
+                slot = len(self.iids)
+                self.iids.append(iid)
+                self.volumes.append(volume)
+                self.mutes.append(mute)
+                self.states.append(state)
+            self.slots[iid] = slot
+            self._muted += bool(mute)
+            self._state_counts[state] += 1
+            self._raise(self.volumes[slot])
+
+    def remove(self, iid):
+        with self._lock:
+            slot = self.slots.pop(iid, None)
+            if slot is None:
+                return
+            self._muted -= bool(self.mutes[slot])
+            self._state_counts[self.states[slot]] -= 1
+            if self.volumes[slot] == self._max_volume:
+                self._dirty = True
+            self.iids[slot] = None
+            self.mutes[slot] = 0
+            self._free.append(slot)
+
+    def set_volume(self, iid, volume):
+        with self._lock:
+            slot = self.slots.get(iid)
+            if slot is None:
+                return
+            old = self.volumes[slot]
+            self.volumes[slot] = volume
+            if volume >= old:
+                self._raise(self.volumes[slot])
+            elif old == self._max_volume:
+                self._dirty = True
+
+    def set_mute(self, iid, mute):
+        with self._lock:
+            slot = self.slots.get(iid)
+            if slot is None:
+                return
+            self._muted += bool(mute) - bool(self.mutes[slot])
+            self.mutes[slot] = mute
+
+    def set_state(self, iid, state):
+        with self._lock:
+            slot = self.slots.get(iid)
+            if slot is None:
+                return
+            self._state_counts[self.states[slot]] -= 1
+            self._state_counts[state] += 1
+            self.states[slot] = state
+
+    def get(self, iid):
+        """(volume, mute) of a session, None if it is not in the bank."""
+        with self._lock:
+            slot = self.slots.get(iid)
+            if slot is None:
+                return None
+            return self.volumes[slot], self.mutes[slot]
+
+    def _raise(self, volume):
+        if self._max_volume is None or volume > self._max_volume:
+            self._max_volume = volume
+
+    @property
+    def volume(self):
+        """Volume of the loudest session, None without sessions."""
+        with self._lock:
+            if not self.slots:
+                return None
+            if self._dirty:
+                volumes = self.volumes
+                self._max_volume = max(volumes[slot] for slot in self.slots.values())
+                self._dirty = False
+            return self._max_volume
+
+    @property
+    def mute(self):
+        if not self.slots:
+            return None
+        return 1 if self._muted else 0
+
+    @property
+    def state(self):
+        if not self.slots:
+            return None
+        for state in (2, 1, 0):
+            if self._state_counts[state]:
+                return state
+
+    def _plan(self, compute):
+        """
+        compute(volumes) -> new volumes, run over all slots at once.
+        Returns [(iid, new_volume)] of the sessions that change.
+        """
+        with self._lock:
+            slots = list(self.slots.values())
+            if not slots:
+                return []
+            if numpy is not None:
+                current = numpy.frombuffer(self.volumes, dtype=numpy.float32)[slots]
+                new = numpy.clip(compute(current), 0.0, 1.0).astype(numpy.float32)
+                changed = numpy.nonzero(new != current)[0]
+                return [(self.iids[slots[i]], float(new[i])) for i in changed]
+            current = [self.volumes[slot] for slot in slots]
+            new = [max(0.0, min(1.0, v)) for v in compute(current)]
+            # compare in float32, like the array stores them
+            rounded = array("f", new)
+            return [
+                (self.iids[slot], new[i])
+                for i, slot in enumerate(slots)
+                if rounded[i] != current[i]
+            ]
+
+    def plan_mute(self, mute):
+        """iids of the sessions whose mute differs from mute."""
+        with self._lock:
+            mutes = self.mutes
+            iids = self.iids
+            return [
+                iids[slot]
+                for slot in self.slots.values()
+                if bool(mutes[slot]) != bool(mute)
+            ]
+
+    def plan_apply(self, volume):
+        return self._plan(lambda volumes: [volume] * len(volumes))
+
+    def plan_scale(self, factor):
+        if numpy is not None:
+            return self._plan(lambda volumes: volumes * factor)
+        return self._plan(lambda volumes: [v * factor for v in volumes])
+
+    def plan_normalize(self, target):
+        """Scale so the loudest session ends up at target."""
+        loudest = self.volume
+        if not loudest:
+            return self.plan_apply(target)
+        return self.plan_scale(target / loudest)
@@ -0,0 +1,397 @@
+"""
+One COM sink per event source, fanned out to many subscribers.
+
+Every helper in pycaw.callbacks serves a single subscriber, so N
+subscribers mean N registrations and N cross-apartment calls per event.
+The buses here register one sink and deliver each event to all their
+subscribers:
+
+    bus = EndpointVolumeBus(speakers.EndpointVolume)
+    bus.subscribe(on_volume, events=("notify",))    # on_volume("notify", n)
+    bus.subscribe(redraw, batched=True, coalesce=True)  # redraw([(event, args)])
+    bus.close()
+
+Synchronous subscribers are called on the thread that delivered the
+event. Batched subscribers get everything published during one frame
+as a list, from call_later (a timer thread by default). Each batched
+subscriber has its own queue of max_queue events. When it is full,
+overflow="drop_oldest" discards the oldest event, "drop_newest" the
+new one. coalesce=True keeps only the latest event of each name.
+
+EndpointVolumeBus publishes "notify" with the reused
+pycaw.notify.VolumeNotificationView. Batched subscribers get a frozen
+copy (pycaw.notify.freeze) with the same attributes instead.
+
+Sinks come from the 'sinks' module (pycaw.callbacks by default),
+benchmarks/fakes.py runs the buses without Windows.
+"""
+
+import logging
+import threading
+from collections import OrderedDict, deque
+
+from pycaw.notify import freeze
+
+log = logging.getLogger(__name__)
+
+__all__ = (
+    "DROP_NEWEST",
+    "DROP_OLDEST",
+    "DeviceBus",
+    "EndpointVolumeBus",
+    "EventBus",
+    "SessionEventsBus",
+    "Subscription",
+)
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
+
+def _timer_call_later(delay, callback):
+    timer = threading.Timer(delay, callback)
+    timer.daemon = True
+    timer.start()
+
+
+class Subscription:
+    """
+    One subscriber of an EventBus, returned by subscribe().
+
+    Counters
+    --------
+    delivered : int
+        events handed to the handler.
+    dropped : int
+        events lost to the overflow policy.
+    errors : int
+        handler calls that raised.
+    """
+
+    __slots__ = (
+        "handler",
+        "events",
+        "batched",
+        "max_queue",
+        "overflow",
+        "coalesce",
+        "queue",
+        "delivered",
+        "dropped",
+        "errors",
+    )
+
+    def __init__(self, handler, events, batched, max_queue, overflow, coalesce):
+        if overflow not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError("unknown overflow policy %r" % (overflow,))
+        self.handler = handler
+        self.events = frozenset(events) if events is not None else None
+        self.batched = batched
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.coalesce = coalesce
+        self.queue = OrderedDict() if coalesce else deque()
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def wants(self, event):
+        return self.events is None or event in self.events
+
+    def _enqueue(self, event, args):
+        queue = self.queue
+        if self.coalesce:
+            if event in queue:
+                queue.move_to_end(event)
+                queue[event] = args
+                self.dropped += 1
+                return
+        if len(queue) >= self.max_queue:
+            self.dropped += 1
+            if self.overflow == DROP_NEWEST:
+                return
+            if self.coalesce:
+                queue.popitem(last=False)
+            else:
+                queue.popleft()
+        if self.coalesce:
+            queue[event] = args
+        else:
+            queue.append((event, args))
+
+    def _take(self):
+        queue = self.queue
+        if self.coalesce:
+            batch = list(queue.items())
+        else:
+            batch = list(queue)
+        queue.clear()
+        return batch
+
+
+class EventBus:
+    """
+    Fans published events out to subscribers.
+
+    Parameters
+    ----------
+    call_later : callable
+        call_later(delay, callback), schedules batched delivery.
+    frame : float
+        seconds batched events are collected before delivery.
+    freeze : callable
+        freeze(event, args) -> args safe to keep, applied once per
+        event before it is queued for batched subscribers.
+
+    Counters
+    --------
+    published : int
+    batches : int
+        frames delivered to batched subscribers.
+    """
+
+    def __init__(self, call_later=_timer_call_later, frame=0.03, freeze=None):
+        self.call_later = call_later
+        self.frame = frame
+        self._freeze = freeze
+        self._lock = threading.Lock()
+        self._subscriptions = ()
+        self._scheduled = False
+        self.published = 0
+        self.batches = 0
+
+    def subscribe(
+        self,
+        handler,
+        events=None,
+        batched=False,
+        max_queue=256,
+        overflow=DROP_OLDEST,
+        coalesce=False,
+    ):
+        """
+        Call handler(event, *args) for every event (or those in 'events'),
+        or handler([(event, args), ...]) once per frame if batched.
+        """
+        subscription = Subscription(
+            handler, events, batched, max_queue, overflow, coalesce
+        )
+        with self._lock:
+            self._subscriptions = self._subscriptions + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions = tuple(
+                s for s in self._subscriptions if s is not subscription
+            )
+
+    def __len__(self):
+        return len(self._subscriptions)
+
+    def publish(self, event, *args):
+        self.published += 1
+        frozen = None
+        schedule = False
+        # the tuple is replaced, never mutated, so it is iterated without the lock
+        for subscription in self._subscriptions:
+            if not subscription.wants(event):
+                continue
+            if not subscription.batched:
+                if self._deliver(subscription, event, *args):
+                    subscription.delivered += 1
+                continue
+            if frozen is None:
+                frozen = self._freeze(event, args) if self._freeze else args
+            with self._lock:
+                subscription._enqueue(event, frozen)
+                if not self._scheduled:
+                    self._scheduled = schedule = True
+        if schedule:
+            self.call_later(self.frame, self.flush)
+
+    def flush(self):
+        """Deliver the queued events of all batched subscribers now."""
+        with self._lock:
+            self._scheduled = False
+            batches = [
+                (subscription, subscription._take())
+                for subscription in self._subscriptions
+                if subscription.batched and subscription.queue
+            ]
+        if batches:
+            self.batches += 1
+        for subscription, batch in batches:
+            if self._deliver(subscription, batch):
+                subscription.delivered += len(batch)
+
+    def _deliver(self, subscription, *args):
+        try:
+            subscription.handler(*args)
+        except Exception:
+            # one failing subscriber must not starve the others
+            subscription.errors += 1
+            log.exception("event subscriber %r failed", subscription.handler)
+            return False
+        return True
+
+    def stats(self):
+        return {
+            "published": self.published,
+            "batches": self.batches,
+            "subscribers": len(self._subscriptions),
+            "dropped": sum(s.dropped for s in self._subscriptions),
+            "errors": sum(s.errors for s in self._subscriptions),
+        }
+
+
+_sink_classes = {}
+
+
+def _get_sink_classes(sinks):
+    """Build (once per sinks module) the COM sinks publishing to a bus."""
+    try:
+        return _sink_classes[sinks.__name__]
+    except KeyError:
+        pass
+
+    class _EndpointVolume(sinks.AudioEndpointVolumeCallback):
+        def __init__(self, bus):
+            self.bus = bus
+
+        def on_notify_view(self, notification):
+            self.bus.publish("notify", notification)
+
+    class _SessionEvents(sinks.AudioSessionEvents):
+        def __init__(self, bus):
+            self.bus = bus
+
+        def on_display_name_changed(self, new_display_name, event_context):
+            self.bus.publish("display_name_changed", new_display_name)
+
+        def on_simple_volume_changed(self, new_volume, new_mute, event_context):
+            self.bus.publish("simple_volume_changed", new_volume, new_mute)
+
+        def on_state_changed(self, new_state, new_state_id):
+            self.bus.publish("state_changed", new_state, new_state_id)
+
+        def on_session_disconnected(self, disconnect_reason, disconnect_reason_id):
+            self.bus.publish(
+                "session_disconnected", disconnect_reason, disconnect_reason_id
+            )
+
+    class _Devices(sinks.MMNotificationClient):
+        def __init__(self, bus):
+            self.bus = bus
+
+        def on_default_device_changed(
+            self, flow, flow_id, role, role_id, default_device_id
+        ):
+            self.bus.publish(
+                "default_device_changed",
+                flow,
+                flow_id,
+                role,
+                role_id,
+                default_device_id,
+            )
+
+        def on_device_added(self, added_device_id):
+            self.bus.publish("device_added", added_device_id)
+
+        def on_device_removed(self, removed_device_id):
+            self.bus.publish("device_removed", removed_device_id)
+
+        def on_device_state_changed(self, device_id, new_state, new_state_id):
+            self.bus.publish(
+                "device_state_changed", device_id, new_state, new_state_id
+            )
+
+        def on_property_value_changed(self, device_id, property_struct, fmtid, pid):
+            self.bus.publish("property_value_changed", device_id, fmtid, pid)
+
+    classes = (_EndpointVolume, _SessionEvents, _Devices)
+    _sink_classes[sinks.__name__] = classes
+    return classes
+
+
+def _sinks_module(sinks):
+    if sinks is None:
+        from pycaw import callbacks as sinks
+    return sinks
+
+
+def _freeze_notify(event, args):
+    return (freeze(args[0]),)
+
+
+class EndpointVolumeBus(EventBus):
+    """
+    Volume notifications of one IAudioEndpointVolume.
+
+    Events
+    ------
+    notify(notification)
+        volume, mute, channels, channel_volumes and event_context.
+    """
+
+    def __init__(self, endpoint_volume, sinks=None, **kwargs):
+        kwargs.setdefault("freeze", _freeze_notify)
+        super().__init__(**kwargs)
+        self._endpoint_volume = endpoint_volume
+        self._sink = _get_sink_classes(_sinks_module(sinks))[0](self)
+        endpoint_volume.RegisterControlChangeNotify(self._sink)
+
+    def close(self):
+        if self._sink is not None:
+            self._endpoint_volume.UnregisterControlChangeNotify(self._sink)
+            self._sink = None
+
+
+class SessionEventsBus(EventBus):
+    """
+    Events of one IAudioSessionControl(2).
+
+    Events
+    ------
+    display_name_changed(new_display_name)
+    simple_volume_changed(new_volume, new_mute)
+    state_changed(new_state, new_state_id)
+    session_disconnected(disconnect_reason, disconnect_reason_id)
+    """
+
+    def __init__(self, session_control, sinks=None, **kwargs):
+        super().__init__(**kwargs)
+        self._session_control = session_control
+        self._sink = _get_sink_classes(_sinks_module(sinks))[1](self)
+        session_control.RegisterAudioSessionNotification(self._sink)
+
+    def close(self):
+        if self._sink is not None:
+            self._session_control.UnregisterAudioSessionNotification(self._sink)
+            self._sink = None
+
+
+class DeviceBus(EventBus):
+    """
+    Endpoint notifications of an IMMDeviceEnumerator.
+
+    Events
+    ------
+    default_device_changed(flow, flow_id, role, role_id, default_device_id)
+    device_added(added_device_id)
+    device_removed(removed_device_id)
+    device_state_changed(device_id, new_state, new_state_id)
+    property_value_changed(device_id, fmtid, pid)
+    """
+
+    def __init__(self, enumerator, sinks=None, **kwargs):
+        super().__init__(**kwargs)
+        self._enumerator = enumerator
+        self._sink = _get_sink_classes(_sinks_module(sinks))[2](self)
+        enumerator.RegisterEndpointNotificationCallback(self._sink)
+
+    def close(self):
+        if self._sink is not None:
+            self._enumerator.UnregisterEndpointNotificationCallback(self._sink)
+            self._sink = None
@@ -9,7 +9,8 @@ from pycaw.api.audiopolicy import (
 )
 from pycaw.api.endpointvolume import IAudioEndpointVolumeCallback
 from pycaw.api.mmdeviceapi import IMMNotificationClient
-from pycaw.utils import AudioSession
+from pycaw.notify import VolumeNotificationView
+from pycaw.utils import AudioSession, device_enumerator_cache
 
 
 class AudioSessionNotification(COMObject):
@@ -225,30 +226,36 @@ class AudioEndpointVolumeCallback(COMObject):
             channel_volumes : list : float
                 the channel volumes in range(0, 1)
                 len(channel_volumes) == channels
+
+    or, on hot paths, this one instead:
+
+    def on_notify_view(self, notification):
+        Same event, without allocations per call.
+            notification : pycaw.notify.VolumeNotificationView
+                volume, mute, event_context, channels and channel_volumes,
+                reused for the next notification.
     """
 
     _com_interfaces_ = (IAudioEndpointVolumeCallback,)
 
+    _view = None
+
     def OnNotify(self, pNotify):
         """Fired by Windows, when the audio device volume/mute changed"""
-
-        # get the data of the PAUDIO_VOLUME_NOTIFICATION_DATA Structure
-        notify_data = pNotify.contents
-
-        channels = notify_data.nChannels
-        # _.afChannelVolumes is a c_float_Array_8 -> convert to list
-        channel_volumes = list(notify_data.afChannelVolumes)
-        # remove from 8 value list everything out of channel range
-        channel_volumes = channel_volumes[:channels]
-
-        event_context = pointer(notify_data.guidEventContext)
-
+        # decode the PAUDIO_VOLUME_NOTIFICATION_DATA into a reused view
+        view = self._view
+        if view is None:
+            view = self._view = VolumeNotificationView()
+        self.on_notify_view(view.decode(pNotify))
+
+    def on_notify_view(self, notification):
+        """pycaw user interface, calls on_notify unless overridden"""
         self.on_notify(
-            notify_data.fMasterVolume,
-            notify_data.bMuted,
-            event_context,
-            channels,
-            channel_volumes,
+            notification.volume,
+            notification.mute,
+            pointer(notification.event_context),
+            notification.channels,
+            notification.channel_volumes[: notification.channels],
         )
 
     def on_notify(self, new_volume, new_mute, event_context, channels, channel_volumes):
@@ -308,6 +315,12 @@ class MMNotificationClient(COMObject):
                 GUID of the changed property.
             pid: int
                 PID of the changed property.
+
+    Note
+    ----
+    Every topology change (default device, added, removed, state)
+    invalidates pycaw.utils.device_enumerator_cache before the
+    user interface method is called.
     """
 
     _com_interfaces_ = (IMMNotificationClient,)
@@ -317,17 +330,21 @@ class MMNotificationClient(COMObject):
     DataFlow = ["eRender", "eCapture", "eAll", "EDataFlow_enum_count"]
 
     def OnDefaultDeviceChanged(self, flow_id, role_id, default_device_id):
+        device_enumerator_cache.invalidate()
         flow = self.DataFlow[flow_id]
         role = self.Roles[role_id]
         self.on_default_device_changed(flow, flow_id, role, role_id, default_device_id)
 
     def OnDeviceAdded(self, added_device_id):
+        device_enumerator_cache.invalidate()
         self.on_device_added(added_device_id)
 
     def OnDeviceRemoved(self, removed_device_id):
+        device_enumerator_cache.invalidate()
         self.on_device_removed(removed_device_id)
 
     def OnDeviceStateChanged(self, device_id, new_state_id):
+        device_enumerator_cache.invalidate()
         new_state = self.DeviceStates[new_state_id]
         self.on_device_state_changed(device_id, new_state, new_state_id)
 
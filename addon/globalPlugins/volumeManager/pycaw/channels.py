@@ -0,0 +1,142 @@
+"""
+Per-channel volumes and balance.
+
+ChannelVolumes reads and writes all channels of an IAudioEndpointVolume
+(device) or an IChannelAudioVolume (session) in bulk. The levels live
+in one array('f') that is reused for every read, write and
+notification, so keeping it current allocates nothing:
+
+    channels = ChannelVolumes(speakers.EndpointVolume)
+    channels.read()         # -> array('f', [0.5, 0.5])
+    channels.set_balance(-0.5)  # right channel at half the left
+    channels.balance        # -> -0.5
+
+An IChannelAudioVolume is read and written with one GetAllVolumes /
+SetAllVolumes call, an IAudioEndpointVolume has per-channel methods
+only, of which just the channels that changed are written.
+
+Balance is -1.0 (left only) to 1.0 (right only). Left and right follow
+the KSAUDIO_SPEAKER channel order (front, back, side), center and LFE
+are kept at the louder side's level.
+"""
+
+from array import array
+from ctypes import c_float, memmove
+
+__all__ = ("ChannelVolumes", "LEFT_CHANNELS", "RIGHT_CHANNELS")
+
+# FL, FR, FC, LFE, BL, BR, SL, SR
+LEFT_CHANNELS = frozenset((0, 4, 6))
+RIGHT_CHANNELS = frozenset((1, 5, 7))
+
+
+class ChannelVolumes:
+    """
+    Channel levels of one control.
+
+    Parameters
+    ----------
+    control : POINTER(IAudioEndpointVolume) or POINTER(IChannelAudioVolume)
+
+    Counters
+    --------
+    reads : int
+        COM reads made (one per channel for an endpoint).
+    writes : int
+        COM writes made.
+    """
+
+    def __init__(self, control):
+        self._control = control
+        self._bulk = hasattr(control, "GetAllVolumes")
+        self.count = control.GetChannelCount()
+        self.values = array("f", bytes(4 * self.count))
+        # SetAllVolumes/GetAllVolumes take a float*, this one is reused
+        self._buffer = (c_float * self.count)() if self._bulk else None
+        self._levels = array("f", self.values)
+        self.reads = 0
+        self.writes = 0
+
+    def read(self):
+        """Read every channel into values, which is returned."""
+        values = self.values
+        control = self._control
+        if self._bulk:
+            control.GetAllVolumes(self.count, self._buffer)
+            memmove(values.buffer_info()[0], self._buffer, 4 * self.count)
+            self.reads += 1
+        else:
+            for i in range(self.count):
+                values[i] = control.GetChannelVolumeLevelScalar(i)
+            self.reads += self.count
+        return values
+
+    def update(self, levels, count=None):
+        """
+        Take levels that are already known, e.g. from OnNotify,
+        without a COM call. Extra levels beyond count are ignored.
+        """
+        values = self.values
+        for i in range(min(self.count, len(levels) if count is None else count)):
+            values[i] = levels[i]
+
+    def write(self, levels, event_context=None):
+        """Write levels, only if (and for an endpoint only where) they differ."""
+        values = self.values
+        changed = [i for i in range(self.count) if abs(values[i] - levels[i]) > 1e-4]
+        if not changed:
+            return 0
+        control = self._control
+        # the writes may notify and update values right away, levels stays untouched
+        for i in changed:
+            values[i] = levels[i]
+        if self._bulk:
+            memmove(self._buffer, values.buffer_info()[0], 4 * self.count)
+            control.SetAllVolumes(self.count, self._buffer, event_context)
+            self.writes += 1
+            return 1
+        for i in changed:
+            control.SetChannelVolumeLevelScalar(i, levels[i], event_context)
+        self.writes += len(changed)
+        return len(changed)
+
+    def _sides(self):
+        values = self.values
+        left = max((values[i] for i in LEFT_CHANNELS if i < self.count), default=0.0)
+        right = max((values[i] for i in RIGHT_CHANNELS if i < self.count), default=0.0)
+        return left, right
+
+    @property
+    def balance(self):
+        """-1.0 (left) to 1.0 (right) of the latest known levels."""
+        left, right = self._sides()
+        level = max(left, right)
+        if self.count < 2 or level <= 0:
+            return 0.0
+        return (right - left) / level
+
+    def set_balance(self, balance, event_context=None):
+        """
+        Attenuate the quieter side so that balance is reached,
+        the louder side keeps its level. Returns the writes made.
+        """
+        balance = min(1.0, max(-1.0, balance))
+        if self.count < 2:
+            return 0
+        level = max(self._sides())
+        left = level * min(1.0, 1.0 - balance)
+        right = level * min(1.0, 1.0 + balance)
+        levels = self._levels
+        for i in range(self.count):
+            if i in LEFT_CHANNELS:
+                levels[i] = left
+            elif i in RIGHT_CHANNELS:
+                levels[i] = right
+            else:
+                levels[i] = level
+        return self.write(levels, event_context)
+
+    def pan(self, delta, event_context=None):
+        """Move the balance by delta, returns the new balance."""
+        self.set_balance(round(self.balance + delta, 2), event_context)
+        return self.balance
@@ -0,0 +1,196 @@
+"""
+Audio endpoint devices and their property stores.
+
+AudioUtilities.GetAllDevices and CreateDevice are built on
+all_devices() and create_device():
+
+    devices = all_devices(AudioUtilities.GetDeviceEnumerator())
+    devices[0].FriendlyName
+"""
+
+import warnings
+from collections.abc import Mapping
+
+import comtypes
+from _ctypes import COMError
+
+from pycaw.api.endpointvolume import IAudioEndpointVolume, IAudioMeterInformation
+from pycaw.api.mmdeviceapi.depend.structures import PROPERTYKEY
+from pycaw.constants import DEVICE_STATE, STGM, AudioDeviceState, EDataFlow
+
+__all__ = ("AudioDevice", "PropertyStore", "all_devices", "create_device")
+
+
+class PropertyStore(Mapping):
+    """
+    Lazy, read-only mapping over an IPropertyStore.
+
+    Keys are the same strings the eager dict used: str(PROPERTYKEY),
+    e.g. "{A45C254E-DF1C-4EFD-8020-67D146A850E0} 14".
+    A PROPERTYKEY instance is accepted as key as well.
+
+    Values are read from the store on first access and memoized.
+    The store handle is kept open for the lifetime of the mapping.
+    Iterating or len() only reads the keys (GetCount/GetAt).
+
+    Use prefetch(keys) to read several values in one go,
+    prefetch() without arguments reads everything.
+    """
+
+    # VT_EMPTY, returned by GetValue for keys the store does not have.
+    _VT_EMPTY = 0
+
+    def __init__(self, store, dev=None):
+        self._store = store
+        self._dev = dev
+        self._values = {}
+        self._missing = set()
+        # list of (name, PROPERTYKEY), filled on first iteration
+        self._keys = None
+
+    @staticmethod
+    def _normalize(key):
+        if isinstance(key, PROPERTYKEY):
+            return str(key).upper(), key
+        name = key.upper()
+        fmtid, pid = name.rsplit(" ", 1)
+        pk = PROPERTYKEY()
+        pk.fmtid = comtypes.GUID(fmtid)
+        pk.pid = int(pid)
+        return name, pk
+
+    def _fetch(self, name, pk):
+        try:
+            value = self._store.GetValue(pk)
+            if value.vt == self._VT_EMPTY:
+                self._missing.add(name)
+                return
+            v = value.GetValue()
+        except COMError as exc:
+            warnings.warn(
+                "COMError attempting to get property %r "
+                "from device %r: %r" % (name, self._dev, exc)
+            )
+            self._missing.add(name)
+            return
+        value.clear()
+        self._values[name] = v
+
+    def __getitem__(self, key):
+        try:
+            name, pk = self._normalize(key)
+        except ValueError:
+            raise KeyError(key)
+        if name not in self._values:
+            if self._store is None or name in self._missing:
+                raise KeyError(key)
+            self._fetch(name, pk)
+            if name not in self._values:
+                raise KeyError(key)
+        return self._values[name]
+
+    def _get_keys(self):
+        if self._keys is None:
+            keys = []
+            if self._store is not None:
+                for j in range(self._store.GetCount()):
+                    try:
+                        pk = self._store.GetAt(j)
+                    except COMError as exc:
+                        warnings.warn(
+                            "COMError attempting to get property %r "
+                            "from device %r: %r" % (j, self._dev, exc)
+                        )
+                        continue
+                    keys.append((str(pk).upper(), pk))
+            self._keys = keys
+        return self._keys
+
+    def __iter__(self):
+        return (name for name, _ in self._get_keys())
+
+    def __len__(self):
+        return len(self._get_keys())
+
+    def prefetch(self, keys=None):
+        """Read and memoize the given keys (all keys if None)."""
+        if self._store is None:
+            return self
+        if keys is None:
+            pairs = self._get_keys()
+        else:
+            pairs = [self._normalize(key) for key in keys]
+        for name, pk in pairs:
+            if name not in self._values and name not in self._missing:
+                self._fetch(name, pk)
+        return self
+
+
+class AudioDevice:
+    """
+    http://stackoverflow.com/a/20982715/185510
+    """
+
+    def __init__(self, id, state, properties, dev):
+        self.id = id
+        self.state = state
+        self.properties = properties
+        self._dev = dev
+        self._volume = None
+        self._meter = None
+
+    def __str__(self):
+        return "AudioDevice: %s" % (self.FriendlyName)
+
+    DEVPKEY_Device_FriendlyName = "{a45c254e-df1c-4efd-8020-67d146a850e0} 14".upper()
+
+    @property
+    def FriendlyName(self):
+        value = self.properties.get(self.DEVPKEY_Device_FriendlyName)
+        return value
+
+    @property
+    def EndpointVolume(self):
+        if self._volume is None:
+            iface = self._dev.Activate(
+                IAudioEndpointVolume._iid_, comtypes.CLSCTX_ALL, None
+            )
+            self._volume = iface.QueryInterface(IAudioEndpointVolume)
+        return self._volume
+
+    @property
+    def Meter(self):
+        if self._meter is None:
+            iface = self._dev.Activate(
+                IAudioMeterInformation._iid_, comtypes.CLSCTX_ALL, None
+            )
+            self._meter = iface.QueryInterface(IAudioMeterInformation)
+        return self._meter
+
+
+def create_device(dev):
+    """AudioDevice of an IMMDevice, None for None."""
+    if dev is None:
+        return None
+    id = dev.GetId()
+    state = dev.GetState()
+    store = dev.OpenPropertyStore(STGM.STGM_READ.value)
+    properties = PropertyStore(store, dev)
+    return AudioDevice(id, AudioDeviceState(state), properties, dev)
+
+
+def all_devices(enumerator):
+    """AudioDevice of every endpoint of an IMMDeviceEnumerator, in any state."""
+    devices = []
+    if enumerator is None:
+        return devices
+    collection = enumerator.EnumAudioEndpoints(
+        EDataFlow.eAll.value, DEVICE_STATE.MASK_ALL.value
+    )
+    if collection is None:
+        return devices
+    for i in range(collection.GetCount()):
+        dev = collection.Item(i)
+        if dev is not None:
+            devices.append(create_device(dev))
+    return devices
@@ -0,0 +1,201 @@
+"""
+Cached state of one IAudioEndpointVolume.
+
+AudioEndpointVolumeCallback.OnNotify already delivers the master volume,
+mute and channel volumes on every change, so reads don't need a
+cross-process GetMasterVolumeLevelScalar per call:
+
+    state = EndpointVolumeState(AudioUtilities.GetSpeakers().EndpointVolume)
+    state.volume        # served from memory
+    state.set_volume(0.5)
+    state.close()
+
+EndpointSimpleVolume answers like an ISimpleAudioVolume on top of the
+state, so the master volume can be handled like a session without
+touching the methods of the COM pointer.
+
+A read falls back to a real COM read when no notification arrived
+for 'max_age' seconds, in case a notification got lost.
+
+The callback sink is taken from the 'sinks' module (pycaw.callbacks by
+default), benchmarks/fakes.py provides a FakeAudioEndpointVolume to
+run it without Windows. Given a pycaw.bus.EndpointVolumeBus, the state
+subscribes to it instead of registering a sink of its own.
+"""
+
+import time
+
+from pycaw.channels import ChannelVolumes
+
+__all__ = ("EndpointSimpleVolume", "EndpointVolumeState")
+
+_sink_classes = {}
+
+
+def _get_sink_class(sinks):
+    try:
+        return _sink_classes[sinks.__name__]
+    except KeyError:
+        pass
+
+    class _Callback(sinks.AudioEndpointVolumeCallback):
+        def __init__(self, state):
+            self.state = state
+
+        def on_notify_view(self, notification):
+            self.state._update(
+                notification.volume,
+                notification.mute,
+                notification.channel_volumes,
+                notification.channels,
+            )
+
+    _sink_classes[sinks.__name__] = _Callback
+    return _Callback
+
+
+class EndpointVolumeState:
+    """
+    Master volume / mute of an endpoint, kept current by OnNotify.
+
+    Parameters
+    ----------
+    endpoint_volume : POINTER(IAudioEndpointVolume)
+    sinks : module
+        provides AudioEndpointVolumeCallback.
+    max_age : float
+        seconds without notification after which a read goes to COM.
+    clock : callable
+        returns seconds, time.monotonic by default.
+    bus : pycaw.bus.EndpointVolumeBus
+        shared notification sink of the endpoint, optional.
+
+    Counters
+    --------
+    hits : int
+        reads served from memory.
+    refreshes : int
+        reads that went to COM.
+    notifications : int
+        OnNotify calls received.
+    """
+
+    def __init__(
+        self, endpoint_volume, sinks=None, max_age=5.0, clock=time.monotonic, bus=None
+    ):
+        self._endpoint_volume = endpoint_volume
+        self.max_age = max_age
+        self._clock = clock
+        self.hits = 0
+        self.refreshes = 0
+        self.notifications = 0
+        self._volume = None
+        self._mute = None
+        self._updated = None
+        self.refresh()
+        # kept current by OnNotify, see channel_volumes
+        self.channels = ChannelVolumes(endpoint_volume)
+        self.channels.read()
+        self._bus = bus
+        self._callback = None
+        self._subscription = None
+        if bus is not None:
+            self._subscription = bus.subscribe(self._on_bus_notify, events=("notify",))
+            return
+        if sinks is None:
+            from pycaw import callbacks as sinks
+        self._callback = _get_sink_class(sinks)(self)
+        self._endpoint_volume.RegisterControlChangeNotify(self._callback)
+
+    def close(self):
+        if self._subscription is not None:
+            self._bus.unsubscribe(self._subscription)
+            self._subscription = None
+        if self._callback is not None:
+            self._endpoint_volume.UnregisterControlChangeNotify(self._callback)
+            self._callback = None
+
+    def _on_bus_notify(self, event, notification):
+        self._update(
+            notification.volume,
+            notification.mute,
+            notification.channel_volumes,
+            notification.channels,
+        )
+
+    def refresh(self):
+        """Read volume and mute from COM."""
+        self.refreshes += 1
+        self._volume = self._endpoint_volume.GetMasterVolumeLevelScalar()
+        self._mute = self._endpoint_volume.GetMute()
+        self._updated = self._clock()
+
+    def _fresh(self):
+        if self._clock() - self._updated > self.max_age:
+            self.refresh()
+        else:
+            self.hits += 1
+
+    def _update(self, new_volume, new_mute, channel_volumes, channels=None):
+        self.notifications += 1
+        self._volume = new_volume
+        self._mute = new_mute
+        self.channels.update(channel_volumes, channels)
+        self._updated = self._clock()
+
+    @property
+    def volume(self):
+        self._fresh()
+        return self._volume
+
+    @property
+    def channel_volumes(self):
+        """array('f') of the channel levels, updated in place."""
+        return self.channels.values
+
+    @property
+    def mute(self):
+        self._fresh()
+        return self._mute
+
+    def set_volume(self, level, event_context=None):
+        self._endpoint_volume.SetMasterVolumeLevelScalar(level, event_context)
+        # write-through, OnNotify will confirm
+        self._volume = level
+
+    def set_mute(self, mute, event_context=None):
+        self._endpoint_volume.SetMute(mute, event_context)
+        self._mute = mute
+
+
+class EndpointSimpleVolume:
+    """
+    ISimpleAudioVolume-like view of an EndpointVolumeState.
+
+    Reads are served by the state, writes go to the endpoint through it.
+
+    Parameters
+    ----------
+    state : EndpointVolumeState
+    name : str
+        shown where a session shows its display name.
+    """
+
+    def __init__(self, state, name=""):
+        self.state = state
+        self.name = name
+
+    def __repr__(self):
+        return f"<EndpointSimpleVolume name='{self.name}'/>"
+
+    def GetMasterVolume(self):
+        return self.state.volume
+
+    def SetMasterVolume(self, level, event_context=None):
+        self.state.set_volume(level, event_context)
+
+    def GetMute(self):
+        return self.state.mute
+
+    def SetMute(self, mute, event_context=None):
+        self.state.set_mute(mute, event_context)
@@ -0,0 +1,222 @@
+"""
+Registry sessions grouped by executable.
+
+Browsers, Teams and many games open several sessions, which the
+registry lists one by one under the same name. AppGroups merges them
+into one AppGroup per executable, the way pycaw.magic.MagicApp merges
+its sessions, but driven by a SessionRegistry instead of the
+MagicManager. Groups are updated from the registry's events: a new or
+expired session is added to or removed from its group's VolumeBank,
+no list is merged again.
+
+An AppGroup answers like an ISimpleAudioVolume, so it can be handed to
+code written for a single session:
+
+    groups = AppGroups(registry)
+    chrome = groups.get("chrome.exe")
+    chrome.GetMasterVolume()            # loudest session, no COM call
+    chrome.SetMasterVolume(0.5, None)   # one pass, only differing sessions
+    chrome.SetMute(1, None)
+    groups.close()
+
+Like MagicApp, the volume of a group is that of its loudest session,
+it is muted if any session is, and setting either applies it to all
+sessions.
+"""
+
+import threading
+
+from pycaw.bank import VolumeBank
+
+__all__ = ("AppGroup", "AppGroups")
+
+
+def _read_volume(entry):
+    volume = entry.volume
+    return volume.GetMasterVolume(), volume.GetMute()
+
+
+class AppGroup:
+    """
+    The sessions of one executable, see AppGroups.
+
+    Attributes
+    ----------
+    exe : str
+        lower case executable name.
+    writes : int
+        session volume / mute writes made by the group.
+    """
+
+    def __init__(self, exe):
+        self.exe = exe
+        self._lock = threading.Lock()
+        # key -> SessionEntry, in the order the sessions appeared
+        self._entries = {}
+        self._bank = VolumeBank()
+        self.writes = 0
+
+    def __repr__(self):
+        return f"<AppGroup exe='{self.exe}' sessions='{len(self)}'/>"
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def name(self):
+        """Name of the oldest session, the executable name without sessions."""
+        with self._lock:
+            for entry in self._entries.values():
+                return entry.name
+        return self.exe
+
+    def entries(self):
+        with self._lock:
+            return list(self._entries.values())
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries)
+
+    def add(self, entry, volume, mute):
+        with self._lock:
+            self._entries[entry.key] = entry
+        self._bank.add(entry.key, volume, mute, entry.state)
+
+    def remove(self, key):
+        with self._lock:
+            if self._entries.pop(key, None) is None:
+                return
+        self._bank.remove(key)
+
+    def values(self, key):
+        """(volume, mute) known for one session, None if it is not in the group."""
+        return self._bank.get(key)
+
+    def changed(self, entry):
+        """Take over the volume / mute an entry reported."""
+        self._bank.set_volume(entry.key, entry.level)
+        self._bank.set_mute(entry.key, entry.muted)
+
+    def state_changed(self, entry):
+        self._bank.set_state(entry.key, entry.state)
+
+    @property
+    def state(self):
+        """Highest AudioSessionState of the sessions, None without sessions."""
+        return self._bank.state
+
+    # ____ ISimpleAudioVolume ____
+
+    def GetMasterVolume(self):
+        volume = self._bank.volume
+        return 0.0 if volume is None else volume
+
+    def SetMasterVolume(self, level, event_context):
+        entries = self._entries
+        for key, volume in self._bank.plan_apply(level):
+            entry = entries.get(key)
+            if entry is None:
+                continue
+            entry.volume.SetMasterVolume(volume, event_context)
+            self._bank.set_volume(key, volume)
+            self.writes += 1
+
+    def GetMute(self):
+        return self._bank.mute or 0
+
+    def SetMute(self, mute, event_context):
+        entries = self._entries
+        for key in self._bank.plan_mute(mute):
+            entry = entries.get(key)
+            if entry is None:
+                continue
+            entry.volume.SetMute(mute, event_context)
+            self._bank.set_mute(key, mute)
+            self.writes += 1
+
+
+class AppGroups:
+    """
+    AppGroup per executable of a SessionRegistry.
+
+    Parameters
+    ----------
+    registry : pycaw.registry.SessionRegistry
+        optional, its entries are added and its events followed.
+    read : callable
+        read(entry) -> (volume, mute) of a new session, reads its
+        ISimpleAudioVolume by default.
+
+    Sessions without an executable name (system sounds, processes
+    already gone) are not grouped.
+    """
+
+    def __init__(self, registry=None, read=_read_volume):
+        self._read = read
+        self._lock = threading.Lock()
+        self._groups = {}
+        # session key -> its group
+        self._by_key = {}
+        self._registry = registry
+        if registry is not None:
+            for entry in registry.entries():
+                self.add(entry)
+            registry.subscribe(self._on_registry_event)
+
+    def close(self):
+        if self._registry is not None:
+            self._registry.unsubscribe(self._on_registry_event)
+            self._registry = None
+
+    def __len__(self):
+        return len(self._groups)
+
+    def groups(self):
+        with self._lock:
+            return list(self._groups.values())
+
+    def get(self, exe):
+        return self._groups.get(exe.lower())
+
+    def group_of(self, key):
+        """Group of a session key, None if the session is not grouped."""
+        return self._by_key.get(key)
+
+    def add(self, entry):
+        if not entry.exe or entry.key in self._by_key:
+            return
+        if entry.level is not None:
+            volume, mute = entry.level, entry.muted
+        else:
+            volume, mute = self._read(entry)
+        exe = entry.exe.lower()
+        with self._lock:
+            group = self._groups.get(exe)
+            if group is None:
+                group = self._groups[exe] = AppGroup(exe)
+            self._by_key[entry.key] = group
+        group.add(entry, volume, mute)
+
+    def remove(self, key):
+        with self._lock:
+            group = self._by_key.pop(key, None)
+            if group is None:
+                return
+            group.remove(key)
+            if not len(group):
+                del self._groups[group.exe]
+
+    def _on_registry_event(self, event, entry):
+        if event == "added":
+            self.add(entry)
+        elif event == "removed":
+            self.remove(entry.key)
+        else:
+            group = self._by_key.get(entry.key)
+            if group is None:
+                return
+            if event == "volume":
+                group.changed(entry)
+            elif event == "state":
+                group.state_changed(entry)
@@ -40,8 +40,6 @@ import warnings
 sys.coinit_flags = 0  # noqa: E402
 
 # flake8: noqa: E402
-import psutil
-
 from ctypes import pointer
 from _ctypes import COMError
 from comtypes import GUID, COMObject
@@ -52,7 +50,9 @@ from pycaw.api.audiopolicy import (
     IAudioSessionEvents,
     IAudioSessionNotification,
 )
+from pycaw.bank import VolumeBank
 from pycaw.constants import AudioSessionState
+from pycaw.processes import NoSuchProcess, process_name_resolver
 from pycaw.utils import AudioUtilities
 
 log = logging.getLogger(__name__)
@@ -181,8 +181,13 @@ class MagicManager(COMObject):
         # add sessions to session_manager
         log.debug("adding sessions manually")
 
-        for i in range(count):
-            ctl = sessionEnumerator.GetSession(i)
+        ctls = [sessionEnumerator.GetSession(i) for i in range(count)]
+        # resolve all app execs in one pass,
+        # _MagicRootSession._get_app_exec() is then served from the cache
+        process_name_resolver.resolve(
+            {ctl.QueryInterface(IAudioSessionControl2).GetProcessId() for ctl in ctls}
+        )
+        for ctl in ctls:
             cls.OnSessionCreated(ctl)
 
         # register clean up mechanism, when script is closed.
@@ -305,7 +310,7 @@ class MagicManager(COMObject):
         # try to remove session from the magic_app dict which is in possession
         if magic_app:
             # pop(iid, None) must not be necessary
-            magic_app.magic_root_sessions.pop(iid)
+            magic_app.remove_magic_root_session(iid)
 
             # remove circular references
             magic_root_session.magic_app = None
@@ -362,38 +367,11 @@ class MagicManager(COMObject):
         cls.magic_activated = None
 
 
-# TODO:
-# Make it more pythonic and beautifull
-def for_session_in_sessions(func):
-    """Decorator for looping through sessions in MagicApp."""
-
-    def wrapper(self, *args):
-        if self.magic_root_sessions is None:
-            # nothing to change
-            return
-
-        # RuntimeError: dictionary changed size during iteration
-        temp_sessions = dict(self.magic_root_sessions)
-        rv = [func(self, session, *args) for session in temp_sessions.values()]
-
-        # max([None, None]) -> TypeError: '>' not supported ...
-        rv_no_none = [r for r in rv if r is not None]
-
-        # when rv = [None] -> rv_no_none = None
-        if rv_no_none:
-            # return if multiple sessions the one
-            # with mute true or the highest volume
-            # or the session with the highest AudioSessionState.value
-            return max(rv_no_none)
-
-    return wrapper
-
-
 class _MagicAudioControl:
     """Simplifies the audio control by using the self.properties."""
 
     # TODO:
-    # (this TODO applies to MagicApp, MagicSession, for_session_in_sessions)
+    # (this TODO applies to MagicApp, MagicSession, _MagicVolumeBank)
     # handle incorrect input or raise exception.
     # also handle failing com calls
     # (failing in terms of the retrieved value is not 'S_OK')
@@ -416,6 +394,17 @@ class _MagicAudioControl:
             return new
 
 
+class _MagicVolumeBank(VolumeBank):
+    """VolumeBank reporting the state as AudioSessionState."""
+
+    @property
+    def state(self):
+        state = super().state
+        if state is None:
+            return None
+        return AudioSessionState(state)
+
+
 class MagicApp(_MagicAudioControl):
     """
     When instantiated with at least one app_execs name,
@@ -443,6 +432,8 @@ class MagicApp(_MagicAudioControl):
 
         # latest dict of matching sessions
         self.magic_root_sessions = {}
+        # their volume / mute / state, see _MagicVolumeBank
+        self._bank = _MagicVolumeBank()
 
         # callbacks
         self.volume_callback = volume_callback
@@ -462,6 +453,12 @@ class MagicApp(_MagicAudioControl):
         # tells the magic_root_session to create a connection
         # for callbacks.
         magic_root_session.use_magic_app(self)
+        self._bank.add(
+            iid,
+            magic_root_session.volume,
+            magic_root_session.mute,
+            magic_root_session.state.value,
+        )
 
         log.info(f"Added {magic_root_session} to {self}.")
 
@@ -476,31 +473,53 @@ class MagicApp(_MagicAudioControl):
             f"controls-sessions='{len(self.magic_root_sessions)}'/>"
         )
 
+    def remove_magic_root_session(self, iid):
+        """called by MagicManager, when a session of this app expired"""
+        self._bank.remove(iid)
+        return self.magic_root_sessions.pop(iid)
+
     # easy control:
+    # reads are answered by the _MagicVolumeBank aggregate,
+    # writes only touch the sessions whose value differs.
     @property
-    @for_session_in_sessions
-    def state(self, magic_root_session):
-        return magic_root_session.state
+    def state(self):
+        return self._bank.state
 
     @property
-    @for_session_in_sessions
-    def volume(self, magic_root_session):
-        return magic_root_session.volume
+    def volume(self):
+        return self._bank.volume
 
     @volume.setter
-    @for_session_in_sessions
-    def volume(self, magic_root_session, volume):
-        magic_root_session._sav.SetMasterVolume(volume, self.guid)
+    def volume(self, volume):
+        self._set_volumes(self._bank.plan_apply(volume))
+
+    def scale_volume(self, factor):
+        """Multiply the volume of every session by factor."""
+        self._set_volumes(self._bank.plan_scale(factor))
+
+    def normalize_volume(self, target=1.0):
+        """Scale all sessions so the loudest one is at target."""
+        self._set_volumes(self._bank.plan_normalize(target))
+
+    def _set_volumes(self, plan):
+        sessions = self.magic_root_sessions
+        for iid, volume in plan:
+            magic_root_session = sessions.get(iid)
+            if magic_root_session is None:
+                continue
+            magic_root_session._sav.SetMasterVolume(volume, self.guid)
+            self._bank.set_volume(iid, volume)
 
     @property
-    @for_session_in_sessions
-    def mute(self, magic_root_session):
-        return magic_root_session.mute
+    def mute(self):
+        return self._bank.mute
 
     @mute.setter
-    @for_session_in_sessions
-    def mute(self, magic_root_session, mute):
-        magic_root_session._sav.SetMute(mute, self.guid)
+    def mute(self, mute):
+        for iid, magic_root_session in list(self.magic_root_sessions.items()):
+            if magic_root_session.mute != mute:
+                magic_root_session._sav.SetMute(mute, self.guid)
+                self._bank.set_mute(iid, mute)
 
 
 class MagicSession(_MagicAudioControl):
@@ -706,6 +725,8 @@ class _MagicRootSession(COMObject):
             # self.volume will keep the none state
             # until self._activate()
             self.volume = new_volume
+            if self.magic_app:
+                self.magic_app._bank.set_volume(self.iid, new_volume)
 
             # send callbacks, if callback exists
             self._send_callback(
@@ -721,6 +742,8 @@ class _MagicRootSession(COMObject):
             # self.mute will keep the none state
             # until self._activate()
             self.mute = new_mute
+            if self.magic_app:
+                self.magic_app._bank.set_mute(self.iid, new_mute)
 
             # send callbacks, if callback exists
             self._send_callback(
@@ -783,6 +806,8 @@ class _MagicRootSession(COMObject):
     def OnStateChanged(self, new_state_id):
         """Is fired, when the audio session state changed."""
         self.state = AudioSessionState(new_state_id)
+        if self.magic_app:
+            self.magic_app._bank.set_state(self.iid, new_state_id)
 
         # send callbacks, if defined
         if self.magic_app and self.magic_app.state_callback:
@@ -819,9 +844,10 @@ class _MagicRootSession(COMObject):
         self.pid = self._ctl2.GetProcessId()
 
         if self.pid != 0:
-            # try:
-            return psutil.Process(self.pid).name()
-            # except psutil.NoSuchProcess:
+            name = process_name_resolver.name(self.pid)
+            if name is None:
+                raise NoSuchProcess(self.pid)
+            return name
             # for some reason GetProcessId returned an non existing pid
 
             # TODO:
@@ -0,0 +1,212 @@
+"""
+Peak level sampling over IAudioMeterInformation.
+
+The PeakSampler polls GetPeakValue() of the master endpoint and of
+every registered session at a fixed rate. Samples go into fixed-size,
+array-backed ring buffers, so sampling allocates nothing per sample:
+
+    sampler = PeakSampler(rate=20)
+    sampler.add_source("master", speakers.Meter)
+    sampler.add_source(entry.key, entry.meter)
+    sampler.start()
+    sampler.active()    # -> [(key, peak), ...] loudest first
+    sampler.summary(key)  # -> (peak, rms)
+
+benchmarks/fakes.py provides FakeAudioMeterInformation to sample without
+Windows.
+"""
+
+import math
+import threading
+import time
+from array import array
+
+__all__ = ("PeakRing", "PeakSampler")
+
+
+class PeakRing:
+    """Fixed-size ring buffer of peak values."""
+
+    __slots__ = ("values", "size", "index", "count", "time")
+
+    def __init__(self, size):
+        self.values = array("f", bytes(4 * size))
+        self.size = size
+        self.index = 0
+        self.count = 0
+        # clock time of the latest sample, set by PeakSampler
+        self.time = None
+
+    def push(self, value):
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def last(self, n=1):
+        """Highest of the latest n samples."""
+        n = min(n, self.count)
+        if not n:
+            return 0.0
+        values = self.values
+        return max(values[(self.index - i - 1) % self.size] for i in range(n))
+
+    def peak(self):
+        return max(self.values) if self.count else 0.0
+
+    def rms(self):
+        if not self.count:
+            return 0.0
+        return math.sqrt(sum(v * v for v in self.values) / self.count)
+
+
+class PeakSampler:
+    """
+    Polls peak meters at 'rate' samples per second.
+
+    Parameters
+    ----------
+    rate : float
+        samples per second and source.
+    size : int
+        samples kept per source.
+    max_age : float
+        seconds after the latest sample of a source at which its
+        samples stop counting, e.g. once sampling stopped. level(),
+        summary() and active() report such a source as silent.
+    initializer : callable
+        run once on the sampling thread, e.g. CoInitializeEx(MTA).
+    uninitializer : callable
+        run when the sampling thread ends, e.g. CoUninitialize().
+
+    Counters
+    --------
+    rounds : int
+        completed sample_once() calls.
+    errors : int
+        failed GetPeakValue() calls (the source is skipped).
+    sample_time : float
+        seconds spent in the last sample_once().
+    """
+
+    def __init__(
+        self,
+        rate=20.0,
+        size=32,
+        max_age=1.0,
+        initializer=None,
+        uninitializer=None,
+        clock=time.perf_counter,
+    ):
+        self.rate = rate
+        self.size = size
+        self.max_age = max_age
+        self.initializer = initializer
+        self.uninitializer = uninitializer
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sources = {}
+        self._rings = {}
+        self._thread = None
+        self._stop = threading.Event()
+        self.rounds = 0
+        self.errors = 0
+        self.sample_time = 0.0
+
+    def add_source(self, key, meter):
+        with self._lock:
+            self._sources[key] = meter
+            if key not in self._rings:
+                self._rings[key] = PeakRing(self.size)
+
+    def remove_source(self, key):
+        with self._lock:
+            self._sources.pop(key, None)
+            self._rings.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._sources.clear()
+            self._rings.clear()
+
+    def sample_once(self):
+        start = self._clock()
+        with self._lock:
+            sources = list(self._sources.items())
+            rings = self._rings
+        for key, meter in sources:
+            try:
+                value = meter.GetPeakValue()
+            except Exception:
+                self.errors += 1
+                continue
+            ring = rings.get(key)
+            if ring is not None:
+                ring.push(value)
+                ring.time = self._clock()
+        self.rounds += 1
+        self.sample_time = self._clock() - start
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="pycaw peak sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(1.0)
+        self._thread = None
+
+    def _run(self):
+        if self.initializer is not None:
+            self.initializer()
+        try:
+            interval = 1.0 / self.rate
+            while not self._stop.wait(max(0.0, interval - self.sample_time)):
+                self.sample_once()
+        finally:
+            if self.uninitializer is not None:
+                self.uninitializer()
+
+    def _fresh(self, ring, now):
+        return (
+            ring is not None
+            and ring.time is not None
+            and now - ring.time <= self.max_age
+        )
+
+    def summary(self, key):
+        """(peak, rms) over the buffered samples of a source."""
+        ring = self._rings.get(key)
+        if not self._fresh(ring, self._clock()):
+            return (0.0, 0.0)
+        return (ring.peak(), ring.rms())
+
+    def level(self, key, window=None):
+        """Highest of the latest 'window' samples of a source (all by default)."""
+        ring = self._rings.get(key)
+        if not self._fresh(ring, self._clock()):
+            return 0.0
+        return ring.last(window or self.size)
+
+    def active(self, threshold=0.01, window=None):
+        """
+        [(key, peak)] of the sources that made sound,
+        loudest first. 'window' limits it to the latest n samples.
+        """
+        window = window or self.size
+        with self._lock:
+            rings = list(self._rings.items())
+        now = self._clock()
+        levels = [
+            (key, ring.last(window)) for key, ring in rings if self._fresh(ring, now)
+        ]
+        levels = [level for level in levels if level[1] >= threshold]
+        levels.sort(key=lambda level: level[1], reverse=True)
+        return levels
@@ -0,0 +1,100 @@
+"""
+Cheap decoding of AUDIO_VOLUME_NOTIFICATION_DATA.
+
+A user dragging the volume slider fires hundreds of OnNotify calls per
+second. Going through pNotify.contents, list(afChannelVolumes), a
+slice of it and a new pointer to the event GUID costs several objects
+and foreign calls per notification. VolumeNotificationView reads the
+fields straight from the pointer and copies the channel levels into a
+buffer allocated once:
+
+    view = VolumeNotificationView()
+    view.decode(pNotify)
+    view.volume, view.mute, view.channels
+    view.channel_volumes[: view.channels]
+
+The view is overwritten by the next decode(), copy whatever must
+outlive the callback. event_context points into the notification
+itself and is only valid during the callback.
+
+Only the array module is used here, so the decoding can be benchmarked
+with a ctypes structure of the same layout without comtypes.
+"""
+
+from array import array
+from collections import namedtuple
+
+__all__ = ("VolumeNotification", "VolumeNotificationView", "freeze")
+
+# afChannelVolumes of AUDIO_VOLUME_NOTIFICATION_DATA
+MAX_CHANNELS = 8
+
+
+# a notification that may be kept, see freeze()
+VolumeNotification = namedtuple(
+    "VolumeNotification", "volume mute channels channel_volumes event_context"
+)
+
+
+def freeze(notification):
+    """VolumeNotification copy of a view, for use after the callback."""
+    channels = notification.channels
+    context = notification.event_context
+    if context is not None and hasattr(type(context), "from_buffer_copy"):
+        # the GUID lives in the notification's memory
+        context = type(context).from_buffer_copy(context)
+    return VolumeNotification(
+        notification.volume,
+        notification.mute,
+        channels,
+        tuple(notification.channel_volumes[:channels]),
+        context,
+    )
+
+
+class VolumeNotificationView:
+    """
+    Reusable view of one volume notification.
+
+    Attributes
+    ----------
+    volume : float
+    mute : int
+    channels : int
+        number of valid entries in channel_volumes.
+    channel_volumes : array('f')
+        the channel levels, reused for every notification.
+    decodes : int
+        notifications decoded.
+    """
+
+    __slots__ = ("_data", "volume", "mute", "channels", "channel_volumes", "decodes")
+
+    def __init__(self, max_channels=MAX_CHANNELS):
+        self._data = None
+        self.volume = 0.0
+        self.mute = 0
+        self.channels = 0
+        self.channel_volumes = array("f", bytes(4 * max_channels))
+        self.decodes = 0
+
+    def decode(self, pNotify):
+        """Read the notification pNotify points to, returns the view."""
+        # indexing the pointer is cheaper than .contents, both share its memory
+        data = pNotify[0]
+        self._data = data
+        self.volume = data.fMasterVolume
+        self.mute = data.bMuted
+        buffer = self.channel_volumes
+        channels = min(data.nChannels, len(buffer))
+        levels = data.afChannelVolumes
+        for i in range(channels):
+            buffer[i] = levels[i]
+        self.channels = channels
+        self.decodes += 1
+        return self
+
+    @property
+    def event_context(self):
+        """GUID of whoever made the change, read on demand."""
+        return self._data.guidEventContext
@@ -0,0 +1,188 @@
+"""
+Registry entries ordered by activity.
+
+SessionOrder keeps the sessions of a SessionRegistry sorted so that
+the ones playing come first: active sessions before inactive ones,
+then by recent peak level, then by when they were last used. The
+order is kept up to date from the registry's events and from
+set_levels() / touch(). Only the session that changed is moved, the
+list is never sorted again as a whole:
+
+    order = SessionOrder(registry)
+    order.set_levels(sampler.level)     # after a sampling round
+    order.touch(entry.key)              # the user changed its volume
+    order.entries()                     # -> [SessionEntry, ...]
+    order.find("fi", after=entry.key)   # type-ahead jump, name or exe
+"""
+
+import threading
+import time
+from bisect import bisect_left, insort
+
+from pycaw.prefix import PrefixIndex
+
+__all__ = ("SessionOrder",)
+
+# see audiosessiontypes.h
+_STATE_ACTIVE = 1
+
+# peak levels are ranked in these steps, so noise doesn't reorder the list
+LEVEL_STEPS = (0.001, 0.05, 0.2)
+
+
+def _level_rank(level):
+    rank = 0
+    for step in LEVEL_STEPS:
+        if level >= step:
+            rank += 1
+    return rank
+
+
+class SessionOrder:
+    """
+    Parameters
+    ----------
+    registry : pycaw.registry.SessionRegistry
+        optional, its entries are added and its events followed.
+    clock : callable
+        time of touch(), time.monotonic by default.
+
+    Counters
+    --------
+    moves : int
+        entries repositioned after a change.
+    """
+
+    def __init__(self, registry=None, clock=time.monotonic):
+        self._clock = clock
+        # registry events arrive on COM threads
+        self._lock = threading.RLock()
+        # sorted (sort key, key), the key last keeps equal ranks stable
+        self._sorted = []
+        self._sort_keys = {}
+        self._entries = {}
+        self._levels = {}
+        self._used = {}
+        self.names = PrefixIndex()
+        self.moves = 0
+        self._registry = registry
+        if registry is not None:
+            for entry in registry.entries():
+                self.add(entry)
+            registry.subscribe(self._on_registry_event)
+
+    def close(self):
+        if self._registry is not None:
+            self._registry.unsubscribe(self._on_registry_event)
+            self._registry = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _sort_key(self, entry):
+        key = entry.key
+        return (
+            0 if entry.state == _STATE_ACTIVE else 1,
+            -self._levels.get(key, 0),
+            -self._used.get(key, 0.0),
+            key,
+        )
+
+    def add(self, entry):
+        key = entry.key
+        with self._lock:
+            if key in self._entries:
+                self.remove(key)
+            self._entries[key] = entry
+            sort_key = self._sort_key(entry)
+            self._sort_keys[key] = sort_key
+            insort(self._sorted, (sort_key, key))
+            self.names.add(key, entry.name, entry.exe)
+
+    def remove(self, key):
+        with self._lock:
+            if self._entries.pop(key, None) is None:
+                return
+            self._unlink(key, self._sort_keys.pop(key))
+            self._levels.pop(key, None)
+            self._used.pop(key, None)
+            self.names.remove(key)
+
+    def _unlink(self, key, sort_key):
+        i = bisect_left(self._sorted, (sort_key, key))
+        del self._sorted[i]
+
+    def update(self, key):
+        """Reposition an entry after its state, level or use changed."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            old = self._sort_keys[key]
+            new = self._sort_key(entry)
+            if new == old:
+                return
+            self._unlink(key, old)
+            self._sort_keys[key] = new
+            insort(self._sorted, (new, key))
+            self.moves += 1
+
+    def touch(self, key):
+        """Mark an entry as just used."""
+        with self._lock:
+            if key in self._entries:
+                self._used[key] = self._clock()
+                self.update(key)
+
+    def set_levels(self, level_of):
+        """level_of(key) -> recent peak level, e.g. PeakSampler.level."""
+        with self._lock:
+            for key in list(self._entries):
+                rank = _level_rank(level_of(key))
+                if rank != self._levels.get(key, 0):
+                    self._levels[key] = rank
+                    self.update(key)
+
+    def keys(self):
+        with self._lock:
+            return [key for _sort_key, key in self._sorted]
+
+    def entries(self):
+        with self._lock:
+            entries = self._entries
+            return [entries[key] for _sort_key, key in self._sorted]
+
+    def index(self, key):
+        """Position of an entry in the order, None if unknown."""
+        sort_key = self._sort_keys.get(key)
+        if sort_key is None:
+            return None
+        return bisect_left(self._sorted, (sort_key, key))
+
+    def find(self, prefix, after=None):
+        """
+        Key of the first entry (in order) whose name starts with prefix,
+        after the entry 'after' and wrapping around, or None.
+        """
+        with self._lock:
+            candidates = self.names.lookup(prefix)
+            if not candidates:
+                return None
+            start = self.index(after) if after is not None else None
+            if start is None:
+                start = -1
+            count = len(self._sorted)
+            return min(
+                candidates, key=lambda key: (self.index(key) - start - 1) % count
+            )
+
+    def _on_registry_event(self, event, entry):
+        if event == "added":
+            self.add(entry)
+        elif event == "removed":
+            self.remove(entry.key)
+        elif event == "state":
+            self.update(entry.key)
+        elif event == "renamed":
+            with self._lock:
+                self.names.add(entry.key, entry.name, entry.exe)
@@ -0,0 +1,76 @@
+"""
+Sorted prefix index over names.
+
+Names are kept in one sorted list, a prefix lookup is two bisections
+and adding or removing a name is a bisection plus a list insert/delete.
+Matching ignores case and diacritics ("e" finds "Édition", "STRASSE"
+finds "straße"):
+
+    index = PrefixIndex()
+    index.add("key1", "Firefox")
+    index.add("key2", "foobar2000")
+    index.lookup("f")     # -> ["key1", "key2"], in name order
+    index.remove("key1")
+"""
+
+import unicodedata
+from bisect import bisect_left, insort
+
+__all__ = ("PrefixIndex",)
+
+# sorts after every character a name can contain
+_HIGHEST = "\U0010ffff"
+
+
+class PrefixIndex:
+    """Keys by the prefixes of their names, see normalize()."""
+
+    __slots__ = ("_items", "_names")
+
+    def __init__(self):
+        # sorted (normalized name, key)
+        self._items = []
+        # key -> normalized names
+        self._names = {}
+
+    def __len__(self):
+        return len(self._names)
+
+    @staticmethod
+    def normalize(text):
+        """Casefolded text without combining marks."""
+        if text.isascii():
+            return text.lower()
+        decomposed = unicodedata.normalize("NFKD", text.casefold())
+        return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+    def add(self, key, *names):
+        """Index key under every non-empty name, replacing earlier names."""
+        if key in self._names:
+            self.remove(key)
+        normalized = {self.normalize(name) for name in names if name}
+        self._names[key] = normalized
+        for name in normalized:
+            insort(self._items, (name, key))
+
+    def remove(self, key):
+        items = self._items
+        for name in self._names.pop(key, ()):
+            i = bisect_left(items, (name, key))
+            if i < len(items) and items[i] == (name, key):
+                del items[i]
+
+    def lookup(self, prefix):
+        """Keys with a name starting with prefix, in name order, each once."""
+        prefix = self.normalize(prefix)
+        items = self._items
+        start = bisect_left(items, (prefix,))
+        end = bisect_left(items, (prefix + _HIGHEST,))
+        seen = set()
+        keys = []
+        for i in range(start, end):
+            key = items[i][1]
+            if key not in seen:
+                seen.add(key)
+                keys.append(key)
+        return keys
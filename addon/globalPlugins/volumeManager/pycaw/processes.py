@@ -0,0 +1,335 @@
+"""
+Batched process information for audio session process ids.
+
+The add-on needs a process' executable name, its create time and
+whether it still runs, nothing else of psutil. psutil.Process(pid)
+opens (and on Windows snapshots) per pid, and importing psutil loads
+its platform module and builds its tables. Here every function takes
+all pids of interest at once:
+
+    snapshot({1234, 5678})      # {1234: (1700000000.5, "firefox.exe")}
+    create_times({1234})        # {1234: 1700000000.5}
+    running({1234, 5678})       # {1234}
+    pid_exists(5678)            # False
+
+    names = process_name_resolver.resolve({1234, 5678})
+    # {1234: "firefox.exe", 5678: None}
+
+-   Windows: create times from GetProcessTimes, names from a single
+    CreateToolhelp32Snapshot.
+-   Linux: one pass over /proc/<pid>/stat, parsed like psutil's _pslinux.
+    Names are the file name of /proc/<pid>/exe, as the Windows snapshot
+    gives it, not the 15 character comm of the stat file.
+-   Anything else: psutil.
+
+psutil is only imported on other platforms, or when the platform's
+own lookup fails. Names are cached by (pid, create time), so a reused
+pid never returns the name of the process that used it before.
+"""
+
+import os
+import sys
+
+__all__ = (
+    "NoSuchProcess",
+    "ProcessNameResolver",
+    "create_times",
+    "pid_exists",
+    "process_name_resolver",
+    "running",
+    "snapshot",
+)
+
+
+class NoSuchProcess(LookupError):
+    """The process of a pid is not running."""
+
+    def __init__(self, pid):
+        super().__init__(pid)
+        self.pid = pid
+
+
+if sys.platform == "win32":
+    from ctypes import Structure, c_long, c_size_t, c_void_p, c_wchar
+    from ctypes.wintypes import DWORD
+
+    _TH32CS_SNAPPROCESS = 0x00000002
+    _INVALID_HANDLE_VALUE = c_void_p(-1).value
+
+    class _PROCESSENTRY32W(Structure):
+        _fields_ = [
+            ("dwSize", DWORD),
+            ("cntUsage", DWORD),
+            ("th32ProcessID", DWORD),
+            ("th32DefaultHeapID", c_size_t),
+            ("th32ModuleID", DWORD),
+            ("cntThreads", DWORD),
+            ("th32ParentProcessID", DWORD),
+            ("pcPriClassBase", c_long),
+            ("dwFlags", DWORD),
+            ("szExeFile", c_wchar * 260),
+        ]
+
+    def _load_kernel32():
+        from ctypes import POINTER, WinDLL
+        from ctypes.wintypes import BOOL, HANDLE
+
+        # a private instance: prototypes set on windll.kernel32 would be
+        # seen by every other user of it in the process
+        kernel32 = WinDLL("kernel32", use_last_error=True)
+        kernel32.CreateToolhelp32Snapshot.restype = HANDLE
+        kernel32.CreateToolhelp32Snapshot.argtypes = (DWORD, DWORD)
+        kernel32.Process32FirstW.restype = BOOL
+        kernel32.Process32FirstW.argtypes = (HANDLE, POINTER(_PROCESSENTRY32W))
+        kernel32.Process32NextW.restype = BOOL
+        kernel32.Process32NextW.argtypes = (HANDLE, POINTER(_PROCESSENTRY32W))
+        kernel32.OpenProcess.restype = HANDLE
+        kernel32.OpenProcess.argtypes = (DWORD, BOOL, DWORD)
+        kernel32.CloseHandle.restype = BOOL
+        kernel32.CloseHandle.argtypes = (HANDLE,)
+        kernel32.GetProcessTimes.restype = BOOL
+        kernel32.GetProcessTimes.argtypes = (HANDLE,) + (c_void_p,) * 4
+        return kernel32
+
+    _kernel32 = _load_kernel32()
+
+
+def _snapshot_windows(pids, names):
+    """{pid: (create_time, name or None)} of the running pids."""
+    from ctypes import byref, sizeof
+    from ctypes.wintypes import FILETIME
+
+    kernel32 = _kernel32
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+    result = {}
+    for pid in pids:
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            # gone, or access denied; the snapshot below decides
+            result[pid] = (None, None)
+            continue
+        creation, exit_, kernel, user = FILETIME(), FILETIME(), FILETIME(), FILETIME()
+        ok = kernel32.GetProcessTimes(
+            handle, byref(creation), byref(exit_), byref(kernel), byref(user)
+        )
+        kernel32.CloseHandle(handle)
+        if ok:
+            ticks = (creation.dwHighDateTime << 32) | creation.dwLowDateTime
+            # 100ns intervals since 1601 -> seconds since the epoch
+            result[pid] = (ticks / 10000000 - 11644473600, None)
+        else:
+            result[pid] = (None, None)
+
+    if not names and all(v[0] is not None for v in result.values()):
+        return result
+
+    found = {}
+    snapshot = kernel32.CreateToolhelp32Snapshot(_TH32CS_SNAPPROCESS, 0)
+    if snapshot == _INVALID_HANDLE_VALUE:
+        return {pid: v for pid, v in result.items() if v[0] is not None}
+    try:
+        entry = _PROCESSENTRY32W()
+        entry.dwSize = sizeof(_PROCESSENTRY32W)
+        more = kernel32.Process32FirstW(snapshot, byref(entry))
+        while more:
+            if entry.th32ProcessID in result:
+                found[entry.th32ProcessID] = entry.szExeFile
+            more = kernel32.Process32NextW(snapshot, byref(entry))
+    finally:
+        kernel32.CloseHandle(snapshot)
+    return {pid: (result[pid][0], name) for pid, name in found.items()}
+
+
+_boot_time = None
+
+
+def _procfs_name(pid, comm):
+    """Executable file name of a pid, comm where /proc does not tell."""
+    try:
+        exe = os.readlink("/proc/%d/exe" % pid)
+    except OSError:
+        # other users' processes, kernel threads
+        exe = None
+    if exe:
+        if exe.endswith(" (deleted)"):
+            exe = exe[: -len(" (deleted)")]
+        return os.path.basename(exe)
+    try:
+        with open("/proc/%d/cmdline" % pid, "rb") as f:
+            arg0 = f.read().split(b"\0", 1)[0]
+    except OSError:
+        return comm
+    name = os.path.basename(arg0.decode(errors="replace"))
+    # comm is the first 15 characters of the name, a rewritten
+    # command line does not start with it
+    return name if comm and name.startswith(comm) else comm
+
+
+def _snapshot_procfs(pids, names):
+    """{pid: (create_time, name or None)} of the running pids."""
+    global _boot_time
+    if _boot_time is None:
+        with open("/proc/stat", "rb") as f:
+            for line in f:
+                if line.startswith(b"btime"):
+                    _boot_time = float(line.split()[1])
+                    break
+    clock_ticks = os.sysconf("SC_CLK_TCK")
+
+    result = {}
+    for pid in pids:
+        try:
+            with open("/proc/%d/stat" % pid, "rb") as f:
+                data = f.read()
+        except OSError:
+            continue
+        # see psutil/_pslinux.py Process._parse_stat_file()
+        rpar = data.rfind(b")")
+        name = data[data.find(b"(") + 1 : rpar].decode(errors="replace")
+        fields = data[rpar + 2 :].split()
+        create_time = float(fields[19]) / clock_ticks + _boot_time
+        result[pid] = (create_time, _procfs_name(pid, name) if names else None)
+    return result
+
+
+def _snapshot_psutil(pids, names):
+    """{pid: (create_time, name or None)} of the running pids."""
+    import psutil
+
+    result = {}
+    for pid in pids:
+        try:
+            process = psutil.Process(pid)
+            result[pid] = (process.create_time(), process.name() if names else None)
+        except psutil.Error:
+            continue
+    return result
+
+
+if sys.platform == "win32":
+    _default_snapshot = _snapshot_windows
+elif os.path.isdir("/proc"):
+    _default_snapshot = _snapshot_procfs
+else:
+    _default_snapshot = _snapshot_psutil
+
+
+def _snapshot_any(pids, names):
+    """The platform lookup, psutil when it fails with an OSError."""
+    try:
+        return _default_snapshot(pids, names)
+    except OSError:
+        if _default_snapshot is _snapshot_psutil:
+            raise
+        try:
+            return _snapshot_psutil(pids, names)
+        except ImportError:
+            pass
+        raise
+
+
+def snapshot(pids, names=True):
+    """
+    {pid: (create_time, name)} of the running pids, in one pass.
+
+    Pids that are not running are left out. name is None when names is
+    False, create_time (seconds since the epoch) is None for a process
+    that may not be opened. When the platform lookup fails with an
+    OSError, psutil is asked instead; without psutil the error is
+    raised.
+    """
+    return _snapshot_any(pids, names)
+
+
+def create_times(pids):
+    """{pid: create time} of the running pids, see snapshot()."""
+    return {pid: info[0] for pid, info in snapshot(pids, False).items()}
+
+
+def running(pids):
+    """Set of the pids still running."""
+    return set(snapshot(pids, False))
+
+
+def pid_exists(pid):
+    return pid in snapshot((pid,), False)
+
+
+class ProcessNameResolver:
+    """
+    Resolves executable names of many pids in one pass.
+
+    Parameters
+    ----------
+    snapshot : callable(pids, names) -> {pid: (create_time, name)}
+        platform lookup by default, see snapshot().
+    max_size : int
+        number of cached (pid, create time) names.
+
+    Counters
+    --------
+    hits, misses : int
+        pids served from / not found in the cache.
+    snapshots : int
+        calls of the snapshot function.
+    """
+
+    def __init__(self, snapshot=None, max_size=4096):
+        self._snapshot = snapshot or _snapshot_any
+        self._cache = {}
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.snapshots = 0
+
+    def resolve(self, pids):
+        """Return {pid: name or None} for every pid (0 is never resolved)."""
+        result = {pid: None for pid in pids}
+        pids = [pid for pid in result if pid != 0]
+        if not pids:
+            return result
+
+        self.snapshots += 1
+        info = self._snapshot(pids, False)
+        misses = []
+        for pid in pids:
+            if pid not in info:
+                continue
+            create_time, name = info[pid]
+            if name is None and create_time is not None:
+                name = self._cache.get((pid, create_time))
+                if name is not None:
+                    self.hits += 1
+            if name is None:
+                misses.append(pid)
+                continue
+            result[pid] = name
+            self._store(pid, create_time, name)
+
+        if misses:
+            self.misses += len(misses)
+            self.snapshots += 1
+            for pid, (create_time, name) in self._snapshot(misses, True).items():
+                result[pid] = name
+                self._store(pid, create_time, name)
+        return result
+
+    def name(self, pid):
+        return self.resolve((pid,))[pid]
+
+    def _store(self, pid, create_time, name):
+        if create_time is None or name is None:
+            return
+        key = (pid, create_time)
+        if key in self._cache:
+            return
+        self._cache[key] = name
+        while len(self._cache) > self.max_size:
+            del self._cache[next(iter(self._cache))]
+
+    def clear(self):
+        self._cache.clear()
+
+
+process_name_resolver = ProcessNameResolver()
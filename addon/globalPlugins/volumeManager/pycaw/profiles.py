@@ -0,0 +1,226 @@
+"""
+Whole-mixer volume profiles.
+
+A Profile holds the master volume and mute and the volume and mute of
+every application, keyed by executable name. capture() takes one in a
+single pass, restore() puts it back and only writes the values that
+differ from the current ones:
+
+    sessions = session_volumes(AudioUtilities.GetAllSessions())
+    speakers = AudioUtilities.GetSpeakers().EndpointVolume
+    store = ProfileStore("profiles.json")
+    store["meeting"] = capture(speakers, sessions)
+    ...
+    restore(store["meeting"], speakers, sessions)  # -> number of writes
+
+restore() reads the current values through COM before comparing.
+Callers that track them already pass them in, the endpoint's as
+master=(volume, mute) and a session's as the third item of its tuple:
+
+    restore(profile, speakers, [(exe, simple_volume, (0.5, 0))], master=(1.0, 0))
+
+Applications in the profile without a session are skipped, sessions
+that are not in the profile are left alone. All sessions of an
+executable get its stored values.
+
+FakeMixer of benchmarks/fakes.py provides an endpoint and sessions to
+run it without Windows.
+"""
+
+import json
+import os
+import tempfile
+from collections.abc import MutableMapping
+
+__all__ = (
+    "Profile",
+    "ProfileError",
+    "ProfileStore",
+    "capture",
+    "restore",
+    "session_volumes",
+)
+
+
+class ProfileError(ValueError):
+    """The profile file exists but cannot be read as profiles."""
+
+    def __init__(self, path, reason):
+        super().__init__("%s: %s" % (path, reason))
+        self.path = path
+
+
+def _exe_key(exe):
+    return exe.lower()
+
+
+class Profile:
+    """
+    Attributes
+    ----------
+    master : tuple
+        (volume, mute) of the endpoint, None if not captured.
+    apps : dict
+        {exe: (volume, mute)}, exe in lower case.
+    """
+
+    __slots__ = ("master", "apps")
+
+    def __init__(self, master=None, apps=None):
+        self.master = master
+        self.apps = apps if apps is not None else {}
+
+    def __eq__(self, other):
+        if not isinstance(other, Profile):
+            return NotImplemented
+        return self.master == other.master and self.apps == other.apps
+
+    def __repr__(self):
+        return "Profile(master=%r, apps=%r)" % (self.master, self.apps)
+
+    def to_dict(self):
+        return {
+            "master": list(self.master) if self.master is not None else None,
+            "apps": {exe: list(values) for exe, values in self.apps.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        master = data.get("master")
+        return cls(
+            tuple(master) if master is not None else None,
+            {
+                _exe_key(exe): (float(volume), int(mute))
+                for exe, (volume, mute) in data.get("apps", {}).items()
+            },
+        )
+
+
+def session_volumes(sessions):
+    """(exe, ISimpleAudioVolume) of AudioSession objects with a process."""
+    for session in sessions:
+        exe = session.ProcessName
+        if exe:
+            yield exe, session.SimpleAudioVolume
+
+
+def capture(endpoint_volume, sessions):
+    """
+    Profile of an endpoint (POINTER(IAudioEndpointVolume), None to skip)
+    and its sessions, an iterable of (exe, ISimpleAudioVolume).
+    The first session of an executable is taken.
+    """
+    master = None
+    if endpoint_volume is not None:
+        master = (
+            round(endpoint_volume.GetMasterVolumeLevelScalar(), 4),
+            int(endpoint_volume.GetMute()),
+        )
+    apps = {}
+    for exe, volume in sessions:
+        key = _exe_key(exe)
+        if key not in apps:
+            apps[key] = (round(volume.GetMasterVolume(), 4), int(volume.GetMute()))
+    return Profile(master, apps)
+
+
+def restore(profile, endpoint_volume, sessions, tolerance=0.005, master=None):
+    """
+    Apply a profile, writing only the values that differ.
+    Returns the number of writes made.
+
+    sessions yields (exe, ISimpleAudioVolume) or
+    (exe, ISimpleAudioVolume, (volume, mute)) with the session's current
+    values, master is the endpoint's. Values not given are read.
+    """
+    writes = 0
+    if profile.master is not None and endpoint_volume is not None:
+        volume, mute = profile.master
+        if master is None:
+            master = (
+                endpoint_volume.GetMasterVolumeLevelScalar(),
+                endpoint_volume.GetMute(),
+            )
+        if abs(master[0] - volume) > tolerance:
+            endpoint_volume.SetMasterVolumeLevelScalar(volume, None)
+            writes += 1
+        if int(master[1]) != mute:
+            endpoint_volume.SetMute(mute, None)
+            writes += 1
+    apps = profile.apps
+    for exe, simple_volume, *known in sessions:
+        values = apps.get(_exe_key(exe))
+        if values is None:
+            continue
+        volume, mute = values
+        current = known[0] if known else None
+        if current is None:
+            current = (simple_volume.GetMasterVolume(), simple_volume.GetMute())
+        if abs(current[0] - volume) > tolerance:
+            simple_volume.SetMasterVolume(volume, None)
+            writes += 1
+        if int(current[1]) != mute:
+            simple_volume.SetMute(mute, None)
+            writes += 1
+    return writes
+
+
+class ProfileStore(MutableMapping):
+    """
+    Named profiles in a JSON file.
+
+    The file is read on first access and written on every change,
+    through a temporary file so a crash never leaves it half written.
+    A file that is not valid profile JSON raises ProfileError and is
+    left as it is, nothing is saved over it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._profiles = None
+
+    def _load(self):
+        if self._profiles is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                data = {}
+            except ValueError as exc:
+                raise ProfileError(self.path, exc) from exc
+            try:
+                self._profiles = {
+                    name: Profile.from_dict(profile) for name, profile in data.items()
+                }
+            except (AttributeError, KeyError, TypeError, ValueError) as exc:
+                raise ProfileError(self.path, exc) from exc
+        return self._profiles
+
+    def _save(self):
+        data = {name: profile.to_dict() for name, profile in self._profiles.items()}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def __getitem__(self, name):
+        return self._load()[name]
+
+    def __setitem__(self, name, profile):
+        self._load()[name] = profile
+        self._save()
+
+    def __delitem__(self, name):
+        del self._load()[name]
+        self._save()
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
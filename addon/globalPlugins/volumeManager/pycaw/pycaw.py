@@ -7,7 +7,11 @@ Python wrapper around the Core Audio Windows API.
 # flake8: noqa
 # yes, the imports are unused
 
-from pycaw.api.audioclient import IAudioClient, ISimpleAudioVolume
+from pycaw.api.audioclient import (
+    IAudioClient,
+    IChannelAudioVolume,
+    ISimpleAudioVolume,
+)
 from pycaw.api.audioclient.depend import WAVEFORMATEX
 from pycaw.api.audiopolicy import (
     IAudioSessionControl,
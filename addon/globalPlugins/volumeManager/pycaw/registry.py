@@ -0,0 +1,321 @@
+"""
+Long-lived registry of the audio sessions of one IAudioSessionManager2.
+
+Instead of re-enumerating every session whenever the list is needed,
+the registry enumerates once and is then kept up to date by the
+session created notification (IAudioSessionNotification) and the per
+session state / display name / volume events (IAudioSessionEvents).
+
+    registry = SessionRegistry(AudioUtilities.GetAudioSessionManager())
+    for entry in registry.entries():
+        print(entry.name, entry.volume.GetMasterVolume())
+    registry.close()
+
+Note
+----
+OnSessionCreated is only delivered to an MTA, see pycaw.callbacks.
+
+The COM sinks are taken from the 'sinks' module (pycaw.callbacks by
+default). benchmarks/fakes.py provides a FakeAudioSessionManager to
+run the registry without Windows.
+
+Executable names are looked up through a ProcessNameResolver
+(pycaw.processes), the initial scan resolves all pids in one batch.
+"""
+
+import logging
+import threading
+
+from pycaw.processes import process_name_resolver
+
+log = logging.getLogger(__name__)
+
+__all__ = ("SessionIndex", "SessionRegistry", "SessionEntry")
+
+# see audiosessiontypes.h
+_STATE_EXPIRED = 2
+
+_UNRESOLVED = object()
+
+_sink_classes = {}
+
+
+def _get_sink_classes(sinks):
+    """Build (once per sinks module) the registry's COM sink classes."""
+    try:
+        return _sink_classes[sinks.__name__]
+    except KeyError:
+        pass
+
+    class _Notification(sinks.AudioSessionNotification):
+        def __init__(self, registry):
+            self.registry = registry
+
+        def on_session_created(self, new_session):
+            self.registry._add(new_session)
+
+    class _Events(sinks.AudioSessionEvents):
+        def __init__(self, registry, key):
+            self.registry = registry
+            self.key = key
+
+        def on_state_changed(self, new_state, new_state_id):
+            self.registry._state_changed(self.key, new_state_id)
+
+        def on_display_name_changed(self, new_display_name, event_context):
+            self.registry._renamed(self.key, new_display_name)
+
+        def on_simple_volume_changed(self, new_volume, new_mute, event_context):
+            self.registry._volume_changed(self.key, new_volume, new_mute)
+
+    _sink_classes[sinks.__name__] = classes = (_Notification, _Events)
+    return classes
+
+
+class SessionEntry:
+    """One registered session, as stored in SessionRegistry."""
+
+    __slots__ = (
+        "key",
+        "session",
+        "pid",
+        "exe",
+        "display_name",
+        "state",
+        "level",
+        "muted",
+        "_events",
+    )
+
+    def __init__(self, key, session, pid, exe, display_name, state):
+        self.key = key
+        self.session = session
+        self.pid = pid
+        # executable name, None for the system sounds session
+        # or when the process is already gone
+        self.exe = exe
+        self.display_name = display_name
+        self.state = state
+        # last volume / mute reported by the session, None until it changes
+        self.level = None
+        self.muted = None
+        self._events = None
+
+    def __str__(self):
+        return f"<SessionEntry name='{self.name}' pid='{self.pid}'/>"
+
+    @property
+    def name(self):
+        return self.display_name or self.exe
+
+    @property
+    def volume(self):
+        """ISimpleAudioVolume of the session (queried once, then cached)"""
+        return self.session.SimpleAudioVolume
+
+    @property
+    def meter(self):
+        """IAudioMeterInformation of the session (queried once, then cached)"""
+        return self.session.Meter
+
+
+class SessionIndex:
+    """
+    Session instance identifier, pid and executable name lookups.
+
+    The registry adds and removes entries as sessions are created and
+    expire, so every lookup is a dict access.
+    """
+
+    __slots__ = ("by_key", "_by_pid", "_by_exe")
+
+    def __init__(self):
+        self.by_key = {}
+        self._by_pid = {}
+        self._by_exe = {}
+
+    def __len__(self):
+        return len(self.by_key)
+
+    def add(self, entry):
+        self.by_key[entry.key] = entry
+        self._by_pid.setdefault(entry.pid, []).append(entry)
+        if entry.exe:
+            self._by_exe.setdefault(entry.exe.lower(), []).append(entry)
+
+    def remove(self, key):
+        entry = self.by_key.pop(key, None)
+        if entry is None:
+            return None
+        self._discard(self._by_pid, entry.pid, entry)
+        if entry.exe:
+            self._discard(self._by_exe, entry.exe.lower(), entry)
+        return entry
+
+    @staticmethod
+    def _discard(index, value, entry):
+        entries = index.get(value)
+        if entries is None:
+            return
+        entries.remove(entry)
+        if not entries:
+            del index[value]
+
+    def clear(self):
+        self.by_key.clear()
+        self._by_pid.clear()
+        self._by_exe.clear()
+
+    def by_pid(self, pid):
+        return list(self._by_pid.get(pid, ()))
+
+    def by_exe(self, exe):
+        return list(self._by_exe.get(exe.lower(), ()))
+
+
+class SessionRegistry:
+    """
+    Dict of session instance identifier -> SessionEntry.
+
+    Methods
+    -------
+    entries()
+        snapshot list of all live entries.
+    get(key)
+        entry by session instance identifier or None.
+    by_pid(pid), by_exe(exe)
+        entries of a process id / executable name (any case), O(1).
+    subscribe(listener)
+        listener(event, entry) is called after every change,
+        event is one of "added", "removed", "renamed", "state", "volume".
+    close()
+        unregister every notification.
+    """
+
+    def __init__(self, mgr, sinks=None, resolver=None):
+        if sinks is None:
+            from pycaw import callbacks as sinks
+        if resolver is None:
+            resolver = process_name_resolver
+        self._Notification, self._Events = _get_sink_classes(sinks)
+        self._mgr = mgr
+        self._resolver = resolver
+        self._lock = threading.Lock()
+        self._index = SessionIndex()
+        self._entries = self._index.by_key
+        self._listeners = []
+        self._closed = False
+        # sessions found by the initial scan, resolved in one batch
+        self._pending = []
+
+        self._notification = self._Notification(self)
+        self._mgr.RegisterSessionNotification(self._notification)
+        # has to get called -
+        # to make IAudioSessionNotification::OnSessionCreated working
+        sessionEnumerator = self._mgr.GetSessionEnumerator()
+        for i in range(sessionEnumerator.GetCount()):
+            ctl = sessionEnumerator.GetSession(i)
+            if ctl is not None:
+                self._notification.OnSessionCreated(ctl)
+        pending, self._pending = self._pending, None
+        names = self._resolver.resolve({session.ProcessId for session in pending})
+        for session in pending:
+            self._add(session, names[session.ProcessId])
+        log.debug(f"registry started with {len(self._entries)} sessions")
+
+    def __len__(self):
+        return len(self._entries)
+
+    def entries(self):
+        with self._lock:
+            return list(self._entries.values())
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def by_pid(self, pid):
+        with self._lock:
+            return self._index.by_pid(pid)
+
+    def by_exe(self, exe):
+        with self._lock:
+            return self._index.by_exe(exe)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._mgr.UnregisterSessionNotification(self._notification)
+        with self._lock:
+            entries = list(self._entries.values())
+            self._index.clear()
+        for entry in entries:
+            entry.session.unregister_notification()
+
+    def _notify(self, event, entry):
+        for listener in list(self._listeners):
+            listener(event, entry)
+
+    def _add(self, session, exe=_UNRESOLVED):
+        if self._closed:
+            return
+        if self._pending is not None:
+            self._pending.append(session)
+            return
+        key = session.InstanceIdentifier
+        state = session.State
+        if state == _STATE_EXPIRED or key in self._entries:
+            return
+        pid = session.ProcessId
+        if exe is _UNRESOLVED:
+            exe = self._resolver.name(pid)
+        entry = SessionEntry(key, session, pid, exe, session.DisplayName, state)
+        # OnSessionCreated may race the initial scan on another thread,
+        # only the first of them adds the session
+        with self._lock:
+            if key in self._entries:
+                return
+            self._index.add(entry)
+        entry._events = self._Events(self, key)
+        session.register_notification(entry._events)
+        log.debug(f"added {entry}")
+        self._notify("added", entry)
+
+    def _state_changed(self, key, new_state_id):
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry.state = new_state_id
+        if new_state_id != _STATE_EXPIRED:
+            self._notify("state", entry)
+            return
+        with self._lock:
+            self._index.remove(key)
+        entry.session.unregister_notification()
+        log.debug(f"removed {entry}")
+        self._notify("removed", entry)
+
+    def _renamed(self, key, new_display_name):
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry.display_name = new_display_name
+        self._notify("renamed", entry)
+
+    def _volume_changed(self, key, new_volume, new_mute):
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry.level = new_volume
+        entry.muted = new_mute
+        self._notify("volume", entry)
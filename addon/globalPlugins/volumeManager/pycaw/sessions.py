@@ -0,0 +1,173 @@
+"""
+One-pass session enumeration.
+
+AudioUtilities.GetAllSessions returns bare AudioSession objects, and
+callers then pay one COM call per property they touch, plus another
+QueryInterface for ISimpleAudioVolume. SessionEnumerator walks the
+enumerator once and fills SessionRecords with just the fields asked
+for, counting every COM call it makes:
+
+    enumerator = SessionEnumerator()
+    records = enumerator.records(mgr, fields=("pid", "volume"))
+    records[0].pid, records[0].volume
+    enumerator.per_session  # COM calls per session of the last pass
+
+Fields
+------
+volume : ISimpleAudioVolume
+pid : int
+display_name : str
+state : int
+    AudioSessionState, 0 inactive, 1 active, 2 expired.
+system : bool
+    True for the system sounds session.
+instance_id : str
+
+Fields that were not asked for are None. The interfaces and the
+session class default to pycaw's.
+"""
+
+__all__ = ("SESSION_FIELDS", "SessionEnumerator", "SessionRecord", "session_enumerator")
+
+SESSION_FIELDS = ("volume", "pid", "display_name", "state", "system", "instance_id")
+
+# IsSystemSoundsSession returns S_OK for the system sounds session
+_S_OK = 0
+
+
+class SessionRecord:
+    """One session as read by SessionEnumerator.records()."""
+
+    __slots__ = ("control",) + SESSION_FIELDS + ("_session_class", "_session")
+
+    def __init__(self, control, session_class):
+        self.control = control
+        self.volume = None
+        self.pid = None
+        self.display_name = None
+        self.state = None
+        self.system = None
+        self.instance_id = None
+        self._session_class = session_class
+        self._session = None
+
+    def __repr__(self):
+        return "<SessionRecord pid=%r display_name=%r>" % (self.pid, self.display_name)
+
+    @property
+    def session(self):
+        """
+        AudioSession of the record, reusing the volume already queried.
+        Made on first access, later accesses return the same one.
+        """
+        if self._session is None:
+            session = self._session_class(self.control)
+            if self.volume is not None:
+                session._volume = self.volume
+            self._session = session
+        return self._session
+
+
+class SessionEnumerator:
+    """
+    Parameters
+    ----------
+    control2, simple_volume : interface
+        passed to QueryInterface, IAudioSessionControl2 and
+        ISimpleAudioVolume by default.
+    session_class : type
+        wraps a control for SessionRecord.session, pycaw's AudioSession.
+
+    Counters
+    --------
+    enumerations : int
+        records() calls.
+    sessions : int
+        sessions read by the last records().
+    com_calls : int
+        COM calls made by the last records(), enumerator calls included.
+    """
+
+    def __init__(self, control2=None, simple_volume=None, session_class=None):
+        self._control2 = control2
+        self._simple_volume = simple_volume
+        self._session_class = session_class
+        self.enumerations = 0
+        self.sessions = 0
+        self.com_calls = 0
+
+    def _defaults(self):
+        if self._control2 is None:
+            from pycaw.api.audiopolicy import IAudioSessionControl2
+
+            self._control2 = IAudioSessionControl2
+        if self._simple_volume is None:
+            from pycaw.api.audioclient import ISimpleAudioVolume
+
+            self._simple_volume = ISimpleAudioVolume
+        if self._session_class is None:
+            from pycaw.utils import AudioSession
+
+            self._session_class = AudioSession
+
+    @property
+    def per_session(self):
+        """COM calls per session of the last records()."""
+        return self.com_calls / self.sessions if self.sessions else 0.0
+
+    def records(self, mgr, fields=SESSION_FIELDS):
+        """SessionRecords of every session of an IAudioSessionManager2."""
+        self._defaults()
+        unknown = set(fields) - set(SESSION_FIELDS)
+        if unknown:
+            raise ValueError("unknown session fields %s" % ", ".join(sorted(unknown)))
+        want_volume = "volume" in fields
+        want_pid = "pid" in fields
+        want_name = "display_name" in fields
+        want_state = "state" in fields
+        want_system = "system" in fields
+        want_iid = "instance_id" in fields
+        control2 = self._control2
+        simple_volume = self._simple_volume
+        session_class = self._session_class
+
+        enumerator = mgr.GetSessionEnumerator()
+        count = enumerator.GetCount()
+        calls = 2
+        records = []
+        for i in range(count):
+            ctl = enumerator.GetSession(i)
+            calls += 1
+            if ctl is None:
+                continue
+            ctl2 = ctl.QueryInterface(control2)
+            calls += 1
+            if ctl2 is None:
+                continue
+            record = SessionRecord(ctl2, session_class)
+            if want_volume:
+                record.volume = ctl2.QueryInterface(simple_volume)
+                calls += 1
+            if want_pid:
+                record.pid = ctl2.GetProcessId()
+                calls += 1
+            if want_name:
+                record.display_name = ctl2.GetDisplayName()
+                calls += 1
+            if want_state:
+                record.state = ctl2.GetState()
+                calls += 1
+            if want_system:
+                record.system = ctl2.IsSystemSoundsSession() == _S_OK
+                calls += 1
+            if want_iid:
+                record.instance_id = ctl2.GetSessionInstanceIdentifier()
+                calls += 1
+            records.append(record)
+        self.enumerations += 1
+        self.sessions = len(records)
+        self.com_calls = calls
+        return records
+
+
+session_enumerator = SessionEnumerator()
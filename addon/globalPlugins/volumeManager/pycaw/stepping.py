@@ -0,0 +1,275 @@
+"""
+Volume stepping on the endpoint's own step table.
+
+Stepping the master volume by hand is a GetMasterVolumeLevelScalar,
+an addition and a SetMasterVolumeLevelScalar per key press, and the
+rounding drifts. VolumeStepper issues one VolumeStepUp/VolumeStepDown
+per step instead and predicts the resulting level from the cached
+step table, so no read is needed:
+
+    stepper = VolumeStepper(speakers.EndpointVolume, device_id=speakers.id)
+    stepper.step(1)     # -> True, one VolumeStepUp
+    stepper.expected    # level after the step
+
+mode="db" steps by a fixed number of decibels (perceptually even
+steps) with SetMasterVolumeLevel, snapped to a grid over the device's
+dB range.
+
+The dB range and step count of an endpoint never change while it
+exists, they are read once per device id and kept in
+volume_range_cache.
+"""
+
+import threading
+from array import array
+from concurrent.futures import Future
+
+__all__ = ("VolumeRange", "VolumeRangeCache", "VolumeStepper", "volume_range_cache")
+
+
+class VolumeRange:
+    """
+    dB range and hardware step table of an endpoint.
+
+    Attributes
+    ----------
+    min_db, max_db : float
+        from GetVolumeRange.
+    increment_db : float
+        smallest dB change the device supports.
+    step_count : int
+        number of VolumeStepUp/VolumeStepDown positions.
+    """
+
+    __slots__ = ("min_db", "max_db", "increment_db", "step_count", "_levels", "_grids")
+
+    def __init__(self, min_db, max_db, increment_db, step_count):
+        self.min_db = min_db
+        self.max_db = max_db
+        self.increment_db = increment_db
+        self.step_count = step_count
+        self._levels = None
+        self._grids = {}
+
+    @classmethod
+    def read(cls, endpoint_volume):
+        min_db, max_db, increment_db = endpoint_volume.GetVolumeRange()
+        _step, step_count = endpoint_volume.GetVolumeStepInfo()
+        return cls(min_db, max_db, increment_db, step_count)
+
+    @property
+    def levels(self):
+        """Scalar level of every step position."""
+        if self._levels is None:
+            last = max(1, self.step_count - 1)
+            self._levels = array("d", (i / last for i in range(self.step_count)))
+        return self._levels
+
+    def index(self, level):
+        """Nearest step position of a scalar level."""
+        last = max(1, self.step_count - 1)
+        return min(last, max(0, int(round(level * last))))
+
+    def db_grid(self, step_db):
+        """dB values from min_db to max_db, step_db apart."""
+        grid = self._grids.get(step_db)
+        if grid is None:
+            count = int((self.max_db - self.min_db) / step_db + 1e-6)
+            grid = array(
+                "d", (self.max_db - i * step_db for i in range(count, -1, -1))
+            )
+            grid[0] = self.min_db
+            self._grids[step_db] = grid
+        return grid
+
+
+class VolumeRangeCache:
+    """
+    VolumeRange per device id.
+
+    Counters
+    --------
+    reads : int
+        GetVolumeRange/GetVolumeStepInfo pairs made.
+    hits : int
+        requests served from the cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ranges = {}
+        self.reads = 0
+        self.hits = 0
+
+    def get(self, device_id, endpoint_volume):
+        with self._lock:
+            volume_range = self._ranges.get(device_id)
+            if volume_range is not None:
+                self.hits += 1
+                return volume_range
+        volume_range = VolumeRange.read(endpoint_volume)
+        with self._lock:
+            self.reads += 1
+            if device_id is not None:
+                self._ranges[device_id] = volume_range
+        return volume_range
+
+    def invalidate(self, device_id=None):
+        with self._lock:
+            if device_id is None:
+                self._ranges.clear()
+            else:
+                self._ranges.pop(device_id, None)
+
+
+volume_range_cache = VolumeRangeCache()
+
+
+def _call_now(func, *args):
+    future = Future()
+    try:
+        future.set_result(func(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+class VolumeStepper:
+    """
+    Steps the master volume of one endpoint.
+
+    Parameters
+    ----------
+    endpoint_volume : POINTER(IAudioEndpointVolume)
+    device_id : str
+        key into volume_range_cache, None reads the range uncached.
+    mode : str
+        "native" for VolumeStepUp/VolumeStepDown, "db" for dB-linear steps.
+    step_db : float
+        size of a "db" step, rounded to the device's increment.
+    level : callable
+        current scalar level, e.g. served by an EndpointVolumeState.
+        Only used to notice changes made elsewhere.
+    submit : callable
+        submit(func, *args) runs a COM call and returns a Future,
+        e.g. a worker's submit. Calls run immediately by default.
+
+    Attributes
+    ----------
+    expected : float
+        scalar level after the last step, None when unknown ("db" mode).
+    """
+
+    def __init__(
+        self,
+        endpoint_volume,
+        device_id=None,
+        mode="native",
+        step_db=1.5,
+        level=None,
+        submit=_call_now,
+        cache=volume_range_cache,
+    ):
+        if mode not in ("native", "db"):
+            raise ValueError("mode must be 'native' or 'db', not %r" % (mode,))
+        self._endpoint_volume = endpoint_volume
+        self.range = cache.get(device_id, endpoint_volume)
+        self.mode = mode
+        increment = self.range.increment_db or step_db
+        self.step_db = max(1, round(step_db / increment)) * increment
+        self._level = level or endpoint_volume.GetMasterVolumeLevelScalar
+        self._submit = submit
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._index = None
+        self._db = None
+        self._db_level = None
+        self.expected = None
+
+    @property
+    def native(self):
+        return self.mode == "native" and self.range.step_count > 1
+
+    def step(self, direction):
+        """
+        Move one step up (direction > 0) or down.
+        Returns False if the volume is already at the limit.
+        """
+        if self.native:
+            return self._step_native(direction)
+        return self._step_db(direction)
+
+    def _external_change(self, level, expected, tolerance):
+        # a level far from what our own steps produce, with none of them pending,
+        # was set by someone else
+        return self._in_flight == 0 and abs(level - expected) > tolerance
+
+    def _step_native(self, direction):
+        volume_range = self.range
+        last = volume_range.step_count - 1
+        # read outside the lock, level() may wait for the thread running our steps
+        level = self._level()
+        with self._lock:
+            if self._index is None or self._external_change(
+                level, self.expected, 0.5 / last
+            ):
+                self._index = volume_range.index(level)
+                self.expected = volume_range.levels[self._index]
+            index = self._index + (1 if direction > 0 else -1)
+            if index < 0 or index > last:
+                return False
+            self._index = index
+            self.expected = volume_range.levels[index]
+            self._in_flight += 1
+        method = (
+            self._endpoint_volume.VolumeStepUp
+            if direction > 0
+            else self._endpoint_volume.VolumeStepDown
+        )
+        self._submit(self._apply, method, None)
+        return True
+
+    def _step_db(self, direction):
+        grid = self.range.db_grid(self.step_db)
+        level = self._level()
+        with self._lock:
+            resync = self._db is None or self._external_change(
+                level, self._db_level, 0.005
+            )
+        if resync:
+            # not under the lock, the read queues behind our pending writes
+            db = self._submit(self._endpoint_volume.GetMasterVolumeLevel).result()
+            level = self._level()
+            with self._lock:
+                self._db = db
+                self._db_level = level
+        with self._lock:
+            position = min(
+                range(len(grid)), key=lambda i: abs(grid[i] - self._db)
+            )
+            position += 1 if direction > 0 else -1
+            if position < 0 or position >= len(grid):
+                return False
+            self._db = grid[position]
+            self.expected = None
+            self._in_flight += 1
+        self._submit(self._apply_db, self._db)
+        return True
+
+    def _apply(self, method, *args):
+        try:
+            return method(*args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _apply_db(self, db):
+        try:
+            self._endpoint_volume.SetMasterVolumeLevel(db, None)
+            level = self._endpoint_volume.GetMasterVolumeLevelScalar()
+            with self._lock:
+                self._db_level = level
+            return level
+        finally:
+            with self._lock:
+                self._in_flight -= 1
@@ -1,55 +1,81 @@
-import warnings
+import threading
 
 import comtypes
-import psutil
-from _ctypes import COMError
 
-from pycaw.api.audioclient import ISimpleAudioVolume
-from pycaw.api.audiopolicy import IAudioSessionControl2, IAudioSessionManager2
-from pycaw.api.endpointvolume import IAudioEndpointVolume
+from pycaw.api.audioclient import IChannelAudioVolume, ISimpleAudioVolume
+from pycaw.api.audiopolicy import IAudioSessionManager2
+from pycaw.api.endpointvolume import IAudioMeterInformation
 from pycaw.api.mmdeviceapi import IMMDeviceEnumerator, IMMEndpoint
 from pycaw.constants import (
-    DEVICE_STATE,
-    STGM,
-    AudioDeviceState,
     CLSID_MMDeviceEnumerator,
     EDataFlow,
     ERole,
     IID_Empty,
 )
+from pycaw.devices import AudioDevice, PropertyStore, all_devices, create_device  # noqa: F401
+from pycaw.processes import process_name_resolver
+from pycaw.sessions import SESSION_FIELDS, session_enumerator
 
 
-class AudioDevice:
+class DeviceEnumeratorCache:
     """
-    http://stackoverflow.com/a/20982715/185510
+    Process-wide IMMDeviceEnumerator cache.
+
+    CoCreateInstance of the enumerator is the most expensive call on
+    the hot paths, so it is done once and shared by all AudioUtilities
+    methods. Default endpoints are not cached: the default device can
+    change without any notification client registered to tell, so
+    GetDefaultAudioEndpoint is asked on every request.
+    MMNotificationClient calls invalidate() on every device topology
+    change, after which the next request activates again.
+
+    Counters
+    --------
+    activations : int
+        CoCreateInstance calls made.
+    saved : int
+        requests served from the cache instead of a new activation.
+    invalidations : int
+        number of invalidate() calls.
     """
 
-    def __init__(self, id, state, properties, dev):
-        self.id = id
-        self.state = state
-        self.properties = properties
-        self._dev = dev
-        self._volume = None
-
-    def __str__(self):
-        return "AudioDevice: %s" % (self.FriendlyName)
-
-    @property
-    def FriendlyName(self):
-        DEVPKEY_Device_FriendlyName = (
-            "{a45c254e-df1c-4efd-8020-67d146a850e0} 14".upper()
-        )
-        value = self.properties.get(DEVPKEY_Device_FriendlyName)
-        return value
-
-    @property
-    def EndpointVolume(self):
-        if self._volume is None:
-            iface = self._dev.Activate(
-                IAudioEndpointVolume._iid_, comtypes.CLSCTX_ALL, None
-            )
-            self._volume = iface.QueryInterface(IAudioEndpointVolume)
-        return self._volume
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._enumerator = None
+        self.activations = 0
+        self.saved = 0
+        self.invalidations = 0
+
+    def enumerator(self):
+        with self._lock:
+            if self._enumerator is None:
+                self._enumerator = comtypes.CoCreateInstance(
+                    CLSID_MMDeviceEnumerator,
+                    IMMDeviceEnumerator,
+                    comtypes.CLSCTX_INPROC_SERVER,
+                )
+                self.activations += 1
+            else:
+                self.saved += 1
+            return self._enumerator
+
+    def default_endpoint(self, flow, role):
+        return self.enumerator().GetDefaultAudioEndpoint(flow, role)
+
+    def invalidate(self):
+        with self._lock:
+            self._enumerator = None
+            self.invalidations += 1
+
+    def stats(self):
+        return {
+            "activations": self.activations,
+            "saved": self.saved,
+            "invalidations": self.invalidations,
+        }
+
+
+device_enumerator_cache = DeviceEnumeratorCache()
 
 
 class AudioSession:
@@ -61,19 +87,25 @@ class AudioSession:
         self._ctl = audio_session_control2
         self._process = None
         self._volume = None
+        self._channels = None
+        self._meter = None
         self._callback = None
 
     def __str__(self):
         s = self.DisplayName
         if s:
             return "DisplayName: " + s
-        if self.Process is not None:
-            return "Process: " + self.Process.name()
+        name = self.ProcessName
+        if name is not None:
+            return "Process: " + name
         return "Pid: %s" % (self.ProcessId)
 
     @property
     def Process(self):
         if self._process is None and self.ProcessId != 0:
+            # psutil is only loaded by code asking for the process object
+            import psutil
+
             try:
                 self._process = psutil.Process(self.ProcessId)
             except psutil.NoSuchProcess:
@@ -81,6 +113,15 @@ class AudioSession:
                 return None
         return self._process
 
+    @property
+    def ProcessName(self):
+        """
+        Executable name of the session's process, or None.
+        Looked up through pycaw.processes.process_name_resolver,
+        warm it with resolve(pids) when asking for many sessions.
+        """
+        return process_name_resolver.name(self.ProcessId)
+
     @property
     def ProcessId(self):
         return self._ctl.GetProcessId()
@@ -145,6 +186,18 @@ class AudioSession:
             self._volume = self._ctl.QueryInterface(ISimpleAudioVolume)
         return self._volume
 
+    @property
+    def ChannelAudioVolume(self):
+        if self._channels is None:
+            self._channels = self._ctl.QueryInterface(IChannelAudioVolume)
+        return self._channels
+
+    @property
+    def Meter(self):
+        if self._meter is None:
+            self._meter = self._ctl.QueryInterface(IAudioMeterInformation)
+        return self._meter
+
     def register_notification(self, callback):
         if self._callback is None:
             self._callback = callback
@@ -165,26 +218,18 @@ class AudioUtilities:
         """
         get the speakers (1st render + multimedia) device
         """
-        deviceEnumerator = comtypes.CoCreateInstance(
-            CLSID_MMDeviceEnumerator, IMMDeviceEnumerator, comtypes.CLSCTX_INPROC_SERVER
-        )
-        speakers = deviceEnumerator.GetDefaultAudioEndpoint(
+        return device_enumerator_cache.default_endpoint(
             EDataFlow.eRender.value, ERole.eMultimedia.value
         )
-        return speakers
 
     @staticmethod
     def GetMicrophone():
         """
         get the microphone (1st capture + multimedia) device
         """
-        deviceEnumerator = comtypes.CoCreateInstance(
-            CLSID_MMDeviceEnumerator, IMMDeviceEnumerator, comtypes.CLSCTX_INPROC_SERVER
-        )
-        microphone = deviceEnumerator.GetDefaultAudioEndpoint(
+        return device_enumerator_cache.default_endpoint(
             EDataFlow.eCapture.value, ERole.eMultimedia.value
         )
-        return microphone
 
     @staticmethod
     def GetAudioSessionManager():
@@ -198,24 +243,47 @@ class AudioUtilities:
 
     @staticmethod
     def GetAllSessions():
-        audio_sessions = []
         mgr = AudioUtilities.GetAudioSessionManager()
         if mgr is None:
-            return audio_sessions
-        sessionEnumerator = mgr.GetSessionEnumerator()
-        count = sessionEnumerator.GetCount()
-        for i in range(count):
-            ctl = sessionEnumerator.GetSession(i)
-            if ctl is None:
-                continue
-            ctl2 = ctl.QueryInterface(IAudioSessionControl2)
-            if ctl2 is not None:
-                audio_session = AudioSession(ctl2)
-                audio_sessions.append(audio_session)
-        return audio_sessions
+            return []
+        return [record.session for record in session_enumerator.records(mgr, ())]
+
+    @staticmethod
+    def GetAllSessionRecords(fields=SESSION_FIELDS):
+        """
+        pycaw.sessions.SessionRecord of every session, filled with
+        'fields' in one pass. session_enumerator.per_session tells
+        the COM calls it took.
+        """
+        mgr = AudioUtilities.GetAudioSessionManager()
+        if mgr is None:
+            return []
+        return session_enumerator.records(mgr, fields)
+
+    # a live pycaw.registry.SessionRegistry, see UseSessionRegistry
+    session_registry = None
+
+    @staticmethod
+    def UseSessionRegistry(registry):
+        """
+        Answer the session lookups below from the registry's index
+        instead of enumerating all sessions, None to stop.
+        """
+        AudioUtilities.session_registry = registry
+
+    @staticmethod
+    def _live_registry():
+        registry = AudioUtilities.session_registry
+        if registry is None or registry.closed:
+            return None
+        return registry
 
     @staticmethod
     def GetProcessSession(id):
+        registry = AudioUtilities._live_registry()
+        if registry is not None:
+            entries = registry.by_pid(id)
+            return entries[0].session if entries else None
         for session in AudioUtilities.GetAllSessions():
             if session.ProcessId == id:
                 return session
@@ -223,63 +291,52 @@ class AudioUtilities:
         return None
 
     @staticmethod
-    def CreateDevice(dev):
-        if dev is None:
-            return None
-        id = dev.GetId()
-        state = dev.GetState()
-        properties = {}
-        store = dev.OpenPropertyStore(STGM.STGM_READ.value)
-        if store is not None:
-            propCount = store.GetCount()
-            for j in range(propCount):
-                try:
-                    pk = store.GetAt(j)
-                    value = store.GetValue(pk)
-                    v = value.GetValue()
-                except COMError as exc:
-                    warnings.warn(
-                        "COMError attempting to get property %r "
-                        "from device %r: %r" % (j, dev, exc)
-                    )
-                    continue
-                value.clear()
-                name = str(pk)
-                properties[name] = v
-        audioState = AudioDeviceState(state)
-        return AudioDevice(id, audioState, properties, dev)
+    def GetProcessSessions(id):
+        """All sessions of a process id."""
+        registry = AudioUtilities._live_registry()
+        if registry is not None:
+            return [entry.session for entry in registry.by_pid(id)]
+        return [s for s in AudioUtilities.GetAllSessions() if s.ProcessId == id]
 
     @staticmethod
-    def GetAllDevices():
-        devices = []
-        deviceEnumerator = comtypes.CoCreateInstance(
-            CLSID_MMDeviceEnumerator, IMMDeviceEnumerator, comtypes.CLSCTX_INPROC_SERVER
-        )
-        if deviceEnumerator is None:
-            return devices
+    def GetSessionsByName(name):
+        """All sessions of an executable name, e.g. "firefox.exe", any case."""
+        registry = AudioUtilities._live_registry()
+        if registry is not None:
+            return [entry.session for entry in registry.by_exe(name)]
+        name = name.lower()
+        return [
+            s
+            for s in AudioUtilities.GetAllSessions()
+            if s.ProcessName and s.ProcessName.lower() == name
+        ]
 
-        collection = deviceEnumerator.EnumAudioEndpoints(
-            EDataFlow.eAll.value, DEVICE_STATE.MASK_ALL.value
-        )
-        if collection is None:
-            return devices
+    @staticmethod
+    def GetSessionByInstanceIdentifier(iid):
+        registry = AudioUtilities._live_registry()
+        if registry is not None:
+            entry = registry.get(iid)
+            return entry.session if entry is not None else None
+        for session in AudioUtilities.GetAllSessions():
+            if session.InstanceIdentifier == iid:
+                return session
+        return None
 
-        count = collection.GetCount()
-        for i in range(count):
-            dev = collection.Item(i)
-            if dev is not None:
-                devices.append(AudioUtilities.CreateDevice(dev))
-        return devices
+    @staticmethod
+    def CreateDevice(dev):
+        return create_device(dev)
+
+    @staticmethod
+    def GetAllDevices():
+        return all_devices(device_enumerator_cache.enumerator())
 
     @staticmethod
     def GetDeviceEnumerator():
         """
         Get an instance of IMMDeviceEnumerator.
+        The instance is shared, see DeviceEnumeratorCache.
         """
-        device_enumerator = comtypes.CoCreateInstance(
-            CLSID_MMDeviceEnumerator, IMMDeviceEnumerator, comtypes.CLSCTX_INPROC_SERVER
-        )
-        return device_enumerator
+        return device_enumerator_cache.enumerator()
 
     @staticmethod
     def GetEndpointDataFlow(devId, outputType=0):
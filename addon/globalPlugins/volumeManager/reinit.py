@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+# VolumeManager NVDA addon
+# Authors: Danstiv, Beqa gozalishvili
+# Copyright 2023, released under GPL.
+
+import threading
+import time
+
+
+def timer_call_later(delay, callback):
+    timer = threading.Timer(delay, callback)
+    timer.daemon = True
+    timer.start()
+
+
+class DebouncedReinitializer:
+    # Collapses bursts of device notifications (docking fires dozens of them)
+    # into a single rebuild once no event came for quiet_window seconds.
+    # rebuild(device_ids, default_changed) gets every device id seen in the burst
+    # and whether the default render device changed, so it can skip unaffected endpoints.
+    # Single flight: events arriving during a rebuild start one more rebuild after it.
+
+    def __init__(self, rebuild, quiet_window=0.5, call_later=timer_call_later, clock=time.monotonic):
+        self.rebuild = rebuild
+        self.quiet_window = quiet_window
+        self.call_later = call_later
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.device_ids = set()
+        self.default_changed = False
+        self.pending = 0
+        self.last_event = None
+        self.scheduled = False
+        self.running = False
+        self.events = 0
+        self.rebuilds = 0
+        self.collapsed = 0
+
+    def notify(self, device_id=None, default_changed=False):
+        with self.lock:
+            self.events += 1
+            self.pending += 1
+            if device_id is not None:
+                self.device_ids.add(device_id)
+            self.default_changed = self.default_changed or default_changed
+            self.last_event = self.clock()
+            if self.scheduled or self.running:
+                return
+            self.scheduled = True
+        self.call_later(self.quiet_window, self._on_timer)
+
+    def stats(self):
+        return {"events": self.events, "rebuilds": self.rebuilds, "collapsed": self.collapsed, "pending": self.pending}
+
+    def _on_timer(self):
+        with self.lock:
+            remaining = self.last_event + self.quiet_window - self.clock()
+            if remaining > 0:
+                self.call_later(remaining, self._on_timer)
+                return
+            self.scheduled = False
+            self.running = True
+            device_ids, self.device_ids = self.device_ids, set()
+            default_changed, self.default_changed = self.default_changed, False
+            count, self.pending = self.pending, 0
+        try:
+            self.rebuild(device_ids, default_changed)
+        finally:
+            with self.lock:
+                self.running = False
+                self.rebuilds += 1
+                self.collapsed += count - 1
+                again = self.pending and not self.scheduled
+                if again:
+                    self.scheduled = True
+            if again:
+                self.call_later(self.quiet_window, self._on_timer)
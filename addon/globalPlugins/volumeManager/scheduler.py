@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+# VolumeManager NVDA addon
+# Authors: Danstiv, Beqa gozalishvili
+# Copyright 2023, released under GPL.
+
+import time
+
+
+class VolumeWriteScheduler:
+    # Coalesces the volume steps of a held arrow key.
+    # The first step is written at once, further steps within flush_interval
+    # are merged into a single SetMasterVolume at the end of the interval,
+    # and announce() only gets the value once no step came for settle_delay.
+
+    def __init__(self, announce, call_later, flush_interval=0.03, settle_delay=0.15, clock=time.monotonic, read=None, write=None):
+        # read(control) and write(control, volume) default to direct Get/SetMasterVolume calls
+        self.announce = announce
+        self.call_later = call_later
+        self.read = read or (lambda control: round(control.GetMasterVolume(), 2))
+        self.write = write or (lambda control, volume: control.SetMasterVolume(volume, None))
+        self.flush_interval = flush_interval
+        self.settle_delay = settle_delay
+        self.clock = clock
+        self.control = None
+        self.target = None
+        self.written = None
+        self.last_write = None
+        self.last_step = None
+        self.flush_scheduled = False
+        self.settle_scheduled = False
+        self.steps = 0
+        self.writes = 0
+        self.announcements = 0
+
+    def step(self, control, delta):
+        # Returns the new target volume, or None if the control is already at the limit.
+        if control is not self.control:
+            self.flush()
+            self.control = control
+        current = self.target if self.target is not None else self.read(control)
+        target = round(min(1.0, max(0.0, current + delta)), 2)
+        if target == current:
+            return None
+        self.steps += 1
+        self.target = target
+        now = self.clock()
+        self.last_step = now
+        if not self.flush_scheduled:
+            if self.last_write is None or now - self.last_write >= self.flush_interval:
+                self._write()
+            else:
+                self.flush_scheduled = True
+                self.call_later(self.flush_interval - (now - self.last_write), self._on_flush)
+        if not self.settle_scheduled:
+            self.settle_scheduled = True
+            self.call_later(self.settle_delay, self._on_settle)
+        return target
+
+    def stepped(self, control, volume):
+        # A step that was already written elsewhere (a native VolumeStepUp), it is only announced.
+        # volume may be None if it is not known yet, the announcement reads it then.
+        if control is not self.control:
+            self.flush()
+            self.control = control
+        self.steps += 1
+        self.target = self.written = volume
+        self.last_step = self.clock()
+        if not self.settle_scheduled:
+            self.settle_scheduled = True
+            self.call_later(self.settle_delay, self._on_settle)
+
+    def flush(self, announce=True):
+        # Write whatever is pending right away, and announce it unless told otherwise.
+        if self.control is None or (self.target is None and not self.settle_scheduled):
+            return
+        self._write()
+        if not self.settle_scheduled:
+            return
+        if announce:
+            self._announce()
+        else:
+            self.settle_scheduled = False
+            self.target = None
+            self.written = None
+
+    def _write(self):
+        if self.target != self.written:
+            self.write(self.control, self.target)
+            self.written = self.target
+            self.writes += 1
+        self.last_write = self.clock()
+
+    def _announce(self):
+        self.settle_scheduled = False
+        self.announcements += 1
+        self.announce(self.target if self.target is not None else self.read(self.control))
+        # the next step reads the volume again, it may have been changed elsewhere
+        self.target = None
+        self.written = None
+
+    def _on_flush(self):
+        self.flush_scheduled = False
+        if self.control is not None and self.target is not None:
+            self._write()
+
+    def _on_settle(self):
+        if not self.settle_scheduled:
+            return
+        remaining = self.last_step + self.settle_delay - self.clock()
+        if remaining > 0:
+            self.call_later(remaining, self._on_settle)
+            return
+        self._announce()
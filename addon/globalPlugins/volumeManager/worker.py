@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+
+# VolumeManager NVDA addon
+# Authors: Danstiv, Beqa gozalishvili
+# Copyright 2023, released under GPL.
+
+from concurrent.futures import Future
+import queue
+import threading
+import time
+
+
+# snapshot.get() default, None is a valid snapshot value
+_MISSING = object()
+
+
+def co_initialize_mta():
+    import comtypes
+    comtypes.CoInitializeEx(comtypes.COINIT_MULTITHREADED)
+
+
+def co_uninitialize():
+    import comtypes
+    comtypes.CoUninitialize()
+
+
+class LatencyStats:
+
+    __slots__ = ("count", "total", "max", "last")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class ComWorker:
+    # Runs audio COM calls on a dedicated MTA thread, so a slow or hung endpoint
+    # never blocks NVDA's main thread.
+    # submit() queues a call and returns a concurrent.futures.Future,
+    # read() answers read-only queries from the latest snapshot and refreshes it in the background,
+    # write() and forget() version the snapshot so a refresh queued before them cannot bring back an older value.
+
+    def __init__(self, max_queue=64, initializer=co_initialize_mta, uninitializer=co_uninitialize, clock=time.perf_counter, on_submit=None):
+        self.queue = queue.Queue(maxsize=max_queue)
+        # on_submit(name) is told about every submitted job, see instrumentation.Instrumentation.worker_job
+        self.on_submit = on_submit
+        self.initializer = initializer
+        self.uninitializer = uninitializer
+        self.clock = clock
+        self.snapshot = {}
+        # key -> number of write()/forget() calls, forget() of everything bumps the generation
+        self._versions = {}
+        self._generation = 0
+        self._snapshot_lock = threading.Lock()
+        self.latency = {}
+        self.rejected = 0
+        # keys with a refresh queued by read(), guarded by _snapshot_lock as well
+        self._refreshing = set()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="volumeManager COM worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        if self._thread is None:
+            return
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+    @property
+    def on_worker_thread(self):
+        return threading.current_thread() is self._thread
+
+    def submit(self, func, *args, name=None, snapshot_key=None):
+        future = Future()
+        if self.on_submit is not None:
+            self.on_submit(name)
+        if self.on_worker_thread:
+            # already on the worker, queueing would deadlock callers waiting for the result
+            self._execute(future, func, args, name, snapshot_key, self._stamp(snapshot_key))
+            return future
+        try:
+            self.queue.put_nowait((future, func, args, name, snapshot_key, self._stamp(snapshot_key)))
+        except queue.Full:
+            self.rejected += 1
+            future.set_exception(queue.Full("COM worker queue is full"))
+        return future
+
+    def call(self, func, *args, name=None, timeout=2.0):
+        return self.submit(func, *args, name=name).result(timeout)
+
+    def read(self, key, func, *args, name=None, timeout=2.0):
+        # Latest known value of a read-only query. The first read waits for the result,
+        # later reads return the snapshot immediately and schedule a refresh.
+        with self._snapshot_lock:
+            value = self.snapshot.get(key, _MISSING)
+            refresh = value is not _MISSING and key not in self._refreshing
+            if refresh:
+                self._refreshing.add(key)
+        if value is _MISSING:
+            return self.submit(func, *args, name=name, snapshot_key=key).result(timeout)
+        if refresh and self.submit(func, *args, name=name, snapshot_key=key).done():
+            # ran inline or was rejected, either way no refresh is pending
+            with self._snapshot_lock:
+                self._refreshing.discard(key)
+        return value
+
+    def write(self, key, value):
+        # the value just written, refreshes queued before are not stored over it
+        with self._snapshot_lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            self.snapshot[key] = value
+
+    def forget(self, key=None):
+        with self._snapshot_lock:
+            if key is None:
+                self._generation += 1
+                self._versions.clear()
+                self.snapshot.clear()
+            else:
+                self._versions[key] = self._versions.get(key, 0) + 1
+                self.snapshot.pop(key, None)
+
+    def _stamp(self, key):
+        if key is None:
+            return None
+        return (self._generation, self._versions.get(key, 0))
+
+    def stats(self):
+        return {name: (s.count, s.mean, s.max, s.last) for name, s in self.latency.items()}
+
+    def _execute(self, future, func, args, name, snapshot_key, stamp):
+        if not future.set_running_or_notify_cancel():
+            return
+        start = self.clock()
+        try:
+            result = func(*args)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            if snapshot_key is not None:
+                with self._snapshot_lock:
+                    if self._stamp(snapshot_key) == stamp:
+                        self.snapshot[snapshot_key] = result
+            future.set_result(result)
+        finally:
+            if snapshot_key is not None:
+                with self._snapshot_lock:
+                    self._refreshing.discard(snapshot_key)
+            key = name or getattr(func, "__name__", "call")
+            stats = self.latency.get(key)
+            if stats is None:
+                stats = self.latency[key] = LatencyStats()
+            stats.add(self.clock() - start)
+
+    def _run(self):
+        if self.initializer is not None:
+            self.initializer()
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+                self._execute(*item)
+        finally:
+            if self.uninitializer is not None:
+                self.uninitializer()
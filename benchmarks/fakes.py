@@ -0,0 +1,851 @@
+"""
+In-memory stand-ins for the Core Audio COM objects used by pycaw.
+
+Test and benchmark scaffolding, kept out of the add-on package. The
+classes mirror the small part of the comtypes interfaces that pycaw
+and the add-on call, and answer QueryInterface and Activate with
+pycaw's own interfaces. pycaw's sinks (pycaw.callbacks) and wrappers
+(pycaw.utils) run on them unchanged, with the comtypes stand-in of
+nvdastubs where comtypes is not installed:
+
+    import fakes
+    from nvdastubs import stub_comtypes
+
+    stub_comtypes()
+    mgr = fakes.FakeAudioSessionManager()
+    registry = SessionRegistry(mgr, resolver=ProcessNameResolver(mgr.snapshot))
+    ctl = mgr.add_session(1234, "vlc.exe")
+    ctl.expire()
+
+SimulatedBackend puts the whole mixer behind the pycaw.backend
+protocol, with thousands of sessions, injected call latency and event
+storms if needed. ManualClock drives VolumeWriteScheduler
+deterministically.
+
+Nothing in here imports comtypes itself. The add-on's directory
+(addon/globalPlugins/volumeManager) must be on sys.path.
+"""
+
+import itertools
+import math
+import random
+from ctypes import pointer
+
+from pycaw.backend import AudioBackend, Endpoint
+
+# see audiosessiontypes.h
+AudioSessionStateInactive = 0
+AudioSessionStateActive = 1
+AudioSessionStateExpired = 2
+
+# IIDs of the interfaces FakeMMDevice.Activate hands out
+IID_IAudioSessionManager2 = "{77AA99A0-1BD6-484F-8BC7-2C654C9A9B6F}"
+IID_IAudioEndpointVolume = "{5CDF2C82-841E-4546-9722-0CF74078229A}"
+IID_IAudioMeterInformation = "{C02216F6-8C67-4B5B-9D00-D008E73E0064}"
+
+
+class FakeSimpleAudioVolume:
+    """ISimpleAudioVolume"""
+
+    def __init__(self, volume=1.0, mute=0):
+        self._volume = volume
+        self._mute = mute
+        self._ctl = None
+
+    def GetMasterVolume(self):
+        return self._volume
+
+    def SetMasterVolume(self, level, event_context):
+        self._volume = level
+        if self._ctl is not None:
+            self._ctl.fire("OnSimpleVolumeChanged", level, self._mute, event_context)
+
+    def GetMute(self):
+        return self._mute
+
+    def SetMute(self, mute, event_context):
+        self._mute = mute
+        if self._ctl is not None:
+            self._ctl.fire("OnSimpleVolumeChanged", self._volume, mute, event_context)
+
+
+class FakeChannelAudioVolume:
+    """IChannelAudioVolume"""
+
+    def __init__(self, channels=2, volume=1.0):
+        self._volumes = [volume] * channels
+        self.calls = 0
+
+    def GetChannelCount(self):
+        return len(self._volumes)
+
+    def GetChannelVolume(self, index):
+        self.calls += 1
+        return self._volumes[index]
+
+    def SetChannelVolume(self, index, level, event_context):
+        self.calls += 1
+        self._volumes[index] = level
+
+    def GetAllVolumes(self, count, volumes):
+        self.calls += 1
+        for i in range(count):
+            volumes[i] = self._volumes[i]
+
+    def SetAllVolumes(self, count, volumes, event_context):
+        self.calls += 1
+        self._volumes[:count] = volumes[:count]
+
+
+class FakeAudioMeterInformation:
+    """IAudioMeterInformation, peak is a value or a callable returning one"""
+
+    def __init__(self, peak=0.0):
+        self.peak = peak
+
+    def QueryInterface(self, interface):
+        return self
+
+    def GetPeakValue(self):
+        return self.peak() if callable(self.peak) else self.peak
+
+
+class FakeAudioSessionControl:
+    """
+    IAudioSessionControl2. QueryInterface returns the control itself,
+    or its volume, channels or meter when asked for ISimpleAudioVolume,
+    IChannelAudioVolume or IAudioMeterInformation.
+    """
+
+    def __init__(
+        self, pid, process_name=None, display_name="", instance_id=None, volume=None
+    ):
+        self.pid = pid
+        self.process_name = process_name
+        self._display_name = display_name
+        self._instance_id = instance_id
+        self._state = AudioSessionStateInactive
+        self.volume = volume if volume is not None else FakeSimpleAudioVolume()
+        self.volume._ctl = self
+        self.meter = FakeAudioMeterInformation()
+        self.channels = FakeChannelAudioVolume()
+        self._sinks = []
+
+    # ____ IAudioSessionControl2 ____
+
+    def QueryInterface(self, interface):
+        name = interface.__name__
+        if name == "ISimpleAudioVolume":
+            return self.volume
+        if name == "IChannelAudioVolume":
+            return self.channels
+        if name == "IAudioMeterInformation":
+            return self.meter
+        return self
+
+    def GetProcessId(self):
+        return self.pid
+
+    def GetDisplayName(self):
+        return self._display_name
+
+    def SetDisplayName(self, value, event_context):
+        self._display_name = value
+        self.fire("OnDisplayNameChanged", value, event_context)
+
+    def GetState(self):
+        return self._state
+
+    def GetSessionIdentifier(self):
+        return self._instance_id.rsplit("|", 1)[0]
+
+    def GetSessionInstanceIdentifier(self):
+        return self._instance_id
+
+    def IsSystemSoundsSession(self):
+        # S_OK = 0, S_FALSE = 1
+        return 0 if self.pid == 0 else 1
+
+    def RegisterAudioSessionNotification(self, sink):
+        self._sinks.append(sink)
+
+    def UnregisterAudioSessionNotification(self, sink):
+        self._sinks.remove(sink)
+
+    # ____ driving the fake ____
+
+    def fire(self, event, *args):
+        for sink in list(self._sinks):
+            getattr(sink, event)(*args)
+
+    def set_state(self, state):
+        self._state = state
+        self.fire("OnStateChanged", state)
+
+    def expire(self):
+        self.set_state(AudioSessionStateExpired)
+
+
+class FakeAudioSessionEnumerator:
+    """IAudioSessionEnumerator"""
+
+    def __init__(self, sessions):
+        self._sessions = sessions
+
+    def GetCount(self):
+        return len(self._sessions)
+
+    def GetSession(self, index):
+        return self._sessions[index]
+
+
+class FakeAudioSessionManager:
+    """IAudioSessionManager2"""
+
+    def __init__(self, wrap=None):
+        self._sessions = []
+        self._sinks = []
+        self._ids = itertools.count(1)
+        # applied to the sessions handed to OnSessionCreated
+        self._wrap = wrap
+
+    def QueryInterface(self, interface):
+        return self
+
+    def RegisterSessionNotification(self, sink):
+        self._sinks.append(sink)
+
+    def UnregisterSessionNotification(self, sink):
+        self._sinks.remove(sink)
+
+    def GetSessionEnumerator(self):
+        return FakeAudioSessionEnumerator(
+            [s for s in self._sessions if s.GetState() != AudioSessionStateExpired]
+        )
+
+    def snapshot(self, pids, names):
+        """ProcessNameResolver snapshot over the fake processes."""
+        processes = {s.pid: s.process_name for s in self._sessions if s.process_name}
+        return {pid: (0.0, processes[pid]) for pid in pids if pid in processes}
+
+    def add_session(self, pid, process_name=None, display_name="", notify=True):
+        """Create a session, as if an app opened a stream."""
+        instance_id = "fake|%s|%d" % (process_name, next(self._ids))
+        ctl = FakeAudioSessionControl(pid, process_name, display_name, instance_id)
+        self._sessions.append(ctl)
+        if notify:
+            created = ctl if self._wrap is None else self._wrap(ctl)
+            for sink in list(self._sinks):
+                sink.OnSessionCreated(created)
+        return ctl
+
+
+def volume_notification(volume, mute=0, channel_volumes=(), event_context=None):
+    """
+    Pointer to an AUDIO_VOLUME_NOTIFICATION_DATA, as OnNotify receives
+    it. event_context is a comtypes GUID or None.
+    """
+    from pycaw.api.endpointvolume.depend import AUDIO_VOLUME_NOTIFICATION_DATA
+
+    data = AUDIO_VOLUME_NOTIFICATION_DATA()
+    if event_context is not None:
+        data.guidEventContext = event_context
+    data.bMuted = mute
+    data.fMasterVolume = volume
+    data.nChannels = len(channel_volumes)
+    for i, level in enumerate(channel_volumes):
+        data.afChannelVolumes[i] = level
+    return pointer(data)
+
+
+class FakeAudioEndpointVolume:
+    """IAudioEndpointVolume"""
+
+    def __init__(
+        self,
+        volume=1.0,
+        mute=0,
+        channels=2,
+        min_db=-65.25,
+        max_db=0.0,
+        increment_db=0.03125,
+        step_count=101,
+    ):
+        self._volume = volume
+        self._mute = mute
+        self._channels = [volume] * channels
+        self._range = (min_db, max_db, increment_db)
+        self._step_count = step_count
+        self._sinks = []
+        # number of calls per method name, to see what hit "COM"
+        self.calls = {}
+
+    def _count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def QueryInterface(self, interface):
+        return self
+
+    def notify(self, event_context=None):
+        pNotify = volume_notification(
+            self._volume, self._mute, self._channels, event_context
+        )
+        for sink in list(self._sinks):
+            sink.OnNotify(pNotify)
+
+    def RegisterControlChangeNotify(self, sink):
+        self._sinks.append(sink)
+
+    def UnregisterControlChangeNotify(self, sink):
+        self._sinks.remove(sink)
+
+    def GetMasterVolumeLevelScalar(self):
+        self._count("GetMasterVolumeLevelScalar")
+        return self._volume
+
+    def SetMasterVolumeLevelScalar(self, level, event_context):
+        self._count("SetMasterVolumeLevelScalar")
+        self._volume = level
+        self._channels = [level] * len(self._channels)
+        self.notify(event_context)
+
+    def _to_db(self, level):
+        # a plain 20*log10 taper stands in for the driver's curve
+        min_db, max_db, _increment = self._range
+        if level <= 0:
+            return min_db
+        return min(max_db, max(min_db, 20 * math.log10(level)))
+
+    def _to_level(self, db):
+        min_db, max_db, _increment = self._range
+        if db <= min_db:
+            return 0.0
+        return min(1.0, 10 ** (db / 20))
+
+    def GetMasterVolumeLevel(self):
+        self._count("GetMasterVolumeLevel")
+        return self._to_db(self._volume)
+
+    def SetMasterVolumeLevel(self, db, event_context):
+        self._count("SetMasterVolumeLevel")
+        self._volume = self._to_level(db)
+        self._channels = [self._volume] * len(self._channels)
+        self.notify(event_context)
+
+    def GetVolumeRange(self):
+        self._count("GetVolumeRange")
+        return self._range
+
+    def GetVolumeStepInfo(self):
+        self._count("GetVolumeStepInfo")
+        last = self._step_count - 1
+        return (int(round(self._volume * last)), self._step_count)
+
+    def _step(self, delta, event_context):
+        last = self._step_count - 1
+        step = min(last, max(0, int(round(self._volume * last)) + delta))
+        self._volume = step / last
+        self._channels = [self._volume] * len(self._channels)
+        self.notify(event_context)
+
+    def VolumeStepUp(self, event_context):
+        self._count("VolumeStepUp")
+        self._step(1, event_context)
+
+    def VolumeStepDown(self, event_context):
+        self._count("VolumeStepDown")
+        self._step(-1, event_context)
+
+    def GetMute(self):
+        self._count("GetMute")
+        return self._mute
+
+    def SetMute(self, mute, event_context):
+        self._count("SetMute")
+        self._mute = mute
+        self.notify(event_context)
+
+    def GetChannelCount(self):
+        self._count("GetChannelCount")
+        return len(self._channels)
+
+    def GetChannelVolumeLevelScalar(self, channel):
+        self._count("GetChannelVolumeLevelScalar")
+        return self._channels[channel]
+
+    def SetChannelVolumeLevelScalar(self, channel, level, event_context):
+        self._count("SetChannelVolumeLevelScalar")
+        self._channels[channel] = level
+        self._volume = max(self._channels)
+        self.notify(event_context)
+
+
+class FakeMixer:
+    """
+    An endpoint volume and a session manager, for whole-mixer code
+    such as pycaw.profiles.
+    """
+
+    def __init__(self, volume=1.0, mute=0):
+        self.endpoint_volume = FakeAudioEndpointVolume(volume, mute)
+        self.manager = FakeAudioSessionManager()
+
+    def add_app(self, process_name, volume=1.0, mute=0, pid=None):
+        if pid is None:
+            pid = 1000 + len(self.manager._sessions)
+        ctl = self.manager.add_session(pid, process_name)
+        ctl.volume._volume = volume
+        ctl.volume._mute = mute
+        return ctl
+
+    def session_volumes(self):
+        """(exe, ISimpleAudioVolume) of the live sessions."""
+        enumerator = self.manager.GetSessionEnumerator()
+        for i in range(enumerator.GetCount()):
+            ctl = enumerator.GetSession(i)
+            if ctl.process_name:
+                yield ctl.process_name, ctl.volume
+
+
+# see functiondiscoverykeys_devpkey.h
+PKEY_Device_FriendlyName = "{A45C254E-DF1C-4EFD-8020-67D146A850E0} 14"
+PKEY_Device_DeviceDesc = "{A45C254E-DF1C-4EFD-8020-67D146A850E0} 2"
+PKEY_DeviceInterface_FriendlyName = "{026E516E-B814-414B-83CD-856D6FEF4822} 2"
+
+# see wtypes.h
+VT_EMPTY = 0
+VT_LPWSTR = 31
+
+
+class FakePropertyKey:
+    """PROPERTYKEY as GetAt returns it, str() gives "{FMTID} pid" """
+
+    __slots__ = ("fmtid", "pid")
+
+    def __init__(self, fmtid, pid):
+        self.fmtid = fmtid.upper()
+        self.pid = pid
+
+    def __str__(self):
+        return "%s %s" % (self.fmtid, self.pid)
+
+
+class FakePropVariant:
+    """PROPVARIANT"""
+
+    __slots__ = ("vt", "_value")
+
+    def __init__(self, value=None):
+        self.vt = VT_EMPTY if value is None else VT_LPWSTR
+        self._value = value
+
+    def GetValue(self):
+        return self._value
+
+    def clear(self):
+        self.vt = VT_EMPTY
+        self._value = None
+
+
+class FakePropertyStore:
+    """IPropertyStore over a dict of "{FMTID} pid" strings to values"""
+
+    def __init__(self, values):
+        self._keys = []
+        self._values = {}
+        for name, value in values.items():
+            fmtid, pid = name.rsplit(" ", 1)
+            self._keys.append(FakePropertyKey(fmtid, int(pid)))
+            self._values[name.upper()] = value
+
+    def GetCount(self):
+        return len(self._keys)
+
+    def GetAt(self, index):
+        return self._keys[index]
+
+    def GetValue(self, key):
+        return FakePropVariant(self._values.get(str(key).upper()))
+
+
+class FakeMMDevice:
+    """
+    IMMDevice and IMMEndpoint. flow is 0 for a render, 1 for a capture
+    device, state one of the DEVICE_STATE flags. Activate hands out
+    the session manager, endpoint volume and meter given, by IID.
+    """
+
+    def __init__(
+        self,
+        device_id,
+        name,
+        flow=0,
+        state=1,
+        session_manager=None,
+        endpoint_volume=None,
+        meter=None,
+    ):
+        self.device_id = device_id
+        self.name = name
+        self.flow = flow
+        self.state = state
+        self._interfaces = {
+            IID_IAudioSessionManager2: session_manager,
+            IID_IAudioEndpointVolume: endpoint_volume,
+            IID_IAudioMeterInformation: meter,
+        }
+
+    def Activate(self, iid, clsctx, activation_params):
+        interface = self._interfaces.get(str(iid).upper())
+        if interface is None:
+            # E_NOINTERFACE
+            raise LookupError("interface %s not available" % iid)
+        return interface
+
+    def QueryInterface(self, interface):
+        return self
+
+    def GetDataFlow(self):
+        return self.flow
+
+    def GetId(self):
+        return self.device_id
+
+    def GetState(self):
+        return self.state
+
+    def OpenPropertyStore(self, access):
+        return FakePropertyStore(
+            {
+                PKEY_Device_FriendlyName: self.name,
+                PKEY_Device_DeviceDesc: self.name.split(" (", 1)[0],
+                PKEY_DeviceInterface_FriendlyName: "Simulated Audio",
+            }
+        )
+
+
+class FakeMMDeviceCollection:
+    """IMMDeviceCollection"""
+
+    def __init__(self, devices):
+        self._devices = devices
+
+    def GetCount(self):
+        return len(self._devices)
+
+    def Item(self, index):
+        return self._devices[index]
+
+
+class FakeDeviceEnumerator:
+    """IMMDeviceEnumerator"""
+
+    def __init__(self, devices=()):
+        self.devices = list(devices)
+        self._sinks = []
+
+    def EnumAudioEndpoints(self, flow, state_mask):
+        # 2 is eAll
+        return FakeMMDeviceCollection(
+            [
+                dev
+                for dev in self.devices
+                if flow in (2, dev.flow) and dev.state & state_mask
+            ]
+        )
+
+    def GetDefaultAudioEndpoint(self, flow, role):
+        # the first active device of the flow, for every role
+        for dev in self.devices:
+            if dev.flow == flow and dev.state == 1:
+                return dev
+        raise LookupError("no active device for data flow %r" % flow)
+
+    def GetDevice(self, device_id):
+        for dev in self.devices:
+            if dev.device_id == device_id:
+                return dev
+        raise LookupError(device_id)
+
+    def RegisterEndpointNotificationCallback(self, sink):
+        self._sinks.append(sink)
+
+    def UnregisterEndpointNotificationCallback(self, sink):
+        self._sinks.remove(sink)
+
+    def fire(self, event, *args):
+        for sink in list(self._sinks):
+            getattr(sink, event)(*args)
+
+
+class SlowProxy:
+    """
+    Wraps a fake (or real) COM object and sleeps 'latency' seconds
+    before every method call, to model a slow audio service.
+
+    wrap(value), if given, is applied to attributes and call results,
+    so the objects they return can be slowed down as well.
+    """
+
+    def __init__(self, target, latency, sleep=None, wrap=None):
+        if sleep is None:
+            import time
+
+            sleep = time.sleep
+        self._target = target
+        self._latency = latency
+        self._sleep = sleep
+        self._wrap = wrap
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        wrap = self._wrap
+        if not callable(attr):
+            return attr if wrap is None else wrap(attr)
+
+        def call(*args, **kwargs):
+            self._sleep(self._latency)
+            result = attr(*args, **kwargs)
+            return result if wrap is None else wrap(result)
+
+        return call
+
+
+# the fake objects a SimulatedBackend hands out behind a SlowProxy
+_COM_CLASSES = (
+    FakeAudioSessionManager,
+    FakeAudioSessionEnumerator,
+    FakeAudioSessionControl,
+    FakeSimpleAudioVolume,
+    FakeChannelAudioVolume,
+    FakeAudioMeterInformation,
+    FakeAudioEndpointVolume,
+    FakeDeviceEnumerator,
+    FakeMMDeviceCollection,
+    FakeMMDevice,
+    FakePropertyStore,
+)
+
+# process names handed out by SimulatedBackend.populate()
+SIMULATED_APPS = (
+    "chrome.exe",
+    "firefox.exe",
+    "msedge.exe",
+    "spotify.exe",
+    "teams.exe",
+    "discord.exe",
+    "vlc.exe",
+    "foobar2000.exe",
+)
+
+
+class SimulatedBackend(AudioBackend):
+    """
+    pycaw.backend.AudioBackend kept in memory, to run and measure the
+    add-on without Windows.
+
+    Parameters
+    ----------
+    sessions : int
+        sessions created by populate() right away.
+    latency : float
+        seconds every COM call takes, 0 for none.
+    seed : int
+        seed of populate(), churn() and storm(), so runs repeat exactly.
+    sleep : callable
+        sleep(seconds) for the latency, time.sleep by default.
+        ManualClock.advance keeps the latency out of wall time.
+
+    Attributes
+    ----------
+    mixer : FakeMixer
+        the endpoint volume and session manager behind the backend.
+    meter : FakeAudioMeterInformation
+        peak meter of the endpoint.
+    enumerator : FakeDeviceEnumerator
+        the simulated speakers (device_id) and a few other render and
+        capture devices in various states.
+    calls : int
+        COM calls made through the objects the backend handed out.
+    """
+
+    device_id = "{0.0.0.00000000}.{simulated-speakers}"
+
+    def __init__(self, sessions=0, latency=0.0, seed=0, sleep=None):
+        if sleep is None:
+            import time
+
+            sleep = time.sleep
+        self.latency = latency
+        self.calls = 0
+        self._sleep = sleep
+        self._random = random.Random(seed)
+        # one proxy per object, so identities stay stable
+        self._proxies = {}
+        self.mixer = FakeMixer()
+        self.mixer.manager = FakeAudioSessionManager(wrap=self._wrap)
+        self.meter = FakeAudioMeterInformation()
+        self.enumerator = FakeDeviceEnumerator(
+            [
+                FakeMMDevice(
+                    self.device_id,
+                    "Speakers (Simulated Audio)",
+                    session_manager=self.mixer.manager,
+                    endpoint_volume=self.mixer.endpoint_volume,
+                    meter=self.meter,
+                ),
+                FakeMMDevice(
+                    "{0.0.0.00000000}.{simulated-headphones}",
+                    "Headphones (Simulated Audio)",
+                    state=8,
+                ),
+                FakeMMDevice(
+                    "{0.0.0.00000000}.{simulated-hdmi}",
+                    "Display Audio (Simulated HDMI)",
+                    state=4,
+                ),
+                FakeMMDevice(
+                    "{0.0.1.00000000}.{simulated-microphone}",
+                    "Microphone (Simulated Audio)",
+                    flow=1,
+                ),
+            ]
+        )
+        self.populate(sessions)
+
+    @property
+    def sinks(self):
+        from pycaw import callbacks
+
+        return callbacks
+
+    def _call(self, latency):
+        self.calls += 1
+        if latency:
+            self._sleep(latency)
+
+    def _wrap(self, value):
+        if not isinstance(value, _COM_CLASSES):
+            return value
+        proxy = self._proxies.get(id(value))
+        if proxy is None:
+            proxy = SlowProxy(value, self.latency, self._call, self._wrap)
+            self._proxies[id(value)] = proxy
+        return proxy
+
+    # ____ AudioBackend ____
+
+    def default_endpoint(self):
+        return Endpoint(
+            self.device_id,
+            self._wrap(self.mixer.endpoint_volume),
+            self._wrap(self.meter),
+        )
+
+    def session_manager(self):
+        return self._wrap(self.mixer.manager)
+
+    def device_enumerator(self):
+        return self._wrap(self.enumerator)
+
+    def process_resolver(self):
+        from pycaw.processes import ProcessNameResolver
+
+        return ProcessNameResolver(self.mixer.manager.snapshot)
+
+    # ____ driving the simulation ____
+
+    def sessions(self):
+        """The live session controls."""
+        manager = self.mixer.manager
+        return [
+            ctl
+            for ctl in manager._sessions
+            if ctl.GetState() != AudioSessionStateExpired
+        ]
+
+    def populate(self, count, active=0.25, names=SIMULATED_APPS):
+        """
+        Open count sessions. Most get a name of their own, the others
+        share the names given, like browser tabs. A share of them is
+        active and has a peak level.
+        """
+        rng = self._random
+        created = []
+        for _ in range(count):
+            if rng.random() < 0.3:
+                name = rng.choice(names)
+            else:
+                name = "app%d.exe" % rng.randrange(1, 10 * count + 1)
+            ctl = self.mixer.add_app(name, volume=round(rng.random(), 2))
+            if rng.random() < active:
+                ctl.meter.peak = rng.random()
+                ctl.set_state(AudioSessionStateActive)
+            created.append(ctl)
+        return created
+
+    def churn(self, count):
+        """Expire count random sessions and open as many new ones."""
+        live = self.sessions()
+        for ctl in self._random.sample(live, min(count, len(live))):
+            ctl.expire()
+        return self.populate(count)
+
+    def storm(self, count, kinds=("volume", "state", "endpoint")):
+        """
+        Fire count events, picked from kinds: "volume" (a session's
+        volume changed), "state" (a session started or stopped
+        playing), "endpoint" (the master volume changed) and
+        "device" (the endpoint's state changed).
+        """
+        rng = self._random
+        live = self.sessions()
+        endpoint = self.mixer.endpoint_volume
+        for _ in range(count):
+            kind = rng.choice(kinds)
+            if kind == "endpoint":
+                endpoint.SetMasterVolumeLevelScalar(rng.random(), None)
+            elif kind == "device":
+                self.enumerator.fire("OnDeviceStateChanged", self.device_id, 1)
+            elif live:
+                ctl = rng.choice(live)
+                if kind == "volume":
+                    ctl.volume.SetMasterVolume(rng.random(), None)
+                else:
+                    playing = ctl.GetState() == AudioSessionStateActive
+                    ctl.set_state(
+                        AudioSessionStateInactive
+                        if playing
+                        else AudioSessionStateActive
+                    )
+        return count
+
+
+class ManualClock:
+    """
+    Deterministic clock and call_later for VolumeWriteScheduler.
+
+    Callbacks run when advance() passes their due time.
+    """
+
+    def __init__(self, now=0.0):
+        self.now = now
+        self._calls = []
+
+    def __call__(self):
+        return self.now
+
+    def call_later(self, delay, callback):
+        self._calls.append((self.now + delay, callback))
+
+    def advance(self, seconds):
+        end = self.now + seconds
+        while True:
+            due = [call for call in self._calls if call[0] <= end]
+            if not due:
+                break
+            call = min(due, key=lambda c: c[0])
+            self._calls.remove(call)
+            self.now = max(self.now, call[0])
+            call[1]()
+        self.now = end
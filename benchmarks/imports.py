@@ -0,0 +1,123 @@
+"""
+Import and startup cost of the add-on, each figure from a fresh interpreter.
+
+What NVDA's startup pays is the plugin import and GlobalPlugin(); the
+audio setup is paid later, by the idle callback or the first gesture
+(activation). The heavy modules are timed on their own for comparison:
+
+    python benchmarks/imports.py
+    python benchmarks/imports.py --repeat 21
+
+Rows
+----
+plugin import
+    import volumeManager, with the NVDA stand-ins of nvdastubs.
+plugin construction
+    GlobalPlugin() on fakes.SimulatedBackend.
+activation
+    GlobalPlugin.ensure_active(), worker started and mixer read.
+pycaw.processes, psutil
+    psutil is skipped where its compiled extension is missing.
+pycaw.callbacks, pycaw.pycaw, pycaw.magic
+    comtypes interfaces, only on Windows.
+
+Times are medians in milliseconds, "modules" counts the modules the
+step loaded.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PLUGINS = os.path.join(HERE, "..", "addon", "globalPlugins")
+PATHS = [HERE, PLUGINS, os.path.join(PLUGINS, "volumeManager")]
+
+_STUBS = "from nvdastubs import stub_nvda\nstub_nvda()\n"
+_PLUGIN = (
+    _STUBS
+    + "import volumeManager\n"
+    + "import fakes\n"
+    + "volumeManager.GlobalPlugin.backend = fakes.SimulatedBackend(sessions=50)\n"
+)
+
+# label -> (setup, timed code, teardown)
+CASES = (
+    ("plugin import", _STUBS, "import volumeManager", ""),
+    ("plugin construction", _PLUGIN, "plugin = volumeManager.GlobalPlugin()", ""),
+    (
+        "activation",
+        _PLUGIN + "plugin = volumeManager.GlobalPlugin()\n",
+        "plugin.ensure_active()",
+        "plugin.terminate()",
+    ),
+    ("pycaw.processes", "", "import pycaw.processes", ""),
+    ("psutil", "", "import psutil", ""),
+    ("pycaw.callbacks", "", "import pycaw.callbacks", ""),
+    ("pycaw.pycaw", "", "import pycaw.pycaw", ""),
+    ("pycaw.magic", "", "import pycaw.magic", ""),
+)
+
+_CHILD = """\
+import json, sys, time
+sys.path[:0] = {paths!r}
+{setup}
+before = set(sys.modules)
+start = time.perf_counter()
+try:
+{body}
+except ImportError as e:
+    result = {{"skipped": str(e)}}
+else:
+    result = {{
+        "seconds": time.perf_counter() - start,
+        "modules": len(set(sys.modules) - before),
+    }}
+{teardown}
+print(json.dumps(result))
+"""
+
+
+def run_once(setup, body, teardown):
+    code = _CHILD.format(
+        paths=PATHS, setup=setup, body=textwrap.indent(body, "    "), teardown=teardown
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def measure(setup, body, teardown, repeat):
+    # the first run may write .pyc files, it is not counted
+    result = run_once(setup, body, teardown)
+    if "skipped" in result:
+        return result
+    runs = sorted(
+        (run_once(setup, body, teardown) for _ in range(repeat)),
+        key=lambda run: run["seconds"],
+    )
+    return runs[len(runs) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=11)
+    args = parser.parse_args()
+
+    for label, setup, body, teardown in CASES:
+        result = measure(setup, body, teardown, args.repeat)
+        if "skipped" in result:
+            print(f"{label:>20}    skipped: {result['skipped']}")
+        else:
+            print(
+                f"{label:>20} {result['seconds'] * 1e3:>8.2f} ms"
+                f" {result['modules']:>5} modules"
+            )
+
+
+if __name__ == "__main__":
+    main()
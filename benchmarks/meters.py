@@ -0,0 +1,50 @@
+"""
+Overhead of pycaw.meters.PeakSampler against fake meters.
+
+Measures one sampling round (GetPeakValue of every source into its ring
+buffer) and one active() query, for 10, 100 and 1000 sources.
+
+    python benchmarks/meters.py
+"""
+
+import os
+import random
+import sys
+import timeit
+
+ADDON = os.path.join(os.path.dirname(__file__), "..", "addon")
+sys.path.insert(0, os.path.join(ADDON, "globalPlugins", "volumeManager"))
+
+from fakes import FakeAudioMeterInformation  # noqa: E402
+from pycaw.meters import PeakSampler  # noqa: E402
+
+SOURCE_COUNTS = (10, 100, 1000)
+ROUNDS = 200
+
+
+def bench(count):
+    rng = random.Random(count)
+    sampler = PeakSampler(size=32)
+    for i in range(count):
+        # a quarter of the sources make sound
+        level = rng.random() if i % 4 == 0 else 0.0
+        sampler.add_source(i, FakeAudioMeterInformation(level))
+    for _ in range(sampler.size):
+        sampler.sample_once()
+    sample = min(timeit.repeat(sampler.sample_once, number=ROUNDS, repeat=3)) / ROUNDS
+    active = min(timeit.repeat(sampler.active, number=20, repeat=3)) / 20
+    return sample, active
+
+
+def main():
+    print(f"{'sources':>8} {'round':>12} {'per source':>12} {'active()':>12}")
+    for count in SOURCE_COUNTS:
+        sample, active = bench(count)
+        print(
+            f"{count:>8} {sample * 1e6:>9.1f} us {sample / count * 1e6:>9.2f} us"
+            f" {active * 1e6:>9.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Cost of decoding one AUDIO_VOLUME_NOTIFICATION_DATA in OnNotify.
+
+Compares what OnNotify did before (pNotify.contents, a list of the
+channel levels and a new pointer to the event GUID) with
+pycaw.notify.VolumeNotificationView, on synthetic notifications with
+1, 2 and 8 channels. Prints the time and the number of memory blocks
+allocated per notification while the decoded values are held.
+
+    python benchmarks/notify.py
+"""
+
+import os
+import sys
+import timeit
+from ctypes import pointer
+
+ADDON = os.path.join(os.path.dirname(__file__), "..", "addon")
+sys.path.insert(0, os.path.join(ADDON, "globalPlugins", "volumeManager"))
+
+from fakes import volume_notification  # noqa: E402
+from nvdastubs import stub_comtypes  # noqa: E402
+from pycaw.notify import VolumeNotificationView  # noqa: E402
+
+CHANNEL_COUNTS = (1, 2, 8)
+NUMBER = 100000
+
+
+def notification(channels):
+    return volume_notification(0.5, channel_volumes=[0.5] * channels)
+
+
+def legacy(pNotify):
+    notify_data = pNotify.contents
+    channels = notify_data.nChannels
+    channel_volumes = list(notify_data.afChannelVolumes)
+    channel_volumes = channel_volumes[:channels]
+    event_context = pointer(notify_data.guidEventContext)
+    return (
+        notify_data.fMasterVolume,
+        notify_data.bMuted,
+        event_context,
+        channels,
+        channel_volumes,
+    )
+
+
+def viewed(view, pNotify):
+    view.decode(pNotify)
+    return (
+        view.volume,
+        view.mute,
+        view.event_context,
+        view.channels,
+        view.channel_volumes,
+    )
+
+
+def allocated(func, *args):
+    # blocks still allocated while 1000 results are held
+    results = [None] * 1000
+    before = sys.getallocatedblocks()
+    for i in range(1000):
+        results[i] = func(*args)
+    return (sys.getallocatedblocks() - before) / 1000
+
+
+def main():
+    # the notifications are pycaw's AUDIO_VOLUME_NOTIFICATION_DATA
+    stub_comtypes()
+    view = VolumeNotificationView()
+    print(f"{'channels':>8} {'path':>8} {'per call':>10} {'blocks':>7}")
+    for channels in CHANNEL_COUNTS:
+        pNotify = notification(channels)
+        for name, func, args in (
+            ("legacy", legacy, (pNotify,)),
+            ("view", viewed, (view, pNotify)),
+        ):
+            seconds = min(
+                timeit.repeat(lambda: func(*args), number=NUMBER, repeat=3)
+            )
+            print(
+                f"{channels:>8} {name:>8} {seconds / NUMBER * 1e9:>7.0f} ns"
+                f" {allocated(func, *args):>7.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
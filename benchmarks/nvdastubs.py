@@ -0,0 +1,215 @@
+"""
+Stand-ins for the NVDA modules the global plugin imports, and for
+comtypes where it is not installed.
+
+Lets the benchmarks load the plugin outside NVDA. Only the names the
+plugin uses are provided, speech, tones and messages go nowhere.
+
+    stub_nvda()
+    import volumeManager
+    plugin = volumeManager.GlobalPlugin()
+    drain()     # run what the plugin handed to core.callLater
+
+The comtypes stand-in (stub_comtypes(), installed by stub_nvda() as
+well) declares pycaw's interfaces without creating any COM object, so
+pycaw.utils, pycaw.callbacks and pycaw.magic import and run on the
+objects of fakes.py. CoCreateInstance hands out what register_class()
+was given:
+
+    register_class(CLSID_MMDeviceEnumerator, backend.device_enumerator)
+    AudioUtilities.GetAllDevices()
+"""
+
+import builtins
+import ctypes
+import sys
+import tempfile
+import types
+import uuid
+
+# callbacks the plugin handed to core.callLater, run by drain()
+_pending = []
+
+# str(clsid) -> factory, for CoCreateInstance of the comtypes stand-in
+_classes = {}
+
+
+def stub_nvda():
+    """Install stand-ins for the NVDA modules the plugin imports."""
+
+    def module(name, **attributes):
+        stub = types.ModuleType(name)
+        stub.__dict__.update(attributes)
+        sys.modules[name] = stub
+
+    class GlobalPlugin:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def terminate(self):
+            pass
+
+        def bindGestures(self, gestures):
+            pass
+
+        def clearGestureBindings(self):
+            pass
+
+    stub_comtypes()
+    builtins._ = lambda text: text
+    module("addonHandler", initTranslation=lambda: None)
+    module(
+        "core",
+        callLater=lambda delay, callback, *args: _pending.append((callback, args)),
+    )
+    module("globalPluginHandler", GlobalPlugin=GlobalPlugin)
+    module(
+        "globalVars",
+        appArgs=types.SimpleNamespace(configPath=tempfile.mkdtemp(prefix="vm-bench")),
+    )
+    module("gui", mainFrame=None, guiHelper=None, nvdaControls=None)
+    module(
+        "logHandler",
+        log=types.SimpleNamespace(
+            info=lambda *args, **kwargs: None,
+            exception=lambda *args, **kwargs: None,
+        ),
+    )
+    module(
+        "queueHandler",
+        eventQueue=None,
+        queueFunction=lambda queue, func, *args: func(*args),
+    )
+    module("speech", cancelSpeech=lambda: None)
+    module("tones", beep=lambda hz, length, *args: None)
+    module("ui", message=lambda text: None)
+    module("wx", Dialog=object)
+
+
+def stub_comtypes():
+    """
+    Install the comtypes stand-in unless comtypes imports. Returns True
+    when the stand-in is in use.
+    """
+    installed = sys.modules.get("comtypes")
+    if installed is not None:
+        return getattr(installed, "stand_in", False)
+    try:
+        import comtypes  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        return False
+
+    import _ctypes
+    from ctypes import c_long, c_ubyte, c_uint16, c_uint32, c_ushort, c_void_p
+
+    class COMError(Exception):
+        def __init__(self, hresult, text, details):
+            super().__init__(hresult, text, details)
+            self.hresult = hresult
+            self.text = text
+            self.details = details
+
+    class GUID(ctypes.Structure):
+        _fields_ = [
+            ("Data1", c_uint32),
+            ("Data2", c_uint16),
+            ("Data3", c_uint16),
+            ("Data4", c_ubyte * 8),
+        ]
+
+        def __init__(self, name=None):
+            super().__init__()
+            if name is not None:
+                value = uuid.UUID(name)
+                self.Data1, self.Data2, self.Data3 = value.fields[:3]
+                self.Data4[:] = value.bytes[8:]
+
+        def __str__(self):
+            data = (
+                self.Data1.to_bytes(4, "big")
+                + self.Data2.to_bytes(2, "big")
+                + self.Data3.to_bytes(2, "big")
+                + bytes(self.Data4)
+            )
+            return "{%s}" % str(uuid.UUID(bytes=data)).upper()
+
+        def __repr__(self):
+            return 'GUID("%s")' % self
+
+        def __eq__(self, other):
+            return isinstance(other, GUID) and bytes(self) == bytes(other)
+
+        def __hash__(self):
+            return hash(bytes(self))
+
+    class IUnknown(c_void_p):
+        _iid_ = GUID("{00000000-0000-0000-C000-000000000046}")
+        _methods_ = ()
+
+    class COMObject:
+        _com_interfaces_ = ()
+
+    def COMMETHOD(idlflags, restype, name, *argspec):
+        return (restype, name, argspec)
+
+    def CoCreateInstance(clsid, interface=None, clsctx=None):
+        try:
+            factory = _classes[str(clsid)]
+        except KeyError:
+            # REGDB_E_CLASSNOTREG
+            raise COMError(-2147221164, "Class not registered", None) from None
+        return factory()
+
+    def module(name, **attributes):
+        stub = types.ModuleType(name)
+        stub.__dict__.update(attributes)
+        sys.modules[name] = stub
+        return stub
+
+    if not hasattr(_ctypes, "COMError"):
+        _ctypes.COMError = COMError
+    if not hasattr(ctypes, "HRESULT"):
+        ctypes.HRESULT = c_long
+    if not hasattr(ctypes, "windll"):
+        ctypes.windll = types.SimpleNamespace(
+            ole32=types.SimpleNamespace(PropVariantClear=lambda pvar: 0)
+        )
+    comtypes = module(
+        "comtypes",
+        stand_in=True,
+        CLSCTX_INPROC_SERVER=0x1,
+        CLSCTX_ALL=0x17,
+        COINIT_MULTITHREADED=0x0,
+        COMError=_ctypes.COMError,
+        COMMETHOD=COMMETHOD,
+        COMObject=COMObject,
+        CoCreateInstance=CoCreateInstance,
+        CoInitializeEx=lambda flags=None: None,
+        CoUninitialize=lambda: None,
+        GUID=GUID,
+        IUnknown=IUnknown,
+    )
+    comtypes.automation = module(
+        "comtypes.automation",
+        VARTYPE=c_ushort,
+        VT_BOOL=11,
+        VT_UI4=19,
+        VT_LPWSTR=31,
+        VT_CLSID=72,
+    )
+    return True
+
+
+def register_class(clsid, factory):
+    """CoCreateInstance(clsid, ...) of the comtypes stand-in returns factory()."""
+    _classes[str(clsid).upper()] = factory
+
+
+def drain():
+    """Run the callLater callbacks queued so far, like NVDA's main loop."""
+    callbacks = list(_pending)
+    del _pending[:]
+    for callback, args in callbacks:
+        callback(*args)
@@ -0,0 +1,105 @@
+"""
+Cost of keeping pycaw.ordering.SessionOrder and its PrefixIndex current.
+
+Builds the order from 1000 synthetic sessions, then measures the single
+updates the registry's events cause (a session added, expired, made
+active) and type-ahead lookups. A tenth of the names carry diacritics,
+so the slower normalization path is part of every figure.
+
+    python benchmarks/prefix.py
+"""
+
+import os
+import random
+import sys
+import timeit
+
+ADDON = os.path.join(os.path.dirname(__file__), "..", "addon")
+sys.path.insert(0, os.path.join(ADDON, "globalPlugins", "volumeManager"))
+
+from pycaw.ordering import SessionOrder  # noqa: E402
+
+SESSIONS = 1000
+REPEAT = 2000
+
+_WORDS = ("firefox", "chrome", "spotify", "foobar", "teams", "zoom", "vlc", "skype")
+_ACCENTED = ("Éditeur", "Müsik", "Ångström", "Señal")
+
+
+class Entry:
+    """The fields of a pycaw.registry.SessionEntry that SessionOrder reads."""
+
+    __slots__ = ("key", "name", "exe", "state")
+
+    def __init__(self, key, name, exe, state):
+        self.key = key
+        self.name = name
+        self.exe = exe
+        self.state = state
+
+
+def make_entries(count, rng):
+    entries = []
+    for i in range(count):
+        words = _ACCENTED if i % 10 == 0 else _WORDS
+        name = "%s %d" % (rng.choice(words), i)
+        exe = name.replace(" ", "") + ".exe"
+        entries.append(Entry("session|%d" % i, name, exe, rng.choice((0, 0, 1))))
+    return entries
+
+
+def per_call(func, number=REPEAT):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def main():
+    rng = random.Random(SESSIONS)
+    entries = make_entries(SESSIONS, rng)
+
+    def build():
+        order = SessionOrder()
+        for entry in entries:
+            order.add(entry)
+        return order
+
+    build_time = per_call(build, number=5)
+    order = build()
+    extra = make_entries(SESSIONS + 1, rng)[-1]
+    extra.key = "session|extra"
+
+    def add_remove():
+        order.add(extra)
+        order.remove(extra.key)
+
+    keys = [entry.key for entry in entries]
+    entries_by_key = {entry.key: entry for entry in entries}
+    states = iter(lambda: rng.choice(keys), None)
+
+    def state_change():
+        entry = entries_by_key[next(states)]
+        entry.state = 1 - entry.state if entry.state < 2 else 0
+        order.update(entry.key)
+
+    touches = iter(lambda: rng.choice(keys), None)
+
+    def touch():
+        order.touch(next(touches))
+
+    def lookup():
+        order.find("fi")
+        order.find("eDi")
+
+    rows = (
+        ("build, %d sessions" % SESSIONS, build_time),
+        ("build, per session", build_time / SESSIONS),
+        ("add + remove", per_call(add_remove)),
+        ("state change", per_call(state_change)),
+        ("touch", per_call(touch)),
+        ("2 lookups", per_call(lookup, number=200)),
+    )
+    for label, seconds in rows:
+        print(f"{label:>24} {seconds * 1e6:>10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
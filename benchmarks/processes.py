@@ -0,0 +1,175 @@
+"""
+Cost of pycaw.processes, next to the full psutil package.
+
+Per-session cost of resolving session executable names: one lookup
+per session (what psutil.Process(pid).name() did) against
+pycaw.processes.ProcessNameResolver, cold and warm, for 10, 100 and
+1000 sessions. Sessions are spread over the processes that are really
+running, like several sessions of one browser share a pid.
+
+Then the import of pycaw.processes and of psutil, each in a fresh
+interpreter, and per pid calls of name, create time and existence,
+batched through pycaw.processes and one by one through psutil. The
+vendored psutil only carries its Windows extension, elsewhere an
+installed psutil (pip install psutil) is measured instead; without one
+the psutil rows are skipped.
+
+    python benchmarks/processes.py
+"""
+
+import os
+import sys
+import timeit
+
+ADDON = os.path.join(os.path.dirname(__file__), "..", "addon")
+VOLUME_MANAGER = os.path.join(ADDON, "globalPlugins", "volumeManager")
+sys.path.insert(0, VOLUME_MANAGER)
+
+from imports import PATHS, measure  # noqa: E402
+from pycaw import processes  # noqa: E402
+
+SESSION_COUNTS = (10, 100, 1000)
+REPEAT = 5
+
+
+def import_psutil():
+    """
+    (psutil, "vendored" or "installed"), the installed one where the
+    vendored copy cannot load. (None, reason) without either.
+    """
+    try:
+        import psutil
+
+        return psutil, "vendored"
+    except ImportError as e:
+        reason = str(e)
+    for name in [m for m in sys.modules if m.split(".")[0] == "psutil"]:
+        del sys.modules[name]
+    vendored = os.path.abspath(VOLUME_MANAGER)
+    path = sys.path[:]
+    sys.path[:] = [p for p in path if os.path.abspath(p or ".") != vendored]
+    try:
+        import psutil
+
+        return psutil, "installed"
+    except ImportError:
+        return None, "vendored copy: %s; none installed" % reason
+    finally:
+        sys.path[:] = path
+
+
+def running_pids():
+    snapshot = processes._default_snapshot
+    if snapshot is processes._snapshot_procfs:
+        return [int(p) for p in os.listdir("/proc") if p.isdigit()]
+    psutil, _source = import_psutil()
+    return psutil.pids()
+
+
+def bench(count, pids):
+    sessions = [pids[i % len(pids)] for i in range(count)]
+    snapshot = processes._default_snapshot
+
+    def per_session():
+        for pid in sessions:
+            snapshot((pid,), True)
+
+    def batched_cold():
+        processes.ProcessNameResolver().resolve(set(sessions))
+
+    warm = processes.ProcessNameResolver()
+    warm.resolve(set(sessions))
+
+    def batched_warm():
+        warm.resolve(set(sessions))
+
+    row = {}
+    for label, func in (
+        ("per-session", per_session),
+        ("batched cold", batched_cold),
+        ("batched warm", batched_warm),
+    ):
+        best = min(timeit.repeat(func, number=1, repeat=REPEAT))
+        row[label] = best / count * 1e6
+    return row
+
+
+def compare_calls(count, pids, psutil):
+    """Seconds per pid of each lookup, psutil's None where it is missing."""
+    pids = pids[:count]
+
+    def psutil_name():
+        for pid in pids:
+            try:
+                psutil.Process(pid).name()
+            except psutil.Error:
+                pass
+
+    def psutil_create_time():
+        for pid in pids:
+            try:
+                psutil.Process(pid).create_time()
+            except psutil.Error:
+                pass
+
+    def psutil_exists():
+        for pid in pids:
+            psutil.pid_exists(pid)
+
+    rows = (
+        ("name", lambda: processes.snapshot(pids), psutil_name),
+        ("create time", lambda: processes.create_times(pids), psutil_create_time),
+        ("exists", lambda: processes.running(pids), psutil_exists),
+    )
+    result = []
+    for label, ours, theirs in rows:
+        mine = min(timeit.repeat(ours, number=1, repeat=REPEAT)) / len(pids)
+        other = None
+        if psutil is not None:
+            other = min(timeit.repeat(theirs, number=1, repeat=REPEAT)) / len(pids)
+        result.append((label, mine, other))
+    return result
+
+
+def main():
+    pids = running_pids()
+    snapshot = processes._default_snapshot.__name__
+    print(f"{len(pids)} running processes, snapshot: {snapshot}")
+    header = None
+    for count in SESSION_COUNTS:
+        row = bench(count, pids)
+        if header is None:
+            header = f"{'sessions':>8} " + " ".join(f"{k:>14}" for k in row)
+            print(header)
+        print(f"{count:>8} " + " ".join(f"{v:>11.2f} us" for v in row.values()))
+
+    psutil, source = import_psutil()
+    print()
+    if psutil is None:
+        print(f"psutil skipped: {source}")
+    else:
+        print(f"psutil {psutil.__version__}, {source}")
+    # the child interpreters see the add-on's directory first, leave it
+    # out for an installed psutil
+    without_vendored = "sys.path.remove(%r)" % PATHS[-1]
+    print(f"{'import':>24} {'ms':>10}")
+    for module, setup in (
+        ("pycaw.processes", ""),
+        ("psutil", without_vendored if source == "installed" else ""),
+    ):
+        result = measure(setup, "import " + module, "", REPEAT)
+        if "skipped" in result:
+            print(f"{module:>24}    skipped: {result['skipped']}")
+        else:
+            print(f"{module:>24} {result['seconds'] * 1e3:>10.2f}")
+
+    count = min(100, len(pids))
+    print()
+    print(f"{'%d pids, per pid' % count:>24} {'processes':>14} {'psutil':>14}")
+    for label, mine, other in compare_calls(count, pids, psutil):
+        theirs = "skipped" if other is None else f"{other * 1e6:.2f} us"
+        print(f"{label:>24} {mine * 1e6:>11.2f} us {theirs:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+"""
+Benchmark suite for the add-on's hot paths, with JSON results.
+
+Loads the global plugin on top of fakes.SimulatedBackend, with
+stand-ins for the NVDA modules it imports (ui, tones, speech, core,
+gui, ...), and times every case one call at a time so percentiles can
+be reported. Runs on any platform:
+
+    python benchmarks/suite.py > baseline.json
+    python benchmarks/suite.py --sessions 1000 --latency 0.0002
+    python benchmarks/suite.py --baseline baseline.json
+
+With --baseline the run fails (exit status 1) when the p50 of a case
+grew by more than --tolerance over the baseline, so a regression is
+caught before a release is built.
+
+Cases
+-----
+script_turn
+    layer mode switched on.
+script_move_to_app
+    one right arrow press in layer mode.
+script_change_volume, script_change_volume_master
+    one auto-repeated arrow press of a held key, on an app and on the
+    master volume.
+event_storm
+    one session or endpoint event, through the registry, the ordering,
+    the app groups and the master volume state.
+get_all_sessions
+    SessionEnumerator.records(), the pass AudioUtilities.GetAllSessions
+    makes over the session manager.
+notify_decode
+    decoding one volume notification as OnNotify does.
+
+pycaw itself, with the comtypes stand-in of nvdastubs where comtypes is
+not installed ("comtypes": "stand-in" in the meta data). Its
+CoCreateInstance hands out the simulated device enumerator, on Windows
+the real devices are used:
+
+get_all_devices, create_device
+    AudioUtilities.GetAllDevices and CreateDevice of one endpoint.
+magic_on_session_created
+    MagicManager.OnSessionCreated of one live session.
+callbacks_on_notify
+    pycaw.callbacks.AudioEndpointVolumeCallback.OnNotify.
+
+Times are in microseconds.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+ADDON = os.path.join(os.path.dirname(__file__), "..", "addon")
+PLUGINS = os.path.join(ADDON, "globalPlugins")
+sys.path.insert(0, PLUGINS)
+sys.path.insert(0, os.path.join(PLUGINS, "volumeManager"))
+
+from notify import notification  # noqa: E402
+from nvdastubs import drain, register_class, stub_comtypes, stub_nvda  # noqa: E402
+import fakes  # noqa: E402
+from pycaw.notify import VolumeNotificationView  # noqa: E402
+from pycaw.sessions import SessionEnumerator  # noqa: E402
+
+PERCENTILES = (50, 90, 99)
+
+
+class Skip(Exception):
+    """A case that cannot run here."""
+
+
+class Gesture:
+    def __init__(self, key):
+        self.key = key
+
+    def _get_identifiers(self):
+        return ("kb(desktop):" + self.key, "kb:" + self.key)
+
+    def send(self):
+        pass
+
+
+TURN = Gesture("nvda+shift+v")
+RIGHT = Gesture("rightArrow")
+UP = Gesture("upArrow")
+DOWN = Gesture("downArrow")
+
+
+def sample(func, repeat, before=None, after=None):
+    """Seconds taken by each of repeat calls of func."""
+    samples = []
+    clock = time.perf_counter
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = clock()
+        func()
+        samples.append(clock() - start)
+        if after is not None:
+            after()
+    return samples
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    result = {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered) * 1e6,
+        "min": ordered[0] * 1e6,
+        "max": ordered[-1] * 1e6,
+    }
+    for percentile in PERCENTILES:
+        result["p%d" % percentile] = ordered[round(percentile / 100 * last)] * 1e6
+    return result
+
+
+class Suite:
+    def __init__(self, args, stand_in=False):
+        self.args = args
+        self.backend = fakes.SimulatedBackend(
+            sessions=args.sessions, latency=args.latency, seed=args.seed
+        )
+        import volumeManager
+
+        volumeManager.GlobalPlugin.backend = self.backend
+        from pycaw.constants import CLSID_MMDeviceEnumerator
+
+        register_class(CLSID_MMDeviceEnumerator, self.backend.device_enumerator)
+        if stand_in:
+            from pycaw.processes import process_name_resolver
+
+            # pycaw.magic names the simulated sessions' processes through it
+            process_name_resolver._snapshot = self.backend.mixer.manager.snapshot
+        self.plugin = volumeManager.GlobalPlugin()
+        # set up now, not on the first case's gesture
+        self.plugin.ensure_active()
+
+    def close(self):
+        if self.plugin.enabled:
+            self.plugin.script_turn(TURN)
+        self.plugin.terminate()
+
+    def run(self, name):
+        case = getattr(self, "case_" + name)
+        calls = self.backend.calls
+        try:
+            samples, extra = case(self.args.repeat)
+        except (ImportError, Skip) as e:
+            # a case that needs what this machine does not have
+            return {"skipped": str(e)}
+        result = summarize(samples)
+        result["com_calls"] = (self.backend.calls - calls) / len(samples)
+        result.update(extra)
+        return result
+
+    def layer_on(self):
+        if not self.plugin.enabled:
+            self.plugin.script_turn(TURN)
+
+    def layer_off(self):
+        if self.plugin.enabled:
+            self.plugin.script_turn(TURN)
+        drain()
+
+    # ____ plugin ____
+
+    def case_script_turn(self, repeat):
+        self.layer_off()
+        samples = sample(
+            lambda: self.plugin.script_turn(TURN), repeat, after=self.layer_off
+        )
+        return samples, {"apps": len(self.plugin.apps)}
+
+    def case_script_move_to_app(self, repeat):
+        self.layer_on()
+        samples = sample(lambda: self.plugin.script_move_to_app(RIGHT), repeat)
+        self.layer_off()
+        return samples, {}
+
+    def _held_key(self, repeat):
+        presses = iter(range(repeat))
+
+        def press():
+            # runs of 20 presses down, then 20 up, stay inside 0..1
+            self.plugin.script_change_volume(UP if next(presses) // 20 % 2 else DOWN)
+
+        samples = sample(press, repeat, after=drain)
+        self.plugin.volume_scheduler.flush(announce=False)
+        return samples
+
+    def case_script_change_volume(self, repeat):
+        self.layer_on()
+        if len(self.plugin.apps) < 2:
+            raise Skip("no application in the simulated mixer")
+        self.plugin.select_app(1)
+        samples = self._held_key(repeat)
+        self.layer_off()
+        return samples, {}
+
+    def case_script_change_volume_master(self, repeat):
+        self.layer_on()
+        self.plugin.select_app(0)
+        samples = self._held_key(repeat)
+        self.layer_off()
+        return samples, {}
+
+    def case_event_storm(self, repeat):
+        storm = self.backend.storm
+        samples = sample(lambda: storm(1), repeat)
+        drain()
+        return samples, {}
+
+    def case_get_all_sessions(self, repeat):
+        enumerator = SessionEnumerator()
+        manager = self.backend.session_manager()
+        samples = sample(lambda: enumerator.records(manager, ()), repeat)
+        return samples, {
+            "sessions": enumerator.sessions,
+            "com_calls_per_session": enumerator.per_session,
+        }
+
+    def case_notify_decode(self, repeat):
+        view = VolumeNotificationView()
+        pNotify = notification(2)
+        return sample(lambda: view.decode(pNotify), repeat), {}
+
+    # ____ pycaw ____
+
+    def case_get_all_devices(self, repeat):
+        from pycaw.utils import AudioUtilities
+
+        samples = sample(AudioUtilities.GetAllDevices, repeat)
+        return samples, {"devices": len(AudioUtilities.GetAllDevices())}
+
+    def case_create_device(self, repeat):
+        from pycaw.constants import DEVICE_STATE, EDataFlow
+        from pycaw.utils import AudioUtilities
+
+        collection = AudioUtilities.GetDeviceEnumerator().EnumAudioEndpoints(
+            EDataFlow.eAll.value, DEVICE_STATE.MASK_ALL.value
+        )
+        device = collection.Item(0)
+        return sample(lambda: AudioUtilities.CreateDevice(device), repeat), {}
+
+    def case_magic_on_session_created(self, repeat):
+        from pycaw.magic import MagicManager
+
+        if not MagicManager.magic_activated:
+            MagicManager.activate_magic()
+        enumerator = MagicManager._mgr.GetSessionEnumerator()
+        ctls = [enumerator.GetSession(i) for i in range(enumerator.GetCount())]
+        if not ctls:
+            raise Skip("no live audio session")
+        ctls = iter(ctls * (repeat // len(ctls) + 1))
+
+        def forget():
+            # undo the registration, so every call sees a new session
+            iid = MagicManager.iid_count - 1
+            MagicManager.magic_root_sessions.pop(iid).unregister_notification()
+
+        samples = sample(
+            lambda: MagicManager.OnSessionCreated(next(ctls)), repeat, after=forget
+        )
+        return samples, {}
+
+    def case_callbacks_on_notify(self, repeat):
+        from pycaw.callbacks import AudioEndpointVolumeCallback
+
+        class Sink(AudioEndpointVolumeCallback):
+            def on_notify_view(self, notification):
+                pass
+
+        pNotify = notification(2)
+        sink = Sink()
+        return sample(lambda: sink.OnNotify(pNotify), repeat), {}
+
+
+CASES = (
+    "script_turn",
+    "script_move_to_app",
+    "script_change_volume",
+    "script_change_volume_master",
+    "event_storm",
+    "get_all_sessions",
+    "notify_decode",
+    "magic_on_session_created",
+    "get_all_devices",
+    "create_device",
+    "callbacks_on_notify",
+)
+
+
+def regressions(results, baseline, tolerance):
+    """(case, baseline p50, new p50) of every case that got slower."""
+    slower = []
+    for name, result in results["cases"].items():
+        before = baseline.get("cases", {}).get(name, {})
+        if "p50" not in result or "p50" not in before:
+            continue
+        if result["p50"] > before["p50"] * (1 + tolerance):
+            slower.append((name, before["p50"], result["p50"]))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds per simulated COM call"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", help="comma separated cases to run")
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    parser.add_argument("--baseline", help="JSON of an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else CASES
+    unknown = set(names) - set(CASES)
+    if unknown:
+        parser.error("unknown cases: " + ", ".join(sorted(unknown)))
+
+    stand_in = stub_comtypes()
+    stub_nvda()
+    suite = Suite(args, stand_in)
+    try:
+        cases = {name: suite.run(name) for name in names}
+    finally:
+        suite.close()
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sessions": args.sessions,
+            "repeat": args.repeat,
+            "latency": args.latency,
+            "seed": args.seed,
+            "comtypes": "stand-in" if stand_in else "installed",
+            "unit": "us",
+        },
+        "cases": cases,
+    }
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        slower = regressions(results, baseline, args.tolerance)
+        for name, before, after in slower:
+            print(
+                f"regression: {name} p50 {before:.1f} us -> {after:.1f} us",
+                file=sys.stderr,
+            )
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+The add-on's directory and benchmarks/ (fakes, nvdastubs) on sys.path,
+so the tests import pycaw and the fakes as the benchmarks do, and the
+NVDA and comtypes stand-ins of nvdastubs installed, so volumeManager
+and pycaw import.
+
+Fixtures
+--------
+mgr
+    a FakeAudioSessionManager.
+registry
+    a SessionRegistry of mgr, closed after the test.
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+PLUGINS = os.path.join(ROOT, "addon", "globalPlugins")
+
+sys.path[:0] = [
+    PLUGINS,
+    os.path.join(PLUGINS, "volumeManager"),
+    os.path.join(ROOT, "benchmarks"),
+]
+
+from nvdastubs import stub_nvda  # noqa: E402
+
+stub_nvda()
+
+
+@pytest.fixture
+def mgr():
+    import fakes
+
+    return fakes.FakeAudioSessionManager()
+
+
+@pytest.fixture
+def registry(mgr):
+    from pycaw.processes import ProcessNameResolver
+    from pycaw.registry import SessionRegistry
+
+    registry = SessionRegistry(mgr, resolver=ProcessNameResolver(mgr.snapshot))
+    yield registry
+    registry.close()
@@ -0,0 +1,109 @@
+"""EventBus delivery, overflow and coalescing, on a ManualClock."""
+
+import pytest
+
+import fakes
+from pycaw.bus import DROP_NEWEST, EndpointVolumeBus, EventBus
+
+
+@pytest.fixture
+def clock():
+    return fakes.ManualClock()
+
+
+@pytest.fixture
+def bus(clock):
+    return EventBus(call_later=clock.call_later, frame=0.03)
+
+
+def test_synchronous_subscribers_get_their_events(bus):
+    everything, volumes = [], []
+    bus.subscribe(lambda *args: everything.append(args))
+    bus.subscribe(lambda *args: volumes.append(args), events=("volume",))
+    bus.publish("volume", 0.5)
+    bus.publish("mute", 1)
+    assert everything == [("volume", 0.5), ("mute", 1)]
+    assert volumes == [("volume", 0.5)]
+
+
+def test_batched_subscribers_get_one_list_per_frame(bus, clock):
+    batches = []
+    bus.subscribe(batches.append, batched=True)
+    bus.publish("volume", 0.5)
+    bus.publish("mute", 1)
+    assert batches == []
+    clock.advance(0.03)
+    assert batches == [[("volume", (0.5,)), ("mute", (1,))]]
+    assert bus.stats()["batches"] == 1
+
+
+def test_overflow_drops_the_oldest(bus, clock):
+    batches = []
+    subscription = bus.subscribe(batches.append, batched=True, max_queue=2)
+    for level in (0.1, 0.2, 0.3):
+        bus.publish("volume", level)
+    clock.advance(0.03)
+    assert batches == [[("volume", (0.2,)), ("volume", (0.3,))]]
+    assert subscription.dropped == 1
+
+
+def test_overflow_drops_the_newest(bus, clock):
+    batches = []
+    bus.subscribe(batches.append, batched=True, max_queue=2, overflow=DROP_NEWEST)
+    for level in (0.1, 0.2, 0.3):
+        bus.publish("volume", level)
+    clock.advance(0.03)
+    assert batches == [[("volume", (0.1,)), ("volume", (0.2,))]]
+    assert bus.stats()["dropped"] == 1
+
+
+def test_coalesce_keeps_the_latest_of_each_event(bus, clock):
+    batches = []
+    bus.subscribe(batches.append, batched=True, coalesce=True)
+    bus.publish("volume", 0.1)
+    bus.publish("mute", 1)
+    bus.publish("volume", 0.2)
+    clock.advance(0.03)
+    assert batches == [[("mute", (1,)), ("volume", (0.2,))]]
+
+
+def test_coalesced_overflow(bus, clock):
+    batches = []
+    bus.subscribe(batches.append, batched=True, coalesce=True, max_queue=2)
+    for event in ("volume", "mute", "state"):
+        bus.publish(event, 0)
+    clock.advance(0.03)
+    assert [event for event, args in batches[0]] == ["mute", "state"]
+
+
+def test_unknown_overflow_policy(bus):
+    with pytest.raises(ValueError):
+        bus.subscribe(print, overflow="block")
+
+
+def test_failing_subscriber_does_not_starve_the_others(bus):
+    received = []
+
+    def fail(*args):
+        raise RuntimeError("subscriber bug")
+
+    failing = bus.subscribe(fail)
+    bus.subscribe(lambda *args: received.append(args))
+    bus.publish("volume", 0.5)
+    assert received == [("volume", 0.5)]
+    assert failing.errors == 1
+    assert failing.delivered == 0
+
+
+def test_batched_notifications_are_frozen(clock):
+    endpoint = fakes.FakeAudioEndpointVolume(volume=0.2)
+    bus = EndpointVolumeBus(endpoint, call_later=clock.call_later)
+    batches = []
+    bus.subscribe(batches.append, batched=True)
+    endpoint.notify()
+    endpoint.SetMasterVolumeLevelScalar(0.6, None)
+    clock.advance(0.03)
+    levels = [round(args[0].volume, 2) for _event, args in batches[0]]
+    assert levels == [0.2, 0.6]
+    bus.close()
+    assert endpoint._sinks == []
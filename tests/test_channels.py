@@ -0,0 +1,75 @@
+"""ChannelVolumes on an endpoint (per channel) and a session (bulk)."""
+
+import pytest
+
+import fakes
+from pycaw.channels import ChannelVolumes
+
+
+def test_endpoint_reads_and_writes_per_channel():
+    endpoint = fakes.FakeAudioEndpointVolume(volume=0.5, channels=2)
+    channels = ChannelVolumes(endpoint)
+    assert list(channels.read()) == [0.5, 0.5]
+    assert channels.reads == 2
+    assert channels.write([0.5, 0.25]) == 1
+    assert endpoint.calls["SetChannelVolumeLevelScalar"] == 1
+    assert endpoint.GetChannelVolumeLevelScalar(1) == 0.25
+    # nothing differs, nothing is written
+    assert channels.write([0.5, 0.25]) == 0
+
+
+def test_session_reads_and_writes_in_bulk():
+    session = fakes.FakeChannelAudioVolume(channels=6, volume=0.5)
+    channels = ChannelVolumes(session)
+    channels.read()
+    assert channels.reads == 1
+    assert channels.write([0.25] * 6) == 1
+    assert session.calls == 2
+    assert session._volumes == [0.25] * 6
+
+
+def test_update_takes_known_levels_without_com():
+    endpoint = fakes.FakeAudioEndpointVolume(channels=2)
+    channels = ChannelVolumes(endpoint)
+    values = channels.values
+    channels.update([0.3, 0.6, 0.9])
+    assert channels.values is values
+    assert list(values) == pytest.approx([0.3, 0.6])
+    assert channels.reads == 0
+
+
+@pytest.mark.parametrize(
+    "balance, levels", [(0.0, [1.0, 1.0]), (-0.5, [1.0, 0.5]), (1.0, [0.0, 1.0])]
+)
+def test_set_balance_attenuates_the_quieter_side(balance, levels):
+    endpoint = fakes.FakeAudioEndpointVolume(volume=1.0, channels=2)
+    channels = ChannelVolumes(endpoint)
+    channels.read()
+    channels.set_balance(balance)
+    assert endpoint._channels == levels
+    assert channels.balance == pytest.approx(balance)
+
+
+def test_center_and_lfe_follow_the_louder_side():
+    session = fakes.FakeChannelAudioVolume(channels=6, volume=0.8)
+    channels = ChannelVolumes(session)
+    channels.read()
+    channels.set_balance(0.5)
+    # FL, FR, FC, LFE, BL, BR
+    assert list(channels.values) == pytest.approx([0.4, 0.8, 0.8, 0.8, 0.4, 0.8])
+
+
+def test_pan_moves_the_balance_in_steps():
+    endpoint = fakes.FakeAudioEndpointVolume(channels=2)
+    channels = ChannelVolumes(endpoint)
+    channels.read()
+    assert channels.pan(0.1) == pytest.approx(0.1)
+    assert channels.pan(0.1) == pytest.approx(0.2)
+    assert channels.pan(-0.3) == pytest.approx(-0.1)
+
+
+def test_mono_has_no_balance():
+    channels = ChannelVolumes(fakes.FakeAudioEndpointVolume(channels=1))
+    channels.read()
+    assert channels.set_balance(-1.0) == 0
+    assert channels.balance == 0.0
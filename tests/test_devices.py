@@ -0,0 +1,95 @@
+"""AudioDevice and its lazy PropertyStore over the fake enumerator."""
+
+import pytest
+
+import fakes
+from pycaw.api.mmdeviceapi.depend.structures import PROPERTYKEY
+from pycaw.constants import AudioDeviceState
+from pycaw.devices import PropertyStore, all_devices, create_device
+
+
+class CountingStore(fakes.FakePropertyStore):
+    def __init__(self, values):
+        super().__init__(values)
+        self.reads = []
+
+    def GetValue(self, key):
+        self.reads.append(str(key).upper())
+        return super().GetValue(key)
+
+
+@pytest.fixture
+def store():
+    return CountingStore(
+        {
+            fakes.PKEY_Device_FriendlyName: "Speakers (Simulated Audio)",
+            fakes.PKEY_Device_DeviceDesc: "Speakers",
+        }
+    )
+
+
+def test_values_are_read_on_first_access(store):
+    properties = PropertyStore(store)
+    assert store.reads == []
+    assert properties[fakes.PKEY_Device_FriendlyName] == "Speakers (Simulated Audio)"
+    assert properties[fakes.PKEY_Device_FriendlyName.lower()] == "Speakers (Simulated Audio)"
+    assert store.reads == [fakes.PKEY_Device_FriendlyName]
+
+
+def test_keys_without_values(store):
+    properties = PropertyStore(store)
+    assert len(properties) == 2
+    assert sorted(properties) == sorted(
+        [fakes.PKEY_Device_FriendlyName, fakes.PKEY_Device_DeviceDesc]
+    )
+    assert store.reads == []
+
+
+def test_missing_keys_are_read_once(store):
+    properties = PropertyStore(store)
+    assert properties.get(fakes.PKEY_DeviceInterface_FriendlyName) is None
+    with pytest.raises(KeyError):
+        properties[fakes.PKEY_DeviceInterface_FriendlyName]
+    assert store.reads == [fakes.PKEY_DeviceInterface_FriendlyName]
+    with pytest.raises(KeyError):
+        properties["not a key"]
+
+
+def test_prefetch_reads_everything_once(store):
+    properties = PropertyStore(store).prefetch()
+    assert len(store.reads) == 2
+    assert dict(properties) == {
+        fakes.PKEY_Device_FriendlyName: "Speakers (Simulated Audio)",
+        fakes.PKEY_Device_DeviceDesc: "Speakers",
+    }
+    assert len(store.reads) == 2
+
+
+def test_propertykey_as_key(store):
+    properties = PropertyStore(store)
+    pid = fakes.PKEY_Device_DeviceDesc.rsplit(" ", 1)[1]
+    name, key = PropertyStore._normalize(fakes.PKEY_Device_DeviceDesc)
+    assert isinstance(key, PROPERTYKEY)
+    assert (name, key.pid) == (fakes.PKEY_Device_DeviceDesc, int(pid))
+    assert properties[key] == "Speakers"
+
+
+def test_all_devices():
+    backend = fakes.SimulatedBackend()
+    devices = all_devices(backend.enumerator)
+    assert [device.FriendlyName for device in devices] == [
+        "Speakers (Simulated Audio)",
+        "Headphones (Simulated Audio)",
+        "Display Audio (Simulated HDMI)",
+        "Microphone (Simulated Audio)",
+    ]
+    assert [device.state for device in devices] == [
+        AudioDeviceState.Active,
+        AudioDeviceState.Unplugged,
+        AudioDeviceState.NotPresent,
+        AudioDeviceState.Active,
+    ]
+    speakers = devices[0]
+    assert speakers.EndpointVolume is backend.mixer.endpoint_volume
+    assert speakers.EndpointVolume is speakers.EndpointVolume
+    assert create_device(None) is None
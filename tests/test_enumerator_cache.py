@@ -0,0 +1,73 @@
+"""
+device_enumerator_cache shared by AudioUtilities, invalidated by
+pycaw.callbacks.MMNotificationClient on every topology change.
+"""
+
+import comtypes
+import pytest
+
+import fakes
+from nvdastubs import register_class
+from pycaw.callbacks import MMNotificationClient
+from pycaw.constants import CLSID_MMDeviceEnumerator
+from pycaw.utils import AudioUtilities, device_enumerator_cache
+
+pytestmark = pytest.mark.skipif(
+    not getattr(comtypes, "stand_in", False),
+    reason="CoCreateInstance must come from the comtypes stand-in",
+)
+
+
+@pytest.fixture
+def backend():
+    backend = fakes.SimulatedBackend()
+    created = []
+
+    def create():
+        created.append(backend.enumerator)
+        return backend.enumerator
+
+    register_class(CLSID_MMDeviceEnumerator, create)
+    device_enumerator_cache.invalidate()
+    backend.created = created
+    yield backend
+    device_enumerator_cache.invalidate()
+
+
+@pytest.fixture
+def client(backend):
+    client = MMNotificationClient()
+    backend.enumerator.RegisterEndpointNotificationCallback(client)
+    yield client
+    backend.enumerator.UnregisterEndpointNotificationCallback(client)
+
+
+def test_enumerator_is_created_once(backend):
+    AudioUtilities.GetSpeakers()
+    AudioUtilities.GetAllDevices()
+    assert AudioUtilities.GetDeviceEnumerator() is backend.enumerator
+    assert len(backend.created) == 1
+
+
+@pytest.mark.parametrize(
+    "event, args",
+    [
+        ("OnDefaultDeviceChanged", (0, 1, fakes.SimulatedBackend.device_id)),
+        ("OnDeviceAdded", ("{new}",)),
+        ("OnDeviceRemoved", ("{old}",)),
+        ("OnDeviceStateChanged", (fakes.SimulatedBackend.device_id, 8)),
+    ],
+)
+def test_topology_changes_invalidate(backend, client, event, args):
+    AudioUtilities.GetSpeakers()
+    backend.enumerator.fire(event, *args)
+    AudioUtilities.GetSpeakers()
+    assert len(backend.created) == 2
+
+
+def test_property_changes_keep_the_enumerator(backend, client):
+    AudioUtilities.GetSpeakers()
+    key = fakes.FakePropertyKey("{A45C254E-DF1C-4EFD-8020-67D146A850E0}", 14)
+    backend.enumerator.fire("OnPropertyValueChanged", backend.device_id, key)
+    AudioUtilities.GetSpeakers()
+    assert len(backend.created) == 1
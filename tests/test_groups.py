@@ -0,0 +1,72 @@
+"""AppGroups following a registry: one group per executable."""
+
+import pytest
+
+from pycaw.groups import AppGroups
+
+
+@pytest.fixture
+def groups(registry):
+    groups = AppGroups(registry)
+    yield groups
+    groups.close()
+
+
+def add(mgr, pid, exe, volume=1.0, mute=0):
+    ctl = mgr.add_session(pid, exe, notify=False)
+    ctl.volume._volume = volume
+    ctl.volume._mute = mute
+    # notified only now, so the registry reads the volume set above
+    for sink in list(mgr._sinks):
+        sink.OnSessionCreated(ctl)
+    return ctl
+
+
+def test_one_group_per_exe(mgr, groups):
+    tab = add(mgr, 20, "firefox.exe")
+    other_tab = add(mgr, 21, "Firefox.exe")
+    add(mgr, 10, "vlc.exe")
+    add(mgr, 0, None)
+    assert sorted(group.exe for group in groups.groups()) == ["firefox.exe", "vlc.exe"]
+    firefox = groups.get("FIREFOX.EXE")
+    assert firefox.keys() == [
+        tab.GetSessionInstanceIdentifier(),
+        other_tab.GetSessionInstanceIdentifier(),
+    ]
+    assert groups.group_of(tab.GetSessionInstanceIdentifier()) is firefox
+
+
+def test_loudest_session_and_any_mute(mgr, groups):
+    add(mgr, 20, "firefox.exe", volume=0.3)
+    add(mgr, 21, "firefox.exe", volume=0.7, mute=1)
+    firefox = groups.get("firefox.exe")
+    assert firefox.GetMasterVolume() == pytest.approx(0.7)
+    assert firefox.GetMute() == 1
+
+
+def test_writes_only_differing_sessions(mgr, groups):
+    quiet = add(mgr, 20, "firefox.exe", volume=0.3)
+    loud = add(mgr, 21, "firefox.exe", volume=0.5)
+    firefox = groups.get("firefox.exe")
+    firefox.SetMasterVolume(0.5, None)
+    assert firefox.writes == 1
+    assert quiet.volume.GetMasterVolume() == loud.volume.GetMasterVolume() == 0.5
+    firefox.SetMasterVolume(0.5, None)
+    assert firefox.writes == 1
+
+
+def test_session_events_update_the_group(mgr, groups):
+    ctl = add(mgr, 20, "firefox.exe", volume=0.3)
+    ctl.volume.SetMasterVolume(0.8, None)
+    assert groups.get("firefox.exe").GetMasterVolume() == pytest.approx(0.8)
+
+
+def test_expired_sessions_leave_their_group(mgr, groups):
+    tab = add(mgr, 20, "firefox.exe")
+    other_tab = add(mgr, 21, "firefox.exe")
+    tab.expire()
+    assert len(groups.get("firefox.exe")) == 1
+    other_tab.expire()
+    assert groups.get("firefox.exe") is None
+    assert len(groups) == 0
+
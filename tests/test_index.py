@@ -0,0 +1,141 @@
+"""SessionIndex and the lookups answered from it, against a fake session manager."""
+
+import pytest
+
+from pycaw.registry import SessionEntry, SessionIndex
+
+
+def entry(key, pid, exe):
+    return SessionEntry(key, None, pid, exe, "", 0)
+
+
+def keys(entries):
+    return sorted(entry.key for entry in entries)
+
+
+def test_index_add_remove():
+    index = SessionIndex()
+    vlc, tab, other_tab = (
+        entry("a", 10, "vlc.exe"),
+        entry("b", 20, "firefox.exe"),
+        entry("c", 20, "firefox.exe"),
+    )
+    for e in (vlc, tab, other_tab):
+        index.add(e)
+    assert len(index) == 3
+    assert index.by_pid(20) == [tab, other_tab]
+    assert index.remove("b") is tab
+    assert index.by_pid(20) == [other_tab]
+    assert index.by_exe("firefox.exe") == [other_tab]
+    index.remove("c")
+    # emptied buckets are dropped
+    assert 20 not in index._by_pid
+    assert "firefox.exe" not in index._by_exe
+    assert index.remove("c") is None
+
+
+def test_index_exe_any_case():
+    index = SessionIndex()
+    e = entry("a", 10, "Firefox.EXE")
+    index.add(e)
+    assert index.by_exe("firefox.exe") == [e]
+    assert index.by_exe("FIREFOX.EXE") == [e]
+
+
+def test_index_without_exe():
+    index = SessionIndex()
+    system = entry("a", 0, None)
+    index.add(system)
+    assert index.by_pid(0) == [system]
+    assert index._by_exe == {}
+    assert index.remove("a") is system
+
+
+def test_lookups_return_copies():
+    index = SessionIndex()
+    index.add(entry("a", 10, "vlc.exe"))
+    index.by_pid(10).clear()
+    index.by_exe("vlc.exe").clear()
+    assert len(index.by_pid(10)) == len(index.by_exe("vlc.exe")) == 1
+
+
+def test_created_sessions_are_indexed(mgr, registry):
+    vlc = mgr.add_session(10, "vlc.exe")
+    tab = mgr.add_session(20, "firefox.exe")
+    other_tab = mgr.add_session(21, "firefox.exe")
+    key = vlc.GetSessionInstanceIdentifier()
+    assert registry.get(key).pid == 10
+    assert keys(registry.by_pid(10)) == [key]
+    assert keys(registry.by_exe("Firefox.exe")) == sorted(
+        [tab.GetSessionInstanceIdentifier(), other_tab.GetSessionInstanceIdentifier()]
+    )
+
+
+def test_expired_sessions_are_dropped(mgr, registry):
+    tab = mgr.add_session(20, "firefox.exe")
+    other_tab = mgr.add_session(20, "firefox.exe")
+    tab.expire()
+    key = other_tab.GetSessionInstanceIdentifier()
+    assert registry.get(tab.GetSessionInstanceIdentifier()) is None
+    assert keys(registry.by_pid(20)) == [key]
+    assert keys(registry.by_exe("firefox.exe")) == [key]
+    other_tab.expire()
+    assert registry.by_pid(20) == []
+    assert registry.by_exe("firefox.exe") == []
+
+
+def test_rename_keeps_the_index(mgr, registry):
+    ctl = mgr.add_session(10, "vlc.exe")
+    ctl.SetDisplayName("VLC media player", None)
+    assert keys(registry.by_exe("vlc.exe")) == [ctl.GetSessionInstanceIdentifier()]
+
+
+def test_close_empties_the_index(mgr, registry):
+    mgr.add_session(10, "vlc.exe")
+    registry.close()
+    assert registry.by_pid(10) == []
+    assert registry.by_exe("vlc.exe") == []
+
+
+class TestAudioUtilities:
+    """The AudioUtilities lookups answered from the registry."""
+
+    @pytest.fixture(autouse=True)
+    def utilities(self, registry):
+        from pycaw.utils import AudioUtilities
+
+        AudioUtilities.UseSessionRegistry(registry)
+        yield AudioUtilities
+        AudioUtilities.UseSessionRegistry(None)
+
+    def test_lookups(self, mgr, utilities):
+        vlc = mgr.add_session(10, "vlc.exe")
+        tab = mgr.add_session(20, "firefox.exe")
+        other_tab = mgr.add_session(21, "Firefox.exe")
+        key = vlc.GetSessionInstanceIdentifier()
+        assert utilities.GetProcessSession(10).InstanceIdentifier == key
+        assert [s.InstanceIdentifier for s in utilities.GetProcessSessions(10)] == [key]
+        assert utilities.GetSessionByInstanceIdentifier(key).ProcessId == 10
+        assert sorted(
+            s.InstanceIdentifier for s in utilities.GetSessionsByName("FIREFOX.EXE")
+        ) == sorted(
+            [tab.GetSessionInstanceIdentifier(), other_tab.GetSessionInstanceIdentifier()]
+        )
+
+    def test_expired(self, mgr, utilities):
+        ctl = mgr.add_session(10, "vlc.exe")
+        key = ctl.GetSessionInstanceIdentifier()
+        ctl.expire()
+        assert utilities.GetProcessSession(10) is None
+        assert utilities.GetProcessSessions(10) == []
+        assert utilities.GetSessionsByName("vlc.exe") == []
+        assert utilities.GetSessionByInstanceIdentifier(key) is None
+
+    def test_unknown(self, utilities):
+        assert utilities.GetProcessSession(99) is None
+        assert utilities.GetSessionsByName("nothing.exe") == []
+        assert utilities.GetSessionByInstanceIdentifier("nothing") is None
+
+    def test_closed_registry_is_not_used(self, registry, utilities):
+        registry.close()
+        assert utilities._live_registry() is None
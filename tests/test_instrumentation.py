@@ -0,0 +1,30 @@
+"""Worker jobs booked on the operation that submitted them."""
+
+from volumeManager.instrumentation import Instrumentation
+from volumeManager.worker import ComWorker
+
+
+def test_jobs_per_call():
+    instrumentation = Instrumentation()
+    instrumentation.enabled = True
+    worker = ComWorker(initializer=None, uninitializer=None, on_submit=instrumentation.worker_job)
+    worker.start()
+
+    @instrumentation.timed("script_refresh")
+    def refresh():
+        worker.call(lambda: None)
+        worker.call(lambda: None)
+
+    try:
+        refresh()
+        refresh()
+    finally:
+        worker.stop()
+    assert instrumentation.histograms["script_refresh"].jobs == 4
+    assert instrumentation.report()[0].endswith(", 2.0 worker jobs per call")
+
+
+def test_disabled_records_nothing():
+    instrumentation = Instrumentation()
+    instrumentation.worker_job("initialize")
+    assert instrumentation.histograms == {}
@@ -0,0 +1,53 @@
+"""PeakSampler levels, and the order they give the layer."""
+
+import fakes
+from pycaw.meters import PeakSampler
+from pycaw.ordering import SessionOrder
+
+
+def sampler_with(clock, **peaks):
+    sampler = PeakSampler(max_age=1.0, clock=clock)
+    for key, peak in peaks.items():
+        sampler.add_source(key, fakes.FakeAudioMeterInformation(peak))
+    return sampler
+
+
+def test_levels_of_the_latest_samples():
+    clock = fakes.ManualClock()
+    sampler = sampler_with(clock, music=0.5, chat=0.0)
+    sampler.sample_once()
+    assert sampler.level("music") == 0.5
+    assert sampler.active() == [("music", 0.5)]
+
+
+def test_samples_older_than_max_age_do_not_count():
+    clock = fakes.ManualClock()
+    sampler = sampler_with(clock, music=0.5)
+    sampler.sample_once()
+    clock.advance(2.0)
+    assert sampler.level("music") == 0.0
+    assert sampler.summary("music") == (0.0, 0.0)
+    assert sampler.active() == []
+
+
+def test_previous_layer_session_does_not_order(mgr, registry):
+    clock = fakes.ManualClock()
+    order = SessionOrder(registry, clock=clock)
+    first = mgr.add_session(10, "a.exe").GetSessionInstanceIdentifier()
+    second = mgr.add_session(11, "b.exe").GetSessionInstanceIdentifier()
+    order.touch(first)
+    clock.advance(1.0)
+    order.touch(second)
+    keys = order.keys()
+    # the least recent session was loud while the layer was last on
+    sampler = sampler_with(clock, **{first: 0.8, second: 0.0})
+    sampler.sample_once()
+    clock.advance(60.0)
+    order.set_levels(sampler.level)
+    assert order.keys() == keys
+    # fresh samples do reorder
+    sampler.sample_once()
+    order.set_levels(sampler.level)
+    assert order.keys()[0] == first
+    assert order.keys() != keys
+    order.close()
@@ -0,0 +1,149 @@
+"""The layer's application list follows sessions as they come and go."""
+
+from concurrent.futures import Future
+
+import pytest
+
+import fakes
+from nvdastubs import drain
+
+
+class Gesture:
+    def __init__(self, key):
+        self.key = key
+
+    def _get_identifiers(self):
+        return ("kb(desktop):" + self.key, "kb:" + self.key)
+
+    def send(self):
+        self.sent = True
+
+
+TURN = Gesture("nvda+shift+v")
+
+
+@pytest.fixture
+def backend():
+    return fakes.SimulatedBackend()
+
+
+@pytest.fixture
+def plugin(backend, monkeypatch):
+    import volumeManager
+
+    monkeypatch.setattr(volumeManager.GlobalPlugin, "backend", backend)
+    plugin = volumeManager.GlobalPlugin()
+    plugin.ensure_active()
+    yield plugin
+    if plugin.enabled:
+        plugin.script_turn(TURN)
+    plugin.terminate()
+    drain()
+
+
+def layer(plugin):
+    """Names the layer offers, the layer is switched off again."""
+    plugin.script_turn(TURN)
+    names = [app.name for app in plugin.apps]
+    plugin.script_turn(TURN)
+    return names
+
+
+def test_master_only(plugin):
+    assert layer(plugin) == ["Master volume"]
+
+
+def test_added(plugin, backend):
+    backend.mixer.add_app("vlc.exe")
+    assert layer(plugin) == ["Master volume", "vlc.exe"]
+
+
+def test_expired(plugin, backend):
+    vlc = backend.mixer.add_app("vlc.exe")
+    backend.mixer.add_app("spotify.exe")
+    vlc.expire()
+    assert layer(plugin) == ["Master volume", "spotify.exe"]
+
+
+def test_renamed(plugin, backend):
+    vlc = backend.mixer.add_app("vlc.exe")
+    vlc.SetDisplayName("VLC media player", None)
+    assert layer(plugin) == ["Master volume", "VLC media player"]
+
+
+def test_sessions_of_one_exe_are_one_app(plugin, backend):
+    backend.mixer.add_app("firefox.exe")
+    tab = backend.mixer.add_app("firefox.exe")
+    assert layer(plugin) == ["Master volume", "firefox.exe"]
+    tab.expire()
+    assert layer(plugin) == ["Master volume", "firefox.exe"]
+
+
+@pytest.mark.parametrize("activation", ["pending", "failed"])
+def test_volume_key_before_the_setup(backend, monkeypatch, activation):
+    import volumeManager
+
+    future = Future()
+    if activation == "failed":
+        future.set_exception(OSError("no endpoint"))
+    monkeypatch.setattr(volumeManager.GlobalPlugin, "backend", backend)
+    monkeypatch.setattr(volumeManager.GlobalPlugin, "activate", lambda self: future)
+    plugin = volumeManager.GlobalPlugin()
+    gesture = Gesture("volumeUp")
+    plugin.script_volume_changed(gesture)
+    assert gesture.sent
+    assert not plugin.volume_key_armed
+
+
+def test_volume_key_arms_the_announcement(plugin):
+    gesture = Gesture("volumeUp")
+    plugin.script_volume_changed(gesture)
+    assert gesture.sent
+    assert plugin.volume_key_armed
+
+
+def test_volume_key_timeout_reads_on_the_worker(plugin, monkeypatch):
+    import volumeManager
+
+    spoken = []
+    monkeypatch.setattr(volumeManager.ui, "message", spoken.append)
+    plugin.script_volume_changed(Gesture("volumeUp"))
+    # no notification arrives, the timeout announces the level as is
+    drain()
+    plugin.worker.call(lambda: None)
+    assert spoken == ["100%"]
+    assert plugin.worker.stats()["GetMasterVolume"][0] >= 1
+
+
+def test_profiles_are_saved_and_restored_on_the_worker(plugin, backend, monkeypatch, tmp_path):
+    import volumeManager
+    from volumeManager.pycaw.profiles import ProfileStore
+
+    spoken = []
+    monkeypatch.setattr(volumeManager.ui, "message", spoken.append)
+    plugin.profiles = ProfileStore(str(tmp_path / "profiles.json"))
+    vlc = backend.mixer.add_app("vlc.exe")
+    plugin.script_turn(TURN)
+    plugin.script_restore_profile(Gesture("1"))
+    plugin.script_save_profile(Gesture("shift+1"))
+    plugin.worker.call(lambda: None)
+    vlc.volume.SetMasterVolume(0.3, None)
+    plugin.script_restore_profile(Gesture("shift+1"))
+    plugin.worker.call(lambda: None)
+    assert spoken[-3:] == ["Profile 1 is empty", "Profile 1 saved", "Profile 1 restored"]
+    assert vlc.volume.GetMasterVolume() == 1.0
+
+
+def test_corrupt_profiles_are_announced(plugin, monkeypatch, tmp_path):
+    import volumeManager
+    from volumeManager.pycaw.profiles import ProfileStore
+
+    spoken = []
+    monkeypatch.setattr(volumeManager.ui, "message", spoken.append)
+    path = tmp_path / "profiles.json"
+    path.write_text("{not json", encoding="utf-8")
+    plugin.profiles = ProfileStore(str(path))
+    plugin.script_turn(TURN)
+    plugin.script_restore_profile(Gesture("1"))
+    plugin.worker.call(lambda: None)
+    assert spoken[-1] == "Profile 1 could not be restored"
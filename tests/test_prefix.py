@@ -0,0 +1,57 @@
+"""PrefixIndex lookups ignoring case and combining marks."""
+
+import pytest
+
+from pycaw.prefix import PrefixIndex
+
+
+@pytest.mark.parametrize(
+    "text, normalized",
+    [
+        ("Firefox", "firefox"),
+        ("Édition", "edition"),
+        # the same name with a combining acute accent
+        ("E\u0301dition", "edition"),
+        ("straße", "strasse"),
+        ("Ｚｏｏｍ", "zoom"),
+        ("ﬁlm", "film"),
+    ],
+)
+def test_normalize(text, normalized):
+    assert PrefixIndex.normalize(text) == normalized
+
+
+def test_precomposed_and_combining_forms_match():
+    index = PrefixIndex()
+    index.add("precomposed", "Éditeur")
+    index.add("combining", "E\u0301cran")
+    assert index.lookup("e") == ["combining", "precomposed"]
+    assert index.lookup("\u00c9") == ["combining", "precomposed"]
+    assert index.lookup("E\u0301") == ["combining", "precomposed"]
+    assert index.lookup("éd") == ["precomposed"]
+    assert index.lookup("STRASSE") == []
+
+
+def test_lookup_in_name_order_each_key_once():
+    index = PrefixIndex()
+    index.add("firefox", "Firefox", "firefox.exe")
+    index.add("foobar", "foobar2000")
+    index.add("vlc", "VLC media player", "vlc.exe")
+    assert index.lookup("f") == ["firefox", "foobar"]
+    assert index.lookup("fo") == ["foobar"]
+    assert index.lookup("") == ["firefox", "foobar", "vlc"]
+    assert index.lookup("x") == []
+
+
+def test_add_replaces_and_remove():
+    index = PrefixIndex()
+    index.add("app", "Spotify")
+    index.add("app", "Teams")
+    assert index.lookup("s") == []
+    assert index.lookup("t") == ["app"]
+    index.add("straße", "Straße", None, "")
+    assert index.lookup("strass") == ["straße"]
+    index.remove("app")
+    index.remove("unknown")
+    assert len(index) == 1
+    assert index.lookup("t") == []
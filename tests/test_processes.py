@@ -0,0 +1,27 @@
+"""Process names from /proc, as the Windows snapshot gives them."""
+
+import os
+import sys
+
+import pytest
+
+from pycaw import processes
+
+pytestmark = pytest.mark.skipif(
+    processes._default_snapshot is not processes._snapshot_procfs,
+    reason="needs /proc",
+)
+
+
+def test_name_is_the_executable_file_name():
+    create_time, name = processes.snapshot({os.getpid()})[os.getpid()]
+    assert name == os.path.basename(os.path.realpath(sys.executable))
+    assert create_time > 0
+
+
+def test_names_are_only_read_when_asked_for():
+    assert processes.snapshot({os.getpid()}, names=False)[os.getpid()][1] is None
+
+
+def test_gone_pids_are_left_out():
+    assert processes.running({os.getpid(), 2**22 + 1}) == {os.getpid()}
@@ -0,0 +1,82 @@
+"""Profiles captured from and restored to a FakeMixer, and their JSON file."""
+
+import pytest
+
+import fakes
+from pycaw.profiles import Profile, ProfileError, ProfileStore, capture, restore
+
+
+@pytest.fixture
+def mixer():
+    mixer = fakes.FakeMixer(volume=0.8)
+    mixer.add_app("vlc.exe", volume=0.5)
+    mixer.add_app("Spotify.exe", volume=0.2, mute=1)
+    return mixer
+
+
+class Unreadable:
+    """ISimpleAudioVolume whose current values must not be read."""
+
+    def __init__(self):
+        self.written = []
+
+    def GetMasterVolume(self):
+        raise AssertionError("read")
+
+    GetMute = GetMasterVolumeLevelScalar = GetMasterVolume
+
+    def SetMasterVolume(self, level, event_context):
+        self.written.append(level)
+
+
+def test_capture_restore_round_trip(mixer):
+    profile = capture(mixer.endpoint_volume, mixer.session_volumes())
+    assert profile == Profile((0.8, 0), {"vlc.exe": (0.5, 0), "spotify.exe": (0.2, 1)})
+    mixer.endpoint_volume.SetMasterVolumeLevelScalar(0.3, None)
+    for exe, volume in mixer.session_volumes():
+        volume.SetMasterVolume(1.0, None)
+        volume.SetMute(0, None)
+    assert restore(profile, mixer.endpoint_volume, mixer.session_volumes()) == 4
+    assert capture(mixer.endpoint_volume, mixer.session_volumes()) == profile
+
+
+def test_restore_writes_only_changed_values(mixer):
+    profile = capture(mixer.endpoint_volume, mixer.session_volumes())
+    assert restore(profile, mixer.endpoint_volume, mixer.session_volumes()) == 0
+    dict(mixer.session_volumes())["vlc.exe"].SetMasterVolume(0.9, None)
+    assert restore(profile, mixer.endpoint_volume, mixer.session_volumes()) == 1
+
+
+def test_restore_uses_known_values():
+    profile = Profile((0.5, 0), {"vlc.exe": (0.5, 0)})
+    endpoint, vlc = Unreadable(), Unreadable()
+    writes = restore(profile, endpoint, [("vlc.exe", vlc, (0.2, 0))], master=(0.5, 0))
+    assert writes == 1
+    assert vlc.written == [0.5]
+    assert endpoint.written == []
+
+
+def test_store_json_round_trip(tmp_path):
+    path = str(tmp_path / "profiles.json")
+    profile = Profile((0.8, 0), {"vlc.exe": (0.5, 1)})
+    ProfileStore(path)["1"] = profile
+    store = ProfileStore(path)
+    assert store["1"] == profile
+    assert list(store) == ["1"]
+    del store["1"]
+    assert len(ProfileStore(path)) == 0
+
+
+@pytest.mark.parametrize(
+    "content", ["{not json", '{"1": {"apps": {"vlc.exe": [0.5]}}}', "[1]"]
+)
+def test_corrupt_file(tmp_path, content):
+    path = tmp_path / "profiles.json"
+    path.write_text(content, encoding="utf-8")
+    store = ProfileStore(str(path))
+    with pytest.raises(ProfileError):
+        store.get("1")
+    with pytest.raises(ProfileError):
+        store["1"] = Profile()
+    # left for the user to repair
+    assert path.read_text(encoding="utf-8") == content
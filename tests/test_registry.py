@@ -0,0 +1,142 @@
+"""SessionRegistry, kept current by a fake session manager."""
+
+import threading
+
+import pytest
+
+import fakes
+from pycaw.processes import ProcessNameResolver
+from pycaw.registry import SessionRegistry
+
+
+@pytest.fixture
+def events(registry):
+    events = []
+    registry.subscribe(lambda event, entry: events.append((event, entry.key)))
+    return events
+
+
+def keys(entries):
+    return sorted(entry.key for entry in entries)
+
+
+def test_initial_scan(mgr):
+    vlc = mgr.add_session(10, "vlc.exe")
+    system = mgr.add_session(0)
+    mgr.add_session(11, "gone.exe").expire()
+    registry = SessionRegistry(mgr, resolver=ProcessNameResolver(mgr.snapshot))
+    try:
+        assert keys(registry.entries()) == sorted(
+            [vlc.GetSessionInstanceIdentifier(), system.GetSessionInstanceIdentifier()]
+        )
+        assert registry.by_pid(10)[0].exe == "vlc.exe"
+        assert registry.by_pid(0)[0].exe is None
+    finally:
+        registry.close()
+
+
+def test_add(mgr, registry, events):
+    ctl = mgr.add_session(10, "vlc.exe", display_name="VLC")
+    key = ctl.GetSessionInstanceIdentifier()
+    entry = registry.get(key)
+    assert entry.pid == 10
+    assert entry.exe == "vlc.exe"
+    assert entry.name == "VLC"
+    assert registry.by_pid(10) == [entry]
+    assert registry.by_exe("VLC.EXE") == [entry]
+    assert events == [("added", key)]
+
+
+def test_add_twice(mgr, registry, events):
+    ctl = mgr.add_session(10, "vlc.exe")
+    # a second notification of the same session
+    registry._notification.OnSessionCreated(ctl)
+    assert len(registry) == 1
+    assert [event for event, _ in events] == ["added"]
+
+
+def test_expire(mgr, registry, events):
+    ctl = mgr.add_session(10, "vlc.exe")
+    other = mgr.add_session(10, "vlc.exe")
+    key = ctl.GetSessionInstanceIdentifier()
+    ctl.expire()
+    assert registry.get(key) is None
+    assert keys(registry.by_pid(10)) == [other.GetSessionInstanceIdentifier()]
+    assert keys(registry.by_exe("vlc.exe")) == [other.GetSessionInstanceIdentifier()]
+    assert events[-1] == ("removed", key)
+    # its events are no longer listened to
+    assert ctl._sinks == []
+
+
+def test_expire_last_of_pid(mgr, registry):
+    mgr.add_session(10, "vlc.exe").expire()
+    assert registry.by_pid(10) == []
+    assert registry.by_exe("vlc.exe") == []
+    assert len(registry) == 0
+
+
+def test_rename(mgr, registry, events):
+    ctl = mgr.add_session(10, "vlc.exe")
+    key = ctl.GetSessionInstanceIdentifier()
+    ctl.SetDisplayName("VLC media player", None)
+    entry = registry.get(key)
+    assert entry.name == "VLC media player"
+    # the index is by pid and executable, a new display name leaves it alone
+    assert registry.by_exe("vlc.exe") == [entry]
+    assert events[-1] == ("renamed", key)
+
+
+def test_state_and_volume(mgr, registry, events):
+    ctl = mgr.add_session(10, "vlc.exe")
+    key = ctl.GetSessionInstanceIdentifier()
+    ctl.set_state(fakes.AudioSessionStateActive)
+    ctl.volume.SetMasterVolume(0.5, None)
+    entry = registry.get(key)
+    assert entry.state == fakes.AudioSessionStateActive
+    assert (entry.level, entry.muted) == (0.5, 0)
+    assert [event for event, _ in events] == ["added", "state", "volume"]
+
+
+def test_close(mgr, registry):
+    ctl = mgr.add_session(10, "vlc.exe")
+    registry.close()
+    assert registry.closed
+    assert len(registry) == 0
+    assert mgr._sinks == []
+    assert ctl._sinks == []
+    mgr.add_session(11, "firefox.exe")
+    assert len(registry) == 0
+
+
+class MeetingResolver(ProcessNameResolver):
+    """Holds every name() call until two threads are in it."""
+
+    def __init__(self, snapshot):
+        super().__init__(snapshot)
+        self.barrier = threading.Barrier(2, timeout=5)
+
+    def name(self, pid):
+        self.barrier.wait()
+        return super().name(pid)
+
+
+def test_concurrent_created_notifications(mgr):
+    ctl = mgr.add_session(10, "vlc.exe")
+    mgr.GetSessionEnumerator = lambda: fakes.FakeAudioSessionEnumerator([])
+    registry = SessionRegistry(mgr, resolver=MeetingResolver(mgr.snapshot))
+    try:
+        # the same session delivered on two threads at once, both get
+        # past the first membership check before either adds it
+        threads = [
+            threading.Thread(target=registry._notification.OnSessionCreated, args=(ctl,))
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(registry) == 1
+        assert len(registry.by_pid(10)) == 1
+        assert len(ctl._sinks) == 1
+    finally:
+        registry.close()
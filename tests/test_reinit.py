@@ -0,0 +1,57 @@
+"""DebouncedReinitializer collapsing bursts of device events, on a ManualClock."""
+
+import fakes
+from volumeManager.reinit import DebouncedReinitializer
+
+
+def reinitializer(rebuild, clock):
+    return DebouncedReinitializer(
+        rebuild, quiet_window=0.5, call_later=clock.call_later, clock=clock
+    )
+
+
+def test_burst_is_one_rebuild():
+    clock = fakes.ManualClock()
+    rebuilds = []
+    reinit = reinitializer(lambda *args: rebuilds.append(args), clock)
+    for i in range(20):
+        reinit.notify("device %d" % (i % 3))
+        clock.advance(0.01)
+    reinit.notify("device 0", default_changed=True)
+    clock.advance(1.0)
+    assert rebuilds == [({"device 0", "device 1", "device 2"}, True)]
+    assert reinit.stats() == {"events": 21, "rebuilds": 1, "collapsed": 20, "pending": 0}
+
+
+def test_each_event_extends_the_quiet_window():
+    clock = fakes.ManualClock()
+    rebuilds = []
+    reinit = reinitializer(lambda *args: rebuilds.append(args), clock)
+    reinit.notify("speakers")
+    clock.advance(0.4)
+    reinit.notify("speakers")
+    clock.advance(0.4)
+    assert rebuilds == []
+    clock.advance(0.2)
+    assert rebuilds == [({"speakers"}, False)]
+
+
+def test_events_during_a_rebuild_start_one_more():
+    clock = fakes.ManualClock()
+    rebuilds = []
+
+    def rebuild(device_ids, default_changed):
+        rebuilds.append(device_ids)
+        if len(rebuilds) == 1:
+            # arrive while the first rebuild runs
+            reinit.notify("headphones")
+            reinit.notify("hdmi")
+
+    reinit = reinitializer(rebuild, clock)
+    reinit.notify("speakers")
+    clock.advance(0.5)
+    assert rebuilds == [{"speakers"}]
+    clock.advance(0.5)
+    assert rebuilds == [{"speakers"}, {"headphones", "hdmi"}]
+    clock.advance(5.0)
+    assert reinit.rebuilds == 2
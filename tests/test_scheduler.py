@@ -0,0 +1,135 @@
+"""VolumeWriteScheduler on a ManualClock, every step at a chosen time."""
+
+import pytest
+
+from fakes import FakeSimpleAudioVolume, ManualClock
+from volumeManager.scheduler import VolumeWriteScheduler
+
+
+class Recorder:
+    """Volume control counting SetMasterVolume calls."""
+
+    def __init__(self, volume=0.5):
+        self.volume = FakeSimpleAudioVolume(volume)
+        self.writes = []
+
+    def GetMasterVolume(self):
+        return self.volume.GetMasterVolume()
+
+    def SetMasterVolume(self, level, event_context):
+        self.writes.append(level)
+        self.volume.SetMasterVolume(level, event_context)
+
+
+@pytest.fixture
+def clock():
+    return ManualClock()
+
+
+@pytest.fixture
+def spoken():
+    return []
+
+
+@pytest.fixture
+def scheduler(clock, spoken):
+    return VolumeWriteScheduler(
+        spoken.append,
+        clock.call_later,
+        flush_interval=0.03,
+        settle_delay=0.15,
+        clock=clock,
+    )
+
+
+def hold(scheduler, clock, control, delta, presses, interval=0.01):
+    """Auto-repeated steps, interval seconds apart."""
+    for _ in range(presses):
+        scheduler.step(control, delta)
+        clock.advance(interval)
+
+
+def test_first_step_is_written_at_once(scheduler, spoken):
+    control = Recorder()
+    assert scheduler.step(control, 0.01) == 0.51
+    assert control.writes == [0.51]
+    assert spoken == []
+
+
+def test_held_key_is_coalesced(scheduler, clock, spoken):
+    control = Recorder()
+    hold(scheduler, clock, control, 0.01, 30)
+    # one write per flush interval, not one per step
+    assert scheduler.steps == 30
+    assert len(control.writes) < 15
+    assert control.writes[-1] == 0.8
+    assert spoken == []
+    clock.advance(0.15)
+    assert control.GetMasterVolume() == 0.8
+    assert spoken == [0.8]
+
+
+def test_announces_once_settled(scheduler, clock, spoken):
+    control = Recorder()
+    scheduler.step(control, 0.01)
+    clock.advance(0.1)
+    scheduler.step(control, 0.01)
+    # the settle delay counts from the last step
+    clock.advance(0.1)
+    assert spoken == []
+    clock.advance(0.05)
+    assert spoken == [0.52]
+    assert scheduler.announcements == 1
+
+
+def test_limits(scheduler, clock, spoken):
+    control = Recorder(1.0)
+    assert scheduler.step(control, 0.01) is None
+    assert control.writes == []
+    clock.advance(1)
+    assert spoken == []
+
+
+def test_clamped_to_range(scheduler, clock):
+    control = Recorder(0.995)
+    assert scheduler.step(control, 0.01) == 1.0
+    assert scheduler.step(control, 0.01) is None
+
+
+def test_new_control_flushes_the_previous(scheduler, clock, spoken):
+    first, second = Recorder(), Recorder(0.2)
+    hold(scheduler, clock, first, 0.01, 3, interval=0.001)
+    assert first.writes == [0.51]
+    scheduler.step(second, -0.01)
+    assert first.writes == [0.51, 0.53]
+    assert spoken == [0.53]
+    # one write per flush interval, whichever control it goes to
+    assert second.writes == []
+    clock.advance(0.03)
+    assert second.writes == [0.19]
+
+
+def test_flush_without_announcement(scheduler, clock, spoken):
+    control = Recorder()
+    hold(scheduler, clock, control, -0.01, 3, interval=0.001)
+    scheduler.flush(announce=False)
+    assert control.writes[-1] == 0.47
+    clock.advance(1)
+    assert spoken == []
+
+
+def test_volume_read_again_after_announcement(scheduler, clock, spoken):
+    control = Recorder()
+    scheduler.step(control, 0.01)
+    clock.advance(1)
+    # changed elsewhere between two holds
+    control.volume.SetMasterVolume(0.3, None)
+    assert scheduler.step(control, 0.01) == 0.31
+
+
+def test_stepped_reads_unknown_volume(scheduler, clock, spoken):
+    control = Recorder(0.4)
+    scheduler.stepped(control, None)
+    clock.advance(0.15)
+    assert control.writes == []
+    assert spoken == [0.4]
@@ -0,0 +1,51 @@
+"""SessionEnumerator reading only the fields asked for."""
+
+import pytest
+
+from pycaw.sessions import SESSION_FIELDS, SessionEnumerator
+from pycaw.utils import AudioSession
+
+
+@pytest.fixture
+def sessions(mgr):
+    mgr.add_session(0, None)
+    mgr.add_session(10, "vlc.exe", display_name="VLC media player")
+    mgr.add_session(20, "firefox.exe").expire()
+    return mgr
+
+
+def test_all_fields(sessions):
+    enumerator = SessionEnumerator()
+    system, vlc = enumerator.records(sessions)
+    assert (system.pid, system.system) == (0, True)
+    assert vlc.pid == 10
+    assert vlc.display_name == "VLC media player"
+    assert vlc.state == 0
+    assert vlc.system is False
+    assert vlc.instance_id == sessions._sessions[1].GetSessionInstanceIdentifier()
+    assert vlc.volume is sessions._sessions[1].volume
+    # GetSessionEnumerator, GetCount, then GetSession, QueryInterface and one call per field
+    assert enumerator.com_calls == 2 + 2 * (2 + len(SESSION_FIELDS))
+    assert enumerator.per_session == enumerator.com_calls / 2
+
+
+def test_only_the_fields_asked_for(sessions):
+    enumerator = SessionEnumerator()
+    records = enumerator.records(sessions, fields=("pid",))
+    assert [record.pid for record in records] == [0, 10]
+    assert records[1].display_name is None
+    assert records[1].volume is None
+    assert enumerator.com_calls == 2 + 2 * 3
+
+
+def test_unknown_field(sessions):
+    with pytest.raises(ValueError):
+        SessionEnumerator().records(sessions, fields=("pid", "peak"))
+
+
+def test_session_is_made_once_and_reuses_the_volume(sessions):
+    record = SessionEnumerator().records(sessions, fields=("volume",))[1]
+    session = record.session
+    assert isinstance(session, AudioSession)
+    assert record.session is session
+    assert session.SimpleAudioVolume is record.volume
@@ -0,0 +1,82 @@
+"""VolumeStepper in native and dB modes, and the volume range cache."""
+
+import pytest
+
+import fakes
+from pycaw.stepping import VolumeRangeCache, VolumeStepper
+
+
+@pytest.fixture
+def endpoint():
+    return fakes.FakeAudioEndpointVolume(volume=0.5, step_count=101)
+
+
+def stepper(endpoint, **kwargs):
+    kwargs.setdefault("cache", VolumeRangeCache())
+    # the level as an EndpointVolumeState would serve it, without a COM read
+    return VolumeStepper(endpoint, level=lambda: endpoint._volume, **kwargs)
+
+
+def test_native_steps_predict_the_level(endpoint):
+    volume = stepper(endpoint)
+    assert volume.step(1)
+    assert volume.step(1)
+    assert volume.expected == pytest.approx(0.52)
+    assert endpoint._volume == pytest.approx(volume.expected)
+    assert endpoint.calls["VolumeStepUp"] == 2
+    assert "GetMasterVolumeLevelScalar" not in endpoint.calls
+
+
+def test_native_stops_at_the_limit():
+    endpoint = fakes.FakeAudioEndpointVolume(volume=1.0)
+    volume = stepper(endpoint)
+    assert not volume.step(1)
+    assert "VolumeStepUp" not in endpoint.calls
+    assert not volume.step(1)
+    assert volume.step(-1)
+    assert volume.expected == pytest.approx(0.99)
+
+
+def test_native_follows_changes_made_elsewhere(endpoint):
+    volume = stepper(endpoint)
+    volume.step(1)
+    endpoint.SetMasterVolumeLevelScalar(0.2, None)
+    volume.step(-1)
+    assert volume.expected == pytest.approx(0.19)
+
+
+def test_db_steps_on_the_grid():
+    endpoint = fakes.FakeAudioEndpointVolume(volume=1.0)
+    volume = stepper(endpoint, mode="db", step_db=1.5)
+    assert volume.step(-1)
+    assert volume.step(-1)
+    # the dB level is read once, later steps continue from the grid
+    assert endpoint.calls["GetMasterVolumeLevel"] == 1
+    assert endpoint.GetMasterVolumeLevel() == pytest.approx(-3.0)
+    assert volume.expected is None
+    assert volume.step(1)
+    assert endpoint.GetMasterVolumeLevel() == pytest.approx(-1.5)
+
+
+def test_db_step_is_rounded_to_the_increment(endpoint):
+    volume = stepper(endpoint, mode="db", step_db=1.0)
+    assert volume.step_db == 1.0
+    endpoint._range = (-65.25, 0.0, 0.375)
+    volume = stepper(endpoint, mode="db", step_db=1.0)
+    assert volume.step_db == 1.125
+
+
+def test_unknown_mode(endpoint):
+    with pytest.raises(ValueError):
+        stepper(endpoint, mode="percent")
+
+
+def test_range_is_read_once_per_device(endpoint):
+    cache = VolumeRangeCache()
+    stepper(endpoint, device_id="speakers", cache=cache)
+    stepper(endpoint, device_id="speakers", cache=cache)
+    assert (cache.reads, cache.hits) == (1, 1)
+    assert endpoint.calls["GetVolumeRange"] == 1
+    cache.invalidate("speakers")
+    stepper(endpoint, device_id="speakers", cache=cache)
+    assert cache.reads == 2
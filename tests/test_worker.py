@@ -0,0 +1,46 @@
+"""ComWorker.read serving the snapshot and queueing one refresh per key."""
+
+import pytest
+
+from volumeManager.worker import ComWorker
+
+
+@pytest.fixture
+def worker():
+    # not started, queued calls wait until the test starts it
+    worker = ComWorker(initializer=None, uninitializer=None)
+    yield worker
+    worker.stop()
+
+
+def test_read_serves_the_snapshot_and_refreshes_once(worker):
+    worker.write("volume", 0.5)
+    assert worker.read("volume", lambda: 0.8) == 0.5
+    assert worker.read("volume", lambda: 0.8) == 0.5
+    assert worker.queue.qsize() == 1
+    worker.start()
+    worker.call(lambda: None)
+    assert worker.read("volume", lambda: 0.8) == 0.8
+
+
+def test_rejected_refresh_is_retried(worker):
+    worker.queue.maxsize = 1
+    worker.write("volume", 0.5)
+    worker.submit(lambda: None)
+    assert worker.read("volume", lambda: 0.8) == 0.5
+    assert worker.rejected == 1
+    worker.queue.maxsize = 0
+    worker.start()
+    worker.call(lambda: None)
+    worker.read("volume", lambda: 0.8)
+    worker.call(lambda: None)
+    assert worker.read("volume", lambda: 0.8) == 0.8
+
+
+def test_write_wins_over_an_older_refresh(worker):
+    worker.write("volume", 0.5)
+    worker.read("volume", lambda: 0.2)
+    worker.write("volume", 0.9)
+    worker.start()
+    worker.call(lambda: None)
+    assert worker.snapshot["volume"] == 0.9